@@ -0,0 +1 @@
+"""Performance benchmarks of the lnas API on synthetic meshes. Run `python -m benchmarks --help`"""
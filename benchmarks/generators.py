@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import numpy as np
+
+from lnas import LnasFormat, LnasGeometry
+from lnas.fmt import CURRENT_VERSION
+
+__all__ = ["GENERATORS", "cylinder", "generate", "icosphere", "terrain"]
+
+
+def _surfaces_from_labels(labels: np.ndarray, names: list[str]) -> dict[str, np.ndarray]:
+    return {
+        name: np.flatnonzero(labels == label).astype(np.uint32)
+        for label, name in enumerate(names)
+        if np.any(labels == label)
+    }
+
+
+def _icosahedron() -> tuple[np.ndarray, np.ndarray]:
+    phi = (1 + np.sqrt(5)) / 2
+    vertices = np.array(
+        [
+            [-1, phi, 0],
+            [1, phi, 0],
+            [-1, -phi, 0],
+            [1, -phi, 0],
+            [0, -1, phi],
+            [0, 1, phi],
+            [0, -1, -phi],
+            [0, 1, -phi],
+            [phi, 0, -1],
+            [phi, 0, 1],
+            [-phi, 0, -1],
+            [-phi, 0, 1],
+        ],
+        dtype=np.float64,
+    )
+    triangles = np.array(
+        [
+            [0, 11, 5],
+            [0, 5, 1],
+            [0, 1, 7],
+            [0, 7, 10],
+            [0, 10, 11],
+            [1, 5, 9],
+            [5, 11, 4],
+            [11, 10, 2],
+            [10, 7, 6],
+            [7, 1, 8],
+            [3, 9, 4],
+            [3, 4, 2],
+            [3, 2, 6],
+            [3, 6, 8],
+            [3, 8, 9],
+            [4, 9, 5],
+            [2, 4, 11],
+            [6, 2, 10],
+            [8, 6, 7],
+            [9, 8, 1],
+        ],
+        dtype=np.int64,
+    )
+    return vertices / np.linalg.norm(vertices, axis=1)[:, np.newaxis], triangles
+
+
+def icosphere(n_triangles: int) -> LnasFormat:
+    """Unit sphere subdivided from an icosahedron, with at least `n_triangles` (20 * 4^k)
+
+    Surfaces are the octants of the triangles centroids ("octant_0" to "octant_7").
+    """
+
+    vertices, triangles = _icosahedron()
+    while len(triangles) < n_triangles:
+        # Each triangle is split in 4, with a vertex at the middle of each edge
+        edges = np.sort(triangles[:, [[0, 1], [1, 2], [2, 0]]].reshape((-1, 2)), axis=1)
+        edges_keys, edges_inverse = np.unique(
+            edges[:, 0] * len(vertices) + edges[:, 1], return_inverse=True
+        )
+        lo, hi = np.divmod(edges_keys, len(vertices))
+        midpoints = vertices[lo] + vertices[hi]
+        midpoints /= np.linalg.norm(midpoints, axis=1)[:, np.newaxis]
+
+        m01, m12, m20 = (len(vertices) + edges_inverse.reshape((-1, 3))).T
+        v0, v1, v2 = triangles.T
+        triangles = np.concatenate(
+            (
+                np.stack((v0, m01, m20), axis=1),
+                np.stack((v1, m12, m01), axis=1),
+                np.stack((v2, m20, m12), axis=1),
+                np.stack((m01, m12, m20), axis=1),
+            )
+        )
+        vertices = np.concatenate((vertices, midpoints))
+
+    centroids = vertices[triangles].mean(axis=1)
+    labels = (centroids > 0).astype(np.int64) @ np.array([1, 2, 4])
+    geometry = LnasGeometry(
+        vertices=vertices.astype(np.float32), triangles=triangles.astype(np.uint32)
+    )
+    surfaces = _surfaces_from_labels(labels, [f"octant_{i}" for i in range(8)])
+    return LnasFormat(version=CURRENT_VERSION, geometry=geometry, surfaces=surfaces)
+
+
+def cylinder(n_triangles: int) -> LnasFormat:
+    """Closed cylinder along z (radius 1, height 4) with about `n_triangles`
+
+    Surfaces are "side", "bottom" and "top".
+    """
+
+    n_theta = max(3, round(np.sqrt(n_triangles / 2)))
+    n_z = max(1, round((n_triangles - 2 * n_theta) / (2 * n_theta)))
+    theta = np.linspace(0, 2 * np.pi, n_theta, endpoint=False)
+    z = np.linspace(0, 4, n_z + 1)
+
+    # Side vertex (i, j) at angle i and height j is i * (n_z + 1) + j, then caps centers
+    ring = np.stack((np.cos(theta), np.sin(theta)), axis=1)
+    side = np.concatenate(
+        (np.repeat(ring, n_z + 1, axis=0), np.tile(z, n_theta)[:, np.newaxis]), axis=1
+    )
+    vertices = np.concatenate((side, [[0, 0, 0], [0, 0, 4]]))
+    bottom_center, top_center = len(side), len(side) + 1
+
+    i, j = np.meshgrid(np.arange(n_theta), np.arange(n_z), indexing="ij")
+    i, j = i.ravel(), j.ravel()
+    i_next = (i + 1) % n_theta
+    v00, v10 = i * (n_z + 1) + j, i_next * (n_z + 1) + j
+    v01, v11 = v00 + 1, v10 + 1
+    # Normals point out of the cylinder
+    side_triangles = np.concatenate(
+        (np.stack((v00, v10, v11), axis=1), np.stack((v00, v11, v01), axis=1))
+    )
+    ring_i = np.arange(n_theta)
+    ring_next = (ring_i + 1) % n_theta
+    bottom_triangles = np.stack(
+        (np.full((n_theta,), bottom_center), ring_next * (n_z + 1), ring_i * (n_z + 1)), axis=1
+    )
+    top_triangles = np.stack(
+        (
+            np.full((n_theta,), top_center),
+            ring_i * (n_z + 1) + n_z,
+            ring_next * (n_z + 1) + n_z,
+        ),
+        axis=1,
+    )
+
+    triangles = np.concatenate((side_triangles, bottom_triangles, top_triangles))
+    labels = np.repeat([0, 1, 2], [len(side_triangles), n_theta, n_theta])
+    geometry = LnasGeometry(
+        vertices=vertices.astype(np.float32), triangles=triangles.astype(np.uint32)
+    )
+    surfaces = _surfaces_from_labels(labels, ["side", "bottom", "top"])
+    return LnasFormat(version=CURRENT_VERSION, geometry=geometry, surfaces=surfaces)
+
+
+def terrain(n_triangles: int) -> LnasFormat:
+    """Heightfield terrain of smooth hills with about `n_triangles`, in 4x4 tiles surfaces"""
+
+    n_cells = max(1, round(np.sqrt(n_triangles / 2)))
+    x = np.linspace(0, 8 * np.pi, n_cells + 1)
+    heights = np.sin(x)[:, np.newaxis] * np.cos(x / 2)[np.newaxis, :] + 0.1 * np.sin(3 * x)
+    return LnasFormat.from_heightfield(
+        heights.astype(np.float32),
+        spacing=1.0,
+        tile_size=max(1, -(-n_cells // 4)),
+    )
+
+
+GENERATORS = {"sphere": icosphere, "cylinder": cylinder, "terrain": terrain}
+
+
+def generate(mesh: str, n_triangles: int) -> LnasFormat:
+    """Deterministic synthetic LNAS with about `n_triangles`
+
+    Args:
+        mesh (str): Mesh kind, one of "sphere", "cylinder" or "terrain"
+        n_triangles (int): Target number of triangles
+
+    Returns:
+        LnasFormat: generated LNAS
+    """
+
+    if mesh not in GENERATORS:
+        raise ValueError(f"Unknown mesh {mesh}. Available ones are {list(GENERATORS)}")
+    return GENERATORS[mesh](n_triangles)
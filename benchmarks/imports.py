@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import subprocess
+import sys
+from collections.abc import Callable
+from typing import Any
+
+from benchmarks.suite import _metadata, compare
+
+__all__ = ["IMPORT_CASES", "main", "run_import_benchmarks"]
+
+# Statements timed in a new interpreter. "numpy" is the floor of lnas import time
+IMPORT_CASES = {
+    "numpy": "import numpy",
+    "lnas": "import lnas",
+    "lnas_format": "from lnas import LnasFormat",
+    "lnas_all": "import lnas; [getattr(lnas, name) for name in lnas.__all__]",
+}
+
+# Modules that should only be imported when used, as the lnas features other than loading
+# and saving LNAS files
+_DEFERRED_MODULES = [
+    "ruamel.yaml",
+    "asyncio",
+    "concurrent.futures.process",
+    "multiprocessing",
+    "lnas.clip",
+    "lnas.forces",
+    "lnas.loading",
+    "lnas.ordering",
+    "lnas.partition",
+    "lnas.scratch",
+    "lnas.section",
+    "lnas.stl",
+    "lnas.terrain",
+    "lnas.weld",
+]
+
+_TIMER = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {deferred!r} if m in sys.modules))
+"""
+
+
+def _time_import(statement: str) -> tuple[float, list[str]]:
+    code = _TIMER.format(statement=statement, deferred=_DEFERRED_MODULES)
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(out[0]), out[1].split(",") if len(out) > 1 else []
+
+
+def run_import_benchmarks(
+    cases: list[str] | None = None,
+    repeat: int = 10,
+    log: Callable[[str], Any] | None = print,
+) -> dict[str, Any]:
+    """Time imports, each in a new interpreter
+
+    Args:
+        cases (list[str] | None, optional): Cases of `IMPORT_CASES` to run. Defaults to
+            None (all).
+        repeat (int, optional): Interpreters started for each case. Defaults to 10.
+        log (Callable[[str], Any] | None, optional): Progress output. Defaults to print.
+
+    Returns:
+        dict[str, Any]: results as `run_benchmarks`, with mesh "import" and size 0.
+            Records have "loaded", the modules imported that should be deferred
+    """
+
+    cases = list(IMPORT_CASES) if cases is None else cases
+    unknown = set(cases) - set(IMPORT_CASES)
+    if unknown:
+        raise ValueError(
+            f"Unknown cases {sorted(unknown)}. Available ones are {list(IMPORT_CASES)}"
+        )
+
+    results = []
+    for case in cases:
+        times, loaded = [], []
+        for _ in range(repeat):
+            elapsed, loaded = _time_import(IMPORT_CASES[case])
+            times.append(elapsed)
+        record = {
+            "case": case,
+            "mesh": "import",
+            "size": 0,
+            "times": times,
+            "best": min(times),
+            "median": sorted(times)[len(times) // 2],
+            "loaded": loaded,
+        }
+        results.append(record)
+        if log is not None:
+            log(f"{case:>16} {record['best'] * 1e3:>10.2f} ms {' '.join(loaded)}")
+    return {"metadata": _metadata(), "results": results}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.imports", description="Time lnas import in new interpreters"
+    )
+    parser.add_argument(
+        "--cases", nargs="+", choices=list(IMPORT_CASES), default=list(IMPORT_CASES)
+    )
+    parser.add_argument("--repeat", type=int, default=10, help="Interpreters started per case")
+    parser.add_argument("-o", "--output", type=pathlib.Path, help="JSON file to save results")
+    parser.add_argument("--baseline", type=pathlib.Path, help="JSON results to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Ratio to the baseline considered a regression. Defaults to 1.25",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_import_benchmarks(args.cases, args.repeat)
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.baseline is None:
+        return 0
+
+    comparison = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+    for c in comparison:
+        print(
+            f"{c['case']:>16} time x{c['time_ratio']:.2f}"
+            + (" REGRESSION" if c["regression"] else "")
+        )
+    return 1 if any(c["regression"] for c in comparison) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
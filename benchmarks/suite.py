@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import pathlib
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any
+
+import numpy as np
+
+from benchmarks.generators import GENERATORS, generate
+from lnas import LnasFormat, TransformationsMatrix
+from lnas.encoding import b64decode_array, b64encode_array
+
+__all__ = ["CASES", "BenchmarkCase", "compare", "main", "run_benchmarks"]
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+@dataclass
+class BenchmarkCase:
+    """Operation benchmarked on a generated LNAS"""
+
+    name: str
+    # Input of `run` from the generated LNAS and a scratch directory, not timed
+    setup: Callable[[LnasFormat, pathlib.Path], Any]
+    # Timed operation
+    run: Callable[[Any], Any]
+
+
+def _with_derived(lnas: LnasFormat) -> LnasFormat:
+    # Triangles normals and areas calculated, as they are after loading a LNAS
+    lnas = lnas.copy()
+    _ = lnas.geometry.normals, lnas.geometry.areas
+    return lnas
+
+
+def _stl_file(lnas: LnasFormat, directory: pathlib.Path) -> pathlib.Path:
+    filename = directory / "mesh.stl"
+    if not filename.exists():
+        lnas.geometry.export_stl(filename)
+    return filename
+
+
+def _lnas_file(lnas: LnasFormat, directory: pathlib.Path) -> pathlib.Path:
+    filename = directory / "mesh.lnas"
+    if not filename.exists():
+        lnas.to_file(filename)
+    return filename
+
+
+def _vertices_b64(lnas: LnasFormat, _) -> str:
+    return b64encode_array(lnas.geometry.vertices, np.float32, n_threads=1)
+
+
+_TRANSFORMATION = TransformationsMatrix.from_tuple(
+    angle=(0.1, 0.2, 0.3), translation=(1, 2, 3), scale=(2, 2, 2)
+)
+
+CASES = {
+    case.name: case
+    for case in [
+        BenchmarkCase(
+            "stl_write",
+            lambda lnas, d: (_with_derived(lnas).geometry, d / "out.stl"),
+            lambda inp: inp[0].export_stl(inp[1]),
+        ),
+        BenchmarkCase("stl_read", _stl_file, LnasFormat.from_stl),
+        BenchmarkCase(
+            "lnas_write",
+            lambda lnas, d: (lnas, d / "out.lnas"),
+            lambda inp: inp[0].to_file(inp[1]),
+        ),
+        BenchmarkCase("lnas_read", _lnas_file, LnasFormat.from_file),
+        BenchmarkCase(
+            "transform",
+            lambda lnas, _: _with_derived(lnas).geometry,
+            lambda g: g.apply_transformation(_TRANSFORMATION),
+        ),
+        BenchmarkCase("normals", lambda lnas, _: lnas.geometry.copy(), lambda g: g.normals),
+        BenchmarkCase("areas", lambda lnas, _: lnas.geometry.copy(), lambda g: g.areas),
+        BenchmarkCase(
+            "vertices_normals",
+            lambda lnas, _: _with_derived(lnas).geometry,
+            lambda g: g.vertices_normals,
+        ),
+        BenchmarkCase(
+            "vertices_areas",
+            lambda lnas, _: _with_derived(lnas).geometry,
+            lambda g: g.get_vertices_areas("voronoi"),
+        ),
+        BenchmarkCase(
+            "filter",
+            lambda lnas, _: (
+                _with_derived(lnas),
+                np.arange(len(lnas.geometry.triangles)) % 2 == 0,
+            ),
+            lambda inp: inp[0].filter_triangles(inp[1]),
+        ),
+        BenchmarkCase(
+            "join",
+            lambda lnas, _: (lnas.copy(), lnas.copy()),
+            lambda inp: inp[0].join([inp[1]], surfaces_suffixes=["_joined"]),
+        ),
+        # Base64 of vertices in one thread (binascii) and in a thread for each CPU
+        BenchmarkCase(
+            "b64_encode",
+            lambda lnas, _: lnas.geometry.vertices,
+            lambda v: b64encode_array(v, np.float32, n_threads=1),
+        ),
+        BenchmarkCase(
+            "b64_encode_threads",
+            lambda lnas, _: lnas.geometry.vertices,
+            lambda v: b64encode_array(v, np.float32, n_threads=os.cpu_count()),
+        ),
+        BenchmarkCase(
+            "b64_decode",
+            _vertices_b64,
+            lambda data: b64decode_array(data, np.float32, n_threads=1),
+        ),
+        BenchmarkCase(
+            "b64_decode_threads",
+            _vertices_b64,
+            lambda data: b64decode_array(data, np.float32, n_threads=os.cpu_count()),
+        ),
+        BenchmarkCase(
+            "surface",
+            lambda lnas, _: _with_derived(lnas),
+            lambda lnas: lnas.geometry_from_surface(next(iter(lnas.surfaces))),
+        ),
+    ]
+}
+
+
+def _measure(
+    case: BenchmarkCase, lnas: LnasFormat, directory: pathlib.Path, repeat: int, memory: bool
+) -> dict[str, Any]:
+    # Each repetition has its own setup, so cached values are not reused
+    times = []
+    for _ in range(repeat):
+        inp = case.setup(lnas, directory)
+        start = time.perf_counter()
+        case.run(inp)
+        times.append(time.perf_counter() - start)
+        del inp
+
+    measures = {"times": times, "best": min(times), "median": statistics.median(times)}
+    if memory:
+        # Memory is measured apart, tracing allocations slows down the operation
+        inp = case.setup(lnas, directory)
+        tracemalloc.start()
+        try:
+            case.run(inp)
+            measures["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return measures
+
+
+def _metadata() -> dict[str, Any]:
+    try:
+        lnas_version = version("aerosim-lnas")
+    except PackageNotFoundError:
+        lnas_version = None
+    return {
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "lnas": lnas_version,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_benchmarks(
+    sizes: list[int] | None = None,
+    meshes: list[str] | None = None,
+    cases: list[str] | None = None,
+    repeat: int = 3,
+    memory: bool = True,
+    log: Callable[[str], Any] | None = print,
+) -> dict[str, Any]:
+    """Run benchmark cases on generated meshes of each size
+
+    Args:
+        sizes (list[int] | None, optional): Target number of triangles of the meshes.
+            Defaults to None (1e3 to 1e5).
+        meshes (list[str] | None, optional): Meshes generated. Defaults to None (all
+            generators).
+        cases (list[str] | None, optional): Cases to run. Defaults to None (all).
+        repeat (int, optional): Timed runs of each case. Defaults to 3.
+        memory (bool, optional): Measure peak allocated memory with `tracemalloc`, in an
+            extra run. Tracing slows down Python loops (as YAML writing). Defaults to True.
+        log (Callable[[str], Any] | None, optional): Progress output. Defaults to print.
+
+    Returns:
+        dict[str, Any]: results, with "metadata" and "results" (a record per case, mesh
+            and size with times in seconds and peak allocated memory in bytes)
+    """
+
+    sizes = DEFAULT_SIZES if sizes is None else sizes
+    meshes = list(GENERATORS) if meshes is None else meshes
+    cases = list(CASES) if cases is None else cases
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        raise ValueError(f"Unknown cases {sorted(unknown)}. Available ones are {list(CASES)}")
+    if repeat < 1:
+        raise ValueError(f"Repeat must be at least 1. It is {repeat}")
+
+    results = []
+    for mesh in meshes:
+        for size in sizes:
+            lnas = generate(mesh, size)
+            n_triangles = len(lnas.geometry.triangles)
+            with tempfile.TemporaryDirectory(prefix="lnas_bench_") as tmp_dir:
+                for case_name in cases:
+                    record = {
+                        "case": case_name,
+                        "mesh": mesh,
+                        "size": size,
+                        "n_triangles": n_triangles,
+                        "n_vertices": len(lnas.geometry.vertices),
+                    }
+                    record.update(
+                        _measure(CASES[case_name], lnas, pathlib.Path(tmp_dir), repeat, memory)
+                    )
+                    results.append(record)
+                    if log is not None:
+                        line = f"{mesh:>8} {n_triangles:>10} {case_name:>18} "
+                        line += f"{record['best'] * 1e3:>10.2f} ms"
+                        if memory:
+                            line += f" {record['peak_memory'] / 2**20:>10.2f} MiB"
+                        log(line)
+    return {"metadata": _metadata(), "results": results}
+
+
+def _ratio(value: float | None, base: float | None) -> float:
+    if value is None or base is None or base <= 0:
+        return 1.0
+    return value / base
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float = 1.25
+) -> list[dict[str, Any]]:
+    """Compare results to a baseline, by case, mesh and size
+
+    Args:
+        results (dict[str, Any]): Results of `run_benchmarks`
+        baseline (dict[str, Any]): Baseline results of `run_benchmarks`
+        threshold (float, optional): Ratio to the baseline above which time (best run)
+            or peak memory is a regression. Defaults to 1.25.
+
+    Returns:
+        list[dict[str, Any]]: comparison of each record in both, with "time_ratio",
+            "memory_ratio" and "regression"
+    """
+
+    def key(record: dict[str, Any]) -> tuple:
+        return (record["case"], record["mesh"], record["size"])
+
+    baseline_records = {key(r): r for r in baseline["results"]}
+    comparison = []
+    for record in results["results"]:
+        base = baseline_records.get(key(record))
+        if base is None:
+            continue
+        time_ratio = _ratio(record.get("best"), base.get("best"))
+        # Records without memory measured aren't compared by memory
+        memory_ratio = _ratio(record.get("peak_memory"), base.get("peak_memory"))
+        comparison.append(
+            {
+                "case": record["case"],
+                "mesh": record["mesh"],
+                "size": record["size"],
+                "time_ratio": time_ratio,
+                "memory_ratio": memory_ratio,
+                "regression": time_ratio > threshold or memory_ratio > threshold,
+            }
+        )
+    return comparison
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Time and memory profile lnas operations on synthetic meshes",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=lambda s: int(float(s)),
+        default=DEFAULT_SIZES,
+        help="Target number of triangles (e.g. 1e3 1e7). Defaults to 1e3 to 1e5",
+    )
+    parser.add_argument("--meshes", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs of each case")
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Don't measure peak memory (faster)"
+    )
+    parser.add_argument("-o", "--output", type=pathlib.Path, help="JSON file to save results")
+    parser.add_argument("--baseline", type=pathlib.Path, help="JSON results to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Ratio to the baseline considered a regression. Defaults to 1.25",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        args.sizes, args.meshes, args.cases, args.repeat, memory=not args.no_memory
+    )
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.baseline is None:
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    comparison = compare(results, baseline, args.threshold)
+    for c in comparison:
+        print(
+            f"{c['mesh']:>8} {c['size']:>10} {c['case']:>18} "
+            f"time x{c['time_ratio']:.2f} memory x{c['memory_ratio']:.2f}"
+            + (" REGRESSION" if c["regression"] else "")
+        )
+    n_regressions = sum(c["regression"] for c in comparison)
+    print(f"{n_regressions} regressions of {len(comparison)} compared", file=sys.stderr)
+    return 1 if n_regressions > 0 else 0
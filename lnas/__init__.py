@@ -4,18 +4,51 @@ Lagrangian Nassu API
 This API provides classes to manage .lnas (Lagrangian Nassu) files, as loading and saving it.
 """
 
+import importlib as _importlib
+
+# False at runtime as `typing.TYPE_CHECKING`, without importing typing (slower than lnas)
+_TYPE_CHECKING = False
+
 __all__ = [
-    "LnasGeometry",
     "LnasFormat",
-    "LagrangianReader",
+    "LnasGeometry",
     "Transformations",
     "TransformationsMatrix",
 ]
 
-# IN ORDER TO AVOID IMPORT ERRORS, THE MODULES MUST BE
-# IMPORTED IN DEPENDENCY ORDER (if mod2 depends on mod1,
-# then mod1 must be imported before mod2)
+# Classes are imported from their modules on first access, so `import lnas` is fast.
+# Modules import each other as `from lnas import ...`, which goes through `__getattr__`
+_LAZY_ATTRS = {
+    "Transformations": "lnas.transformations",
+    "TransformationsMatrix": "lnas.transformations",
+    "LnasGeometry": "lnas.geometry",
+    "LnasFormat": "lnas.fmt",
+}
+
+if _TYPE_CHECKING:
+    from .fmt import LnasFormat
+    from .geometry import LnasGeometry
+    from .transformations import Transformations, TransformationsMatrix
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        value = getattr(_importlib.import_module(_LAZY_ATTRS[name]), name)
+        globals()[name] = value
+        return value
+
+    # Submodules are imported on access, as `lnas.fmt` after `import lnas`
+    if not name.startswith("__"):
+        try:
+            return _importlib.import_module(f"{__name__}.{name}")
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":
+                raise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    import pkgutil
 
-from .transformations import Transformations, TransformationsMatrix
-from .geometry import LnasGeometry
-from .fmt import LnasFormat
+    submodules = {m.name for m in pkgutil.iter_modules(__path__)}
+    return sorted({*globals(), *_LAZY_ATTRS, *submodules})
@@ -0,0 +1,5 @@
+import sys
+
+from lnas.cli import main
+
+sys.exit(main())
@@ -0,0 +1,423 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import pathlib
+import sys
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from lnas import LnasFormat, TransformationsMatrix
+from lnas.stl import is_ascii_stl_file
+from lnas.streaming import stl_to_lnas
+from lnas.utils import map_in_workers
+
+__all__ = ["main"]
+
+_PROG = "lnas"
+
+
+@dataclass
+class BatchJob:
+    """Conversion of one file in a batch, run in a worker process"""
+
+    # Function converting the file, must be picklable
+    convert: Callable[..., Any]
+    input: pathlib.Path
+    output: pathlib.Path
+    # Keyword arguments of `convert`
+    options: dict[str, Any]
+
+
+@contextlib.contextmanager
+def _atomic_output(output: pathlib.Path) -> Iterator[pathlib.Path]:
+    """Temporary file next to `output` to write, replacing `output` only if no error is raised
+
+    The temporary file has the same suffix as `output` and is removed on errors, so outputs
+    are never partially written.
+    """
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_output = output.with_name(f".{output.stem}.{os.getpid()}.tmp{output.suffix}")
+    try:
+        yield tmp_output
+        os.replace(tmp_output, output)
+    finally:
+        tmp_output.unlink(missing_ok=True)
+
+
+def _run_job(job: BatchJob) -> tuple[BatchJob, float, str | None]:
+    # Errors are returned so a file failing doesn't stop the batch
+    start = time.perf_counter()
+    try:
+        with _atomic_output(job.output) as output:
+            job.convert(job.input, output, **job.options)
+    # Any error converting a file (I/O, parsing, geometry) is reported as its failure
+    except Exception as e:  # noqa: BLE001
+        return job, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    return job, time.perf_counter() - start, None
+
+
+def _is_up_to_date(input_file: pathlib.Path, output_file: pathlib.Path) -> bool:
+    return output_file.exists() and output_file.stat().st_mtime >= input_file.stat().st_mtime
+
+
+def _batch_jobs(
+    inputs: list[pathlib.Path],
+    suffix: str,
+    output: pathlib.Path | None,
+    output_suffix: str,
+) -> list[tuple[pathlib.Path, pathlib.Path]]:
+    """Input and output filenames of a batch
+
+    Directories are walked recursively for files with `suffix`, and their tree is mirrored
+    in the `output` directory. Outputs are next to inputs without `output`.
+    """
+
+    pairs = []
+    for path in inputs:
+        if path.is_dir():
+            files = sorted(p for p in path.rglob(f"*{suffix}") if p.is_file())
+            for f in files:
+                out_dir = f.parent if output is None else output / f.parent.relative_to(path)
+                pairs.append((f, out_dir / (f.stem + output_suffix)))
+        elif not path.exists():
+            raise FileNotFoundError(f"Input {path} does not exist")
+        elif output is not None and output.suffix == output_suffix and len(inputs) == 1:
+            pairs.append((path, output))
+        else:
+            out_dir = path.parent if output is None else output
+            pairs.append((path, out_dir / (path.stem + output_suffix)))
+
+    outputs = [out for _, out in pairs]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError("Multiple inputs are written to the same output")
+    return pairs
+
+
+def _run_batch(
+    convert: Callable[..., Any],
+    pairs: list[tuple[pathlib.Path, pathlib.Path]],
+    options: dict[str, Any],
+    n_workers: int,
+    force: bool,
+    quiet: bool,
+) -> int:
+    """Run conversions in worker processes, reporting progress. Returns number of failures"""
+
+    def report(msg: str):
+        if not quiet:
+            print(msg, file=sys.stderr)
+
+    n_total = len(pairs)
+    jobs = []
+    n_skipped = 0
+    for input_file, output_file in pairs:
+        if not force and _is_up_to_date(input_file, output_file):
+            n_skipped += 1
+            report(f"[{n_skipped}/{n_total}] up to date {output_file}")
+        else:
+            jobs.append(
+                BatchJob(convert=convert, input=input_file, output=output_file, options=options)
+            )
+
+    n_done, n_failed = n_skipped, 0
+    for job, elapsed, error in map_in_workers(_run_job, jobs, n_workers=n_workers):
+        n_done += 1
+        if error is not None:
+            n_failed += 1
+            report(f"[{n_done}/{n_total}] failed {job.input}: {error}")
+        else:
+            report(f"[{n_done}/{n_total}] {job.input} -> {job.output} ({elapsed:.2f} s)")
+
+    report(
+        f"{n_total - n_skipped - n_failed} converted, {n_skipped} up to date, {n_failed} failed"
+    )
+    return n_failed
+
+
+def _convert_stl(
+    input_file: pathlib.Path,
+    output_file: pathlib.Path,
+    weld_tolerance: float | None = None,
+    memory_budget: int | None = None,
+):
+    # Out of core conversion is only for binary STL, ASCII ones are loaded in memory
+    if memory_budget is not None and not is_ascii_stl_file(input_file):
+        stl_to_lnas(input_file, output_file, memory_budget=memory_budget)
+        return
+    LnasFormat.from_stl(input_file, weld_tolerance=weld_tolerance).to_file(output_file)
+
+
+def _export_stl(
+    input_file: pathlib.Path, output_file: pathlib.Path, surfaces: list[str] | None = None
+):
+    lnas = LnasFormat.from_file(input_file)
+    if surfaces:
+        geometry, _ = lnas.geometry_from_list_surfaces(surfaces)
+        geometry.export_stl(output_file)
+    else:
+        lnas.export_stl(output_file)
+
+
+def _save(lnas: LnasFormat, output: pathlib.Path):
+    # Outputs with .stl suffix are exported as STL
+    with _atomic_output(output) as tmp_output:
+        if output.suffix == ".stl":
+            lnas.export_stl(tmp_output)
+        else:
+            lnas.to_file(tmp_output)
+
+
+def _cmd_convert(args: argparse.Namespace) -> int:
+    if args.weld_tolerance is not None and args.memory_budget is not None:
+        raise ValueError(
+            "--weld-tolerance can't be used with --memory-budget, out of core "
+            "conversion doesn't weld vertices"
+        )
+    if args.merge:
+        if args.output is None:
+            raise ValueError("Output file is required to merge STL files")
+        lnas = LnasFormat.from_stl_files(
+            args.inputs, weld_tolerance=args.weld_tolerance, n_workers=args.workers
+        )
+        with _atomic_output(args.output) as output:
+            lnas.to_file(output)
+        return 0
+
+    pairs = _batch_jobs(args.inputs, ".stl", args.output, ".lnas")
+    options = {"weld_tolerance": args.weld_tolerance, "memory_budget": args.memory_budget}
+    n_failed = _run_batch(_convert_stl, pairs, options, args.workers, args.force, args.quiet)
+    return 1 if n_failed > 0 else 0
+
+
+def _cmd_export_stl(args: argparse.Namespace) -> int:
+    pairs = _batch_jobs(args.inputs, ".lnas", args.output, ".stl")
+    options = {"surfaces": args.surfaces}
+    n_failed = _run_batch(_export_stl, pairs, options, args.workers, args.force, args.quiet)
+    return 1 if n_failed > 0 else 0
+
+
+def _lnas_info(filename: pathlib.Path) -> dict[str, Any]:
+    lnas = LnasFormat.from_file(filename)
+    geometry = lnas.geometry
+    vertices = np.asarray(geometry.vertices)
+    return {
+        "filename": str(filename),
+        "version": lnas.version,
+        "n_vertices": len(vertices),
+        "n_triangles": len(geometry.triangles),
+        "bounding_box": {
+            "min": vertices.min(axis=0).tolist() if len(vertices) > 0 else None,
+            "max": vertices.max(axis=0).tolist() if len(vertices) > 0 else None,
+        },
+        "area": float(np.sum(geometry.areas, dtype=np.float64)),
+        "surfaces": {name: len(idxs) for name, idxs in lnas.surfaces.items()},
+    }
+
+
+def _cmd_info(args: argparse.Namespace) -> int:
+    infos = [_lnas_info(f) for f in args.inputs]
+    if args.json:
+        print(json.dumps(infos if len(infos) > 1 else infos[0], indent=2))
+        return 0
+
+    for info in infos:
+        bbox = info["bounding_box"]
+        print(f"{info['filename']} (version {info['version']})")
+        print(f"  vertices: {info['n_vertices']}")
+        print(f"  triangles: {info['n_triangles']}")
+        print(f"  bounding box: {bbox['min']} to {bbox['max']}")
+        print(f"  area: {info['area']:.6g}")
+        print(f"  surfaces ({len(info['surfaces'])}):")
+        for name, n_triangles in info["surfaces"].items():
+            print(f"    {name}: {n_triangles} triangles")
+    return 0
+
+
+def _cmd_transform(args: argparse.Namespace) -> int:
+    transf = TransformationsMatrix.from_tuple(
+        angle=args.rotate, translation=args.translate, scale=args.scale, fixed_point=args.fixed
+    )
+    lnas = LnasFormat.from_file(args.input)
+    lnas.geometry.apply_transformation(transf, invert_transf=args.invert)
+    _save(lnas, args.output)
+    return 0
+
+
+def _cmd_join(args: argparse.Namespace) -> int:
+    lnas_fmts = [LnasFormat.from_file(f) for f in args.inputs]
+    suffixes = args.suffixes
+    if suffixes is not None and len(suffixes) != len(lnas_fmts):
+        raise ValueError(f"Expected {len(lnas_fmts)} suffixes, one per input")
+
+    lnas = lnas_fmts[0]
+    if suffixes is not None and suffixes[0]:
+        lnas.surfaces = {name + suffixes[0]: idxs for name, idxs in lnas.surfaces.items()}
+    lnas.join(
+        lnas_fmts[1:],
+        surfaces_suffixes=suffixes[1:] if suffixes is not None else None,
+        weld_tolerance=args.weld_tolerance,
+    )
+    _save(lnas, args.output)
+    return 0
+
+
+def _cmd_extract_surface(args: argparse.Namespace) -> int:
+    lnas = LnasFormat.from_file(args.input)
+    triangles_idxs = lnas.surfaces_union(args.surfaces)
+    extracted = lnas.filter_triangles(triangles_idxs, compact=True)
+    # Surfaces not extracted are dropped
+    extracted.surfaces = {
+        name: idxs for name, idxs in extracted.surfaces.items() if name in args.surfaces
+    }
+    _save(extracted, args.output)
+    return 0
+
+
+def _add_batch_args(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes. Defaults to the number of CPUs",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Convert files even if outputs are up to date"
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't report progress")
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=_PROG, description="Lagrangian Nassu (.lnas) tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert = subparsers.add_parser(
+        "convert",
+        help="Convert STL files to LNAS",
+        description=(
+            "Convert STL files to LNAS, one LNAS per STL. Directories are converted "
+            "recursively, mirroring their tree in the output directory, and outputs more "
+            "recent than their input are skipped"
+        ),
+    )
+    convert.add_argument("inputs", nargs="+", type=pathlib.Path, help="STL files or directories")
+    convert.add_argument(
+        "-o",
+        "--output",
+        type=pathlib.Path,
+        help="Output directory (or .lnas file for a single STL). Defaults to next to inputs",
+    )
+    convert.add_argument(
+        "--merge",
+        action="store_true",
+        help="Merge all STL into the output LNAS, with a surface per file (as stl2lnas)",
+    )
+    convert.add_argument("--weld-tolerance", type=float, help="Distance to merge vertices")
+    convert.add_argument(
+        "--memory-budget",
+        type=int,
+        help="Convert binary STL out of core within this memory, in bytes (ASCII STL are "
+        "converted in memory). Can't be used with --weld-tolerance",
+    )
+    _add_batch_args(convert)
+    convert.set_defaults(func=_cmd_convert)
+
+    export_stl = subparsers.add_parser(
+        "export-stl",
+        help="Export LNAS files to STL",
+        description=(
+            "Export LNAS files to binary STL. Directories are exported recursively, as with "
+            "convert"
+        ),
+    )
+    export_stl.add_argument(
+        "inputs", nargs="+", type=pathlib.Path, help="LNAS files or directories"
+    )
+    export_stl.add_argument(
+        "-o",
+        "--output",
+        type=pathlib.Path,
+        help="Output directory (or .stl file for a single LNAS). Defaults to next to inputs",
+    )
+    export_stl.add_argument("-s", "--surfaces", nargs="+", help="Export only these surfaces")
+    _add_batch_args(export_stl)
+    export_stl.set_defaults(func=_cmd_export_stl)
+
+    info = subparsers.add_parser("info", help="Show LNAS (or STL) files summary")
+    info.add_argument("inputs", nargs="+", type=pathlib.Path, help="LNAS or STL files")
+    info.add_argument("--json", action="store_true", help="Output as JSON")
+    info.set_defaults(func=_cmd_info)
+
+    transform = subparsers.add_parser(
+        "transform",
+        help="Rotate, scale and translate a LNAS",
+        description="Transform a LNAS. Scale and rotation are applied around the fixed point",
+    )
+    transform.add_argument("input", type=pathlib.Path, help="LNAS or STL file")
+    transform.add_argument(
+        "-o", "--output", type=pathlib.Path, required=True, help="Output LNAS (or .stl) file"
+    )
+    vector = {"nargs": 3, "type": float, "metavar": ("X", "Y", "Z")}
+    transform.add_argument(
+        "--rotate", default=(0, 0, 0), help="Rotation angles in radians", **vector
+    )
+    transform.add_argument("--translate", default=(0, 0, 0), help="Translation", **vector)
+    transform.add_argument("--scale", default=(1, 1, 1), help="Scale", **vector)
+    transform.add_argument(
+        "--fixed", default=(0, 0, 0), help="Fixed point of rotation and scale", **vector
+    )
+    transform.add_argument("--invert", action="store_true", help="Apply inverse transformation")
+    transform.set_defaults(func=_cmd_transform)
+
+    join = subparsers.add_parser("join", help="Join LNAS files into one")
+    join.add_argument("inputs", nargs="+", type=pathlib.Path, help="LNAS or STL files")
+    join.add_argument(
+        "-o", "--output", type=pathlib.Path, required=True, help="Output LNAS (or .stl) file"
+    )
+    join.add_argument(
+        "--suffixes", nargs="+", help="Suffix added to surfaces of each input, one per input"
+    )
+    join.add_argument("--weld-tolerance", type=float, help="Distance to merge vertices")
+    join.set_defaults(func=_cmd_join)
+
+    extract = subparsers.add_parser(
+        "extract-surface", help="Extract surfaces of a LNAS into a new one"
+    )
+    extract.add_argument("input", type=pathlib.Path, help="LNAS or STL file")
+    extract.add_argument("surfaces", nargs="+", help="Surfaces to extract")
+    extract.add_argument(
+        "-o", "--output", type=pathlib.Path, required=True, help="Output LNAS (or .stl) file"
+    )
+    extract.set_defaults(func=_cmd_extract_surface)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point of the `lnas` command
+
+    Args:
+        argv (list[str] | None, optional): Arguments. Defaults to None (`sys.argv`).
+
+    Returns:
+        int: exit code
+    """
+
+    args = _parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"{_PROG}: error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
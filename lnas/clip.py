@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import numpy as np
+
+__all__ = ["clip_half_spaces", "half_spaces"]
+
+
+def half_spaces(
+    start: tuple[float, ...] | None = None,
+    end: tuple[float, ...] | None = None,
+    planes: list[tuple[np.ndarray, np.ndarray]] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Half spaces `normal . x + offset >= 0` of a box and of planes
+
+    Args:
+        start (tuple[float, ...] | None, optional): Box start. Defaults to None.
+        end (tuple[float, ...] | None, optional): Box end. Defaults to None.
+        planes (list[tuple[np.ndarray, np.ndarray]] | None, optional): Planes as
+            (point, normal), keeping the side the normal points to. Defaults to None.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: normals (shape (K, 3)) and offsets (shape (K,))
+    """
+
+    normals, offsets = [], []
+    eye = np.eye(3)
+    if start is not None:
+        normals.extend(eye)
+        offsets.extend(-np.asarray(start, dtype=np.float64))
+    if end is not None:
+        normals.extend(-eye)
+        offsets.extend(np.asarray(end, dtype=np.float64))
+    for point, normal in planes or []:
+        normal = np.asarray(normal, dtype=np.float64)
+        if not np.any(normal):
+            raise ValueError("Clipping plane normal must not be zero")
+        normals.append(normal)
+        offsets.append(-float(np.dot(normal, point)))
+
+    return np.array(normals, dtype=np.float64).reshape((-1, 3)), np.array(offsets)
+
+
+def _clip_half_space(
+    vertices: np.ndarray,
+    triangles: np.ndarray,
+    parents: np.ndarray,
+    normal: np.ndarray,
+    offset: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    dist = vertices @ normal + offset
+    inside = dist >= 0
+    triangles_inside = inside[triangles]
+    n_inside = np.count_nonzero(triangles_inside, axis=1)
+    if (n_inside == 3).all():
+        return vertices, triangles, parents
+
+    is_cut = (n_inside == 1) | (n_inside == 2)
+    cut_triangles = triangles[is_cut]
+    cut_parents = parents[is_cut]
+    one_inside = n_inside[is_cut] == 1
+
+    # Rotate triangles so the vertex alone in its side comes first, keeping the winding
+    alone = np.where(
+        one_inside[:, np.newaxis], triangles_inside[is_cut], ~triangles_inside[is_cut]
+    )
+    rotation = (alone.argmax(axis=1)[:, np.newaxis] + np.arange(3)) % 3
+    a, b, c = np.take_along_axis(cut_triangles, rotation, axis=1).T
+
+    # Edges (a, b) and (a, c) cross the plane. Each edge is split once, so neighbour
+    # triangles share the new vertex
+    n_vertices = len(vertices)
+    n_cut = len(cut_triangles)
+    edges = np.concatenate((np.stack((a, b), axis=1), np.stack((a, c), axis=1)))
+    edges.sort(axis=1)
+    edges_keys, edges_inverse = np.unique(
+        edges[:, 0] * n_vertices + edges[:, 1], return_inverse=True
+    )
+    lo, hi = np.divmod(edges_keys, n_vertices)
+    dist_lo, dist_hi = dist[lo], dist[hi]
+    # Splits on a vertex lying on the plane reuse it
+    split_idxs = np.where(dist_lo == 0, lo, hi)
+    is_new = (dist_lo != 0) & (dist_hi != 0)
+    lo_new, hi_new = lo[is_new], hi[is_new]
+    t = dist_lo[is_new] / (dist_lo[is_new] - dist_hi[is_new])
+    new_vertices = vertices[lo_new] + t[:, np.newaxis] * (vertices[hi_new] - vertices[lo_new])
+    split_idxs[is_new] = n_vertices + np.arange(len(new_vertices))
+    split = split_idxs[edges_inverse.ravel()]
+    p_ab, p_ac = split[:n_cut], split[n_cut:]
+
+    two_inside = ~one_inside
+    # One vertex inside gives triangle (a, p_ab, p_ac). Two vertices inside give
+    # quad (p_ab, b, c, p_ac), split in two triangles
+    triangles = np.concatenate(
+        (
+            triangles[n_inside == 3],
+            np.stack((a, p_ab, p_ac), axis=1)[one_inside],
+            np.stack((p_ab, b, c), axis=1)[two_inside],
+            np.stack((p_ab, c, p_ac), axis=1)[two_inside],
+        )
+    )
+    parents = np.concatenate(
+        (
+            parents[n_inside == 3],
+            cut_parents[one_inside],
+            cut_parents[two_inside],
+            cut_parents[two_inside],
+        )
+    )
+
+    # Triangles with repeated vertices (split on a vertex) are degenerate
+    is_valid = (
+        (triangles[:, 0] != triangles[:, 1])
+        & (triangles[:, 1] != triangles[:, 2])
+        & (triangles[:, 0] != triangles[:, 2])
+    )
+    order = np.flatnonzero(is_valid)[np.argsort(parents[is_valid], kind="stable")]
+    return np.concatenate((vertices, new_vertices)), triangles[order], parents[order]
+
+
+def clip_half_spaces(
+    vertices: np.ndarray, triangles: np.ndarray, normals: np.ndarray, offsets: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Clip triangles to the intersection of half spaces `normal . x + offset >= 0`
+
+    Triangles are clipped by one half space at a time (Sutherland-Hodgman), vectorized
+    over triangles. Points on the planes are inside.
+
+    Args:
+        vertices (np.ndarray): Vertices (shape (Nv, 3))
+        triangles (np.ndarray): Triangles (shape (Nt, 3))
+        normals (np.ndarray): Half spaces normals (shape (K, 3))
+        offsets (np.ndarray): Half spaces offsets (shape (K,))
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: vertices (as float64, original ones first),
+            triangles and the original triangle of each triangle (sorted)
+    """
+
+    vertices = vertices.astype(np.float64)
+    triangles = triangles.astype(np.int64)
+    parents = np.arange(len(triangles), dtype=np.int64)
+    for normal, offset in zip(normals, offsets):
+        vertices, triangles, parents = _clip_half_space(
+            vertices, triangles, parents, normal, offset
+        )
+    return vertices, triangles, parents
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from lnas.profiling import span
+
+__all__ = ["b64decode_array", "b64encode_array"]
+
+_B64_ALPHABET = np.frombuffer(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/", dtype=np.uint8
+)
+# Value of each base64 character, 255 for characters out of the alphabet
+_B64_VALUES = np.full((256,), 255, dtype=np.uint8)
+_B64_VALUES[_B64_ALPHABET] = np.arange(64, dtype=np.uint8)
+# Groups of 3 bytes (4 characters) processed at a time by each thread
+_CHUNK_GROUPS = 1 << 20
+# Minimum threads for the threaded path to be used by default. NumPy lookup tables use
+# about 2.5x (encode) and 1.4x (decode) the CPU time of binascii, so fewer threads are slower
+_MIN_THREADS = 4
+
+
+def _n_threads(n_threads: int | None, n_groups: int) -> int:
+    n_chunks = -(-n_groups // _CHUNK_GROUPS)
+    if n_threads is None:
+        # Threads only when enough chunks and CPUs to be faster than binascii
+        n_threads = min(os.cpu_count() or 1, n_chunks)
+        return n_threads if n_threads >= _MIN_THREADS else 1
+    return max(1, min(n_threads, n_chunks))
+
+
+def _encode_groups(raw: np.ndarray, out: np.ndarray):
+    # Groups of 3 bytes into 4 characters. NumPy operations release the GIL, unlike binascii
+    src, dst = raw.reshape((-1, 3)), out.reshape((-1, 4))
+    dst[:, 0] = _B64_ALPHABET[src[:, 0] >> 2]
+    dst[:, 1] = _B64_ALPHABET[((src[:, 0] & 3) << 4) | (src[:, 1] >> 4)]
+    dst[:, 2] = _B64_ALPHABET[((src[:, 1] & 15) << 2) | (src[:, 2] >> 6)]
+    dst[:, 3] = _B64_ALPHABET[src[:, 2] & 63]
+
+
+def _decode_groups(encoded: np.ndarray, out: np.ndarray) -> bool:
+    # Groups of 4 characters into 3 bytes. False if there is a character out of the alphabet
+    values = _B64_VALUES[encoded].reshape((-1, 4))
+    if (values == 255).any():
+        return False
+    dst = out.reshape((-1, 3))
+    dst[:, 0] = (values[:, 0] << 2) | (values[:, 1] >> 4)
+    dst[:, 1] = (values[:, 1] << 4) | (values[:, 2] >> 2)
+    dst[:, 2] = (values[:, 2] << 6) | values[:, 3]
+    return True
+
+
+def _map_chunks(func, src: np.ndarray, dst: np.ndarray, src_group: int, dst_group: int, n: int):
+    # Run func on chunks of groups in threads, each writing to its part of dst
+    n_groups = len(src) // src_group
+    starts = range(0, n_groups, _CHUNK_GROUPS)
+    chunks = [(start, min(start + _CHUNK_GROUPS, n_groups)) for start in starts]
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        return list(
+            executor.map(
+                lambda c: func(
+                    src[c[0] * src_group : c[1] * src_group],
+                    dst[c[0] * dst_group : c[1] * dst_group],
+                ),
+                chunks,
+            )
+        )
+
+
+def b64encode_array(arr: np.ndarray, dtype: np.dtype, n_threads: int | None = None) -> str:
+    """Base64 of array bytes as `dtype`, the same as `base64.b64encode`
+
+    Large arrays are encoded in chunks of whole 3 bytes groups by multiple threads, into a
+    single preallocated buffer. By default threads are used only with at least 4 chunks
+    (of 3 MiB) and CPUs, otherwise `base64.b64encode` is faster.
+
+    Args:
+        arr (np.ndarray): Array to encode
+        dtype (np.dtype): Array dtype in the encoded bytes
+        n_threads (int | None, optional): Threads to use. Defaults to None (CPU count, if
+            at least 4).
+
+    Returns:
+        str: base64 string
+    """
+
+    raw = np.ascontiguousarray(arr, dtype=dtype).reshape(-1).view(np.uint8)
+    with span("base64.encode", raw.nbytes):
+        return _b64encode(raw, n_threads)
+
+
+def _b64encode(raw: np.ndarray, n_threads: int | None) -> str:
+    n_groups = len(raw) // 3
+    n = _n_threads(n_threads, n_groups)
+    if n == 1:
+        return base64.b64encode(raw.tobytes()).decode("ascii")
+
+    out = np.empty((-(-len(raw) // 3) * 4,), dtype=np.uint8)
+    _map_chunks(_encode_groups, raw, out, 3, 4, n)
+    if len(raw) > n_groups * 3:
+        # Last bytes are padded
+        tail = base64.b64encode(raw[n_groups * 3 :].tobytes())
+        out[n_groups * 4 :] = np.frombuffer(tail, dtype=np.uint8)
+    return out.tobytes().decode("ascii")
+
+
+def b64decode_array(
+    data: str | bytes, dtype: np.dtype, n_threads: int | None = None
+) -> np.ndarray:
+    """Array with `dtype` from its base64 bytes, the same as `base64.b64decode`
+
+    Large strings are decoded in chunks of whole 4 characters groups by multiple threads,
+    into a single preallocated buffer, as in `b64encode_array`. Strings with characters out of the base64 alphabet
+    (as line breaks) are decoded by `base64.b64decode`, discarding them.
+
+    Args:
+        data (str | bytes): base64 string
+        dtype (np.dtype): Array dtype
+        n_threads (int | None, optional): Threads to use. Defaults to None (CPU count, if
+            at least 4).
+
+    Returns:
+        np.ndarray: decoded array (1D)
+    """
+
+    if isinstance(data, str):
+        data = data.encode("ascii")
+    with span("base64.decode", len(data)):
+        return _b64decode(data, dtype, n_threads)
+
+
+def _b64decode(data: bytes, dtype: np.dtype, n_threads: int | None) -> np.ndarray:
+    n_groups = len(data) // 4
+    n = _n_threads(n_threads, n_groups)
+    if n == 1 or len(data) % 4 != 0:
+        return _b64decode_serial(data, dtype)
+
+    n_padding = len(data) - len(data.rstrip(b"="))
+    if n_padding > 2:
+        return _b64decode_serial(data, dtype)
+    encoded = np.frombuffer(data, dtype=np.uint8)
+    # Last group has the padding, it's decoded apart
+    n_full_groups = n_groups - 1 if n_padding > 0 else n_groups
+    n_bytes = n_groups * 3 - n_padding
+    out = np.empty((n_bytes,), dtype=np.uint8)
+    full_groups = _map_chunks(
+        _decode_groups, encoded[: n_full_groups * 4], out[: n_full_groups * 3], 4, 3, n
+    )
+    if not all(full_groups):
+        return _b64decode_serial(data, dtype)
+    if n_full_groups < n_groups:
+        try:
+            tail = binascii.a2b_base64(data[n_full_groups * 4 :])
+        except binascii.Error:
+            return _b64decode_serial(data, dtype)
+        out[n_full_groups * 3 :] = np.frombuffer(tail, dtype=np.uint8)
+    return out.view(dtype)
+
+
+def _b64decode_serial(data: bytes, dtype: np.dtype) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype=dtype)
@@ -1,20 +1,102 @@
 from __future__ import annotations
 
-import base64
-import io
+import logging
 import pathlib
+from collections.abc import AsyncIterator, Iterable, Iterator
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any, Literal
 
 import numpy as np
 
 from lnas import LnasGeometry
+from lnas.encoding import b64decode_array, b64encode_array
 from lnas.exceptions import LnasVersionError
-from lnas.stl import read_stl
-from lnas.utils import read_yaml, save_yaml
+from lnas.profiling import is_enabled, profiled, span
+from lnas.utils import map_in_workers, pickle_array, read_yaml, save_yaml, unpickle_array
+
+# Modules of features other than loading and saving are imported in the methods using them,
+# so workers only loading LNAS files don't import them
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from lnas.forces import SurfacesForces
+    from lnas.loading import LoadResult
+    from lnas.partition import LnasPartition
+    from lnas.section import CrossSection
 
 _SUPPORTED_MAJOR_VERSIONS = ("v0.5", "v0.4")
-_CURRENT_VERSION = "v0.5.2"
+# Version of LNAS files written
+CURRENT_VERSION = "v0.5.2"
+
+logger = logging.getLogger(__name__)
+
+
+def _remove_collapsed(
+    triangles: np.ndarray, normals: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Remove triangles collapsed by welding and their normals
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: triangles and normals kept, and number
+            of triangles kept before each triangle index (shape is (N + 1,)), to remap
+            ranges of triangles
+    """
+
+    from lnas.weld import collapsed_triangles
+
+    keep = ~collapsed_triangles(triangles)
+    n_kept = np.zeros((len(triangles) + 1,), dtype=np.int64)
+    np.cumsum(keep, out=n_kept[1:])
+    if n_kept[-1] < len(triangles):
+        logger.warning(f"{len(triangles) - n_kept[-1]} triangles removed due to welding")
+        triangles, normals = triangles[keep], normals[keep]
+    return triangles, normals, n_kept
+
+
+class _SurfacesDict(dict):
+    """Surfaces dict counting its changes, so the surfaces index knows when to rebuild"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.n_changes = 0
+
+    def _changed(self):
+        self.n_changes += 1
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
 
 
 @dataclass
@@ -23,6 +105,25 @@ class LagrangianNormalization:
     direction: str
 
 
+@dataclass
+class SurfacesIntegrals:
+    """Geometric integrals of surfaces. Arrays first dimension is the surface"""
+
+    # Surfaces names, in the same order as arrays
+    surfaces_names: list[str]
+    # Surfaces areas (shape is (Ns,))
+    area: np.ndarray
+    # Area weighted centroid (shape is (Ns, 3))
+    centroid: np.ndarray
+    # Sum of normals weighted by area (shape is (Ns, 3))
+    normal: np.ndarray
+    # Second moment of area about surface centroid, integral of (x - c)(x - c)^T dA
+    # (shape is (Ns, 3, 3))
+    second_moment: np.ndarray
+    # Area facing the direction, projected in a plane normal to it (shape is (Ns,))
+    projected_area: np.ndarray | None = None
+
+
 @dataclass
 class LnasFormat:
     """Lagrangian format description"""
@@ -31,6 +132,14 @@ class LnasFormat:
     geometry: LnasGeometry
     surfaces: dict[str, np.ndarray]
 
+    def __setattr__(self, name: str, value: Any):
+        if name == "surfaces":
+            # Surfaces changes are tracked to keep the surfaces index up to date
+            if not isinstance(value, _SurfacesDict):
+                value = _SurfacesDict(value)
+            self.__dict__.pop("_surfaces_index", None)
+        super().__setattr__(name, value)
+
     def __eq__(self, __o: object) -> bool:
         if not isinstance(self, type(__o)):
             return False
@@ -46,6 +155,12 @@ class LnasFormat:
                 return False
         return True
 
+    def __reduce_ex__(self, protocol: int):
+        # Surfaces are pickled as pickle 5 buffers. Geometry derived values are included
+        # with `geometry.pickle_derived`, and the surfaces index is recalculated
+        surfaces = {s: pickle_array(arr, protocol) for s, arr in self.surfaces.items()}
+        return _unpickle_lnas, (self.version, self.geometry, surfaces)
+
     def copy(self) -> LnasFormat:
         return LnasFormat(
             version=self.version,
@@ -53,11 +168,53 @@ class LnasFormat:
             surfaces={s: arr.copy() for s, arr in self.surfaces.items()},
         )
 
-    def geometry_from_surface(self, surface_name: str) -> LnasGeometry:
+    def compact_vertices(self) -> tuple[LnasFormat, np.ndarray]:
+        """Build LNAS keeping only the vertices referenced by triangles
+
+        Returns:
+            tuple[LnasFormat, np.ndarray]: compacted LNAS and the array with the
+                original vertices idxs (new vertex idx -> original vertex idx)
+        """
+
+        geometry, vertices_idxs = self.geometry.compact_vertices()
+        new_lnas = LnasFormat(
+            version=self.version,
+            geometry=geometry,
+            surfaces={s: arr.copy() for s, arr in self.surfaces.items()},
+        )
+        return new_lnas, vertices_idxs
+
+    def reorder(
+        self, curve: Literal["morton", "hilbert"] = "hilbert"
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Reorder vertices and triangles along a space filling curve, for memory locality
+
+        Surfaces are remapped to the new triangles idxs (and sorted).
+        The new order is kept when saving the LNAS.
+
+        Args:
+            curve (Literal["morton", "hilbert"], optional): Space filling curve.
+                Defaults to "hilbert".
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: vertices and triangles permutations
+                (new idx -> original idx)
+        """
+
+        vertices_perm, triangles_perm = self.geometry.reorder(curve=curve)
+
+        triangles_remap = np.empty((len(triangles_perm),), dtype=np.uint32)
+        triangles_remap[triangles_perm] = np.arange(len(triangles_perm), dtype=np.uint32)
+        self.surfaces = {s: np.sort(triangles_remap[arr]) for s, arr in self.surfaces.items()}
+
+        return vertices_perm, triangles_perm
+
+    def geometry_from_surface(self, surface_name: str, compact: bool = True) -> LnasGeometry:
         """Build LNAS geometry from a surface
 
         Args:
             surface_name (str): Surface name
+            compact (bool, optional): Keep only vertices used by the surface. Defaults to True.
 
         Returns:
             LnasGeometry: Geometry representing surface
@@ -68,37 +225,291 @@ class LnasFormat:
                 + f"Available ones are {list(self.surfaces.keys())}"
             )
 
-        triangles_idxs = self.surfaces[surface_name].copy()
-        triangles = self.geometry.triangles[triangles_idxs].copy()
-        vertices = self.geometry.vertices.copy()
-        return LnasGeometry(vertices=vertices, triangles=triangles)
+        triangles_idxs = self.surfaces[surface_name]
+        return self.geometry.filter_triangles(triangles_idxs, compact=compact)
 
     def geometry_from_list_surfaces(
-        self, surfaces_names: list[str]
+        self, surfaces_names: list[str], compact: bool = True
     ) -> tuple[LnasGeometry, np.ndarray]:
         """Build geometry from list of surfaces
 
         Args:
             surfaces_names (list[str]): List of surfaces names to include
+            compact (bool, optional): Keep only vertices used by the surfaces. Defaults to True.
 
         Returns:
             tuple[LnasGeometry, np.ndarray]: geometry and the array with the original triangle idxs
         """
-        triangles_use = np.zeros((len(self.geometry.triangles),), dtype=bool)
+        # Index of triangles in original LNAS
+        tri_idxs = self.surfaces_union(surfaces_names)
+
+        geometry = self.geometry.filter_triangles(tri_idxs, compact=compact)
+        geometry._full_update()
+
+        return (geometry, tri_idxs)
+
+    def _check_surfaces(self, surfaces_names: list[str]):
         for s in surfaces_names:
             if s not in self.surfaces:
                 raise KeyError(f"Surface named {s} not in LNAS")
-            s_tri_idxs = self.surfaces[s]
-            triangles_use[s_tri_idxs] = True
 
-        # Index of triangles in original LNAS
-        tri_idxs = np.arange(len(self.geometry.triangles), dtype=np.uint32)
-        tri_idxs = tri_idxs[triangles_use]
+    def _surfaces_index_key(self) -> tuple[int, int]:
+        return (len(self.geometry.triangles), self.surfaces.n_changes)
 
-        lnas_filtered = self.filter_triangles(triangles_use)
-        lnas_filtered.geometry._full_update()
+    def invalidate_surfaces_index(self):
+        """Rebuild the triangles surfaces index on next access
 
-        return (lnas_filtered.geometry, tri_idxs)
+        The index is rebuilt when `surfaces` is assigned, a surface is added, replaced or
+        removed, or the number of triangles changes. Call it after changing surfaces arrays
+        (or triangles) in place.
+        """
+
+        self.__dict__.pop("_surfaces_index", None)
+
+    def _update_surfaces_index(self):
+        n_triangles = len(self.geometry.triangles)
+        lengths = [len(arr) for arr in self.surfaces.values()]
+        surfaces_triangles = np.concatenate(
+            [np.asarray(arr, dtype=np.int64) for arr in self.surfaces.values()]
+            + [np.empty((0,), dtype=np.int64)]
+        )
+        surfaces_labels = np.repeat(np.arange(len(lengths), dtype=np.int32), lengths)
+
+        # CSR representation, triangle t is in surfaces labels[indptr[t] : indptr[t + 1]]
+        counts = np.bincount(surfaces_triangles, minlength=n_triangles)
+        indptr = np.zeros((n_triangles + 1,), dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        order = np.argsort(surfaces_triangles, kind="stable")
+
+        self._surfaces_index = (self._surfaces_index_key(), indptr, surfaces_labels[order])
+
+    @property
+    def triangles_surfaces(self) -> tuple[np.ndarray, np.ndarray]:
+        """Surfaces of each triangle, in CSR format
+
+        Surfaces of triangle t are `labels[indptr[t] : indptr[t + 1]]`, where labels are
+        the surfaces positions in `surfaces` keys. The index is cached, call
+        `invalidate_surfaces_index` after changing surfaces arrays in place.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: indptr (shape (Nt + 1,)) and labels
+        """
+        if (
+            not hasattr(self, "_surfaces_index")
+            or self._surfaces_index[0] != self._surfaces_index_key()
+        ):
+            self._update_surfaces_index()
+        _, indptr, labels = self._surfaces_index
+        return indptr, labels
+
+    @property
+    def triangles_labels(self) -> np.ndarray:
+        """Label of the first surface of each triangle, -1 for triangles with no surface
+
+        Labels are the surfaces positions in `surfaces` keys.
+        """
+        indptr, labels = self.triangles_surfaces
+        has_surface = indptr[1:] > indptr[:-1]
+        triangles_labels = np.full((len(indptr) - 1,), -1, dtype=np.int32)
+        triangles_labels[has_surface] = labels[indptr[:-1][has_surface]]
+        return triangles_labels
+
+    def surfaces_of_triangle(self, triangle_idx: int) -> list[str]:
+        """Names of the surfaces that a triangle belongs to
+
+        Args:
+            triangle_idx (int): Triangle index
+
+        Returns:
+            list[str]: surfaces names
+        """
+        indptr, labels = self.triangles_surfaces
+        surfaces_names = list(self.surfaces.keys())
+        return [
+            surfaces_names[lbl] for lbl in labels[indptr[triangle_idx] : indptr[triangle_idx + 1]]
+        ]
+
+    def _surfaces_segments(self, surfaces_names: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        # Surfaces triangles concatenated and the position of its surface in surfaces_names
+        self._check_surfaces(surfaces_names)
+        arrs = [np.asarray(self.surfaces[s], dtype=np.int64) for s in surfaces_names]
+        triangles_idxs = np.concatenate(arrs + [np.empty((0,), dtype=np.int64)])
+        labels = np.repeat(np.arange(len(arrs)), [len(arr) for arr in arrs])
+        return triangles_idxs, labels
+
+    def surfaces_integrals(
+        self,
+        direction: tuple[float, float, float] | np.ndarray | None = None,
+        surfaces_names: list[str] | None = None,
+    ) -> SurfacesIntegrals:
+        """Geometric integrals of all surfaces, calculated in a single pass
+
+        Triangles integrals are summed per surface, using the geometry areas and normals.
+
+        Args:
+            direction (tuple[float, float, float] | np.ndarray | None, optional): Direction
+                (e.g. wind direction) to calculate projected area. Triangles with normal
+                against it are considered. Defaults to None.
+            surfaces_names (list[str] | None, optional): Surfaces to calculate.
+                Defaults to None (all surfaces).
+
+        Returns:
+            SurfacesIntegrals: surfaces integrals
+        """
+
+        if surfaces_names is None:
+            surfaces_names = list(self.surfaces.keys())
+        n_surfaces = len(surfaces_names)
+        triangles_idxs, labels = self._surfaces_segments(surfaces_names)
+
+        def segment_sum(values: np.ndarray) -> np.ndarray:
+            # Sum values of each surface, values last dimensions are kept
+            values_flat = values.reshape((len(labels), -1))
+            sums = [
+                np.bincount(labels, weights=values_flat[:, i], minlength=n_surfaces)
+                for i in range(values_flat.shape[1])
+            ]
+            return np.stack(sums, axis=-1).reshape((n_surfaces, *values.shape[1:]))
+
+        geometry = self.geometry
+        areas = geometry.areas[triangles_idxs].astype(np.float64)
+        normals = geometry.normals[triangles_idxs].astype(np.float64)
+        triangles_vertices = geometry.vertices[geometry.triangles[triangles_idxs]].astype(
+            np.float64
+        )
+        vertices_sum = triangles_vertices.sum(axis=1)
+
+        area = np.bincount(labels, weights=areas, minlength=n_surfaces)
+        first_moment = segment_sum(areas[:, None] * vertices_sum / 3)
+        centroid = np.zeros((n_surfaces, 3), dtype=np.float64)
+        np.divide(first_moment, area[:, None], out=centroid, where=area[:, None] > 0)
+        normal = segment_sum(areas[:, None] * normals)
+
+        # Triangle second moment is A/12 * (sum(v_k v_k^T) + s s^T), with s the vertices sum
+        outer_vertices = np.einsum("tki,tkj->tij", triangles_vertices, triangles_vertices)
+        outer_sum = np.einsum("ti,tj->tij", vertices_sum, vertices_sum)
+        second_moment = segment_sum(areas[:, None, None] / 12 * (outer_vertices + outer_sum))
+        second_moment -= area[:, None, None] * np.einsum("si,sj->sij", centroid, centroid)
+
+        projected_area = None
+        if direction is not None:
+            direction_arr = np.asarray(direction, dtype=np.float64)
+            direction_arr = direction_arr / np.linalg.norm(direction_arr)
+            facing = np.maximum(-(normals @ direction_arr), 0)
+            projected_area = np.bincount(labels, weights=areas * facing, minlength=n_surfaces)
+
+        return SurfacesIntegrals(
+            surfaces_names=list(surfaces_names),
+            area=area,
+            centroid=centroid,
+            normal=normal,
+            second_moment=second_moment,
+            projected_area=projected_area,
+        )
+
+    def surfaces_forces(
+        self,
+        pressure: np.ndarray | pathlib.Path,
+        moment_center: tuple[float, float, float] = (0, 0, 0),
+        reference_area: float = 1,
+        reference_length: float = 1,
+        surfaces_names: list[str] | None = None,
+        chunk_size: int | None = None,
+        n_workers: int | None = None,
+    ) -> SurfacesForces:
+        """Integrate triangles pressure (coefficients) time series into surfaces forces
+
+        The time series is streamed in chunks of time steps, each one projected into
+        triangles normals and areas and summed per surface.
+        Forces are divided by `reference_area` and moments by `reference_area * reference_length`,
+        so pressure coefficients give forces and moments coefficients.
+
+        Args:
+            pressure (np.ndarray | pathlib.Path): Triangles pressure time series, shape (T, Nt).
+                It may be an array, a memmap or a `.npy` filename (opened as memmap).
+            moment_center (tuple[float, float, float], optional): Point to calculate moments
+                about. Defaults to (0, 0, 0).
+            reference_area (float, optional): Reference area. Defaults to 1.
+            reference_length (float, optional): Reference length for moments. Defaults to 1.
+            surfaces_names (list[str] | None, optional): Surfaces to integrate.
+                Defaults to None (all surfaces).
+            chunk_size (int | None, optional): Number of time steps read at a time.
+                Defaults to None (chunks of about 64 MB).
+            n_workers (int | None, optional): Number of processes to split time steps, requires
+                pressure as a `.npy` filename or memmap. Defaults to None (no processes).
+
+        Returns:
+            SurfacesForces: forces and moments of surfaces, shapes (T, Ns, 3)
+        """
+
+        if surfaces_names is None:
+            surfaces_names = list(self.surfaces.keys())
+        triangles_idxs, labels = self._surfaces_segments(surfaces_names)
+
+        from lnas.forces import SurfacesForces, integrate_surfaces
+
+        geometry = self.geometry
+        centroids = geometry.vertices[geometry.triangles].mean(axis=1)
+        forces, moments = integrate_surfaces(
+            pressure,
+            triangles_idxs=triangles_idxs,
+            labels=labels,
+            n_surfaces=len(surfaces_names),
+            areas=geometry.areas,
+            normals=geometry.normals,
+            centroids=centroids,
+            moment_center=np.asarray(moment_center, dtype=np.float64),
+            chunk_size=chunk_size,
+            n_workers=n_workers,
+        )
+        forces /= reference_area
+        moments /= reference_area * reference_length
+
+        return SurfacesForces(surfaces_names=list(surfaces_names), forces=forces, moments=moments)
+
+    def surfaces_union(self, surfaces_names: list[str]) -> np.ndarray:
+        """Triangles in any of the surfaces
+
+        Args:
+            surfaces_names (list[str]): Surfaces names
+
+        Returns:
+            np.ndarray: sorted triangles idxs
+        """
+        self._check_surfaces(surfaces_names)
+        arrs = [self.surfaces[s] for s in surfaces_names]
+        return np.unique(np.concatenate(arrs + [np.empty(0, dtype=np.uint32)])).astype(np.uint32)
+
+    def surfaces_intersection(self, surfaces_names: list[str]) -> np.ndarray:
+        """Triangles in all of the surfaces
+
+        Args:
+            surfaces_names (list[str]): Surfaces names
+
+        Returns:
+            np.ndarray: sorted triangles idxs
+        """
+        self._check_surfaces(surfaces_names)
+        if len(surfaces_names) == 0:
+            return np.empty((0,), dtype=np.uint32)
+        triangles_idxs = np.unique(self.surfaces[surfaces_names[0]])
+        for s in surfaces_names[1:]:
+            triangles_idxs = np.intersect1d(triangles_idxs, self.surfaces[s])
+        return triangles_idxs.astype(np.uint32)
+
+    def surfaces_difference(self, surface_name: str, surfaces_names: list[str]) -> np.ndarray:
+        """Triangles in a surface that are not in any of the other surfaces
+
+        Args:
+            surface_name (str): Surface to take triangles from
+            surfaces_names (list[str]): Surfaces whose triangles are removed
+
+        Returns:
+            np.ndarray: sorted triangles idxs
+        """
+        self._check_surfaces([surface_name])
+        triangles_remove = self.surfaces_union(surfaces_names)
+        return np.setdiff1d(self.surfaces[surface_name], triangles_remove).astype(np.uint32)
 
     @classmethod
     def from_dct(cls, dct: dict[str, Any]) -> LnasFormat:
@@ -112,9 +523,7 @@ class LnasFormat:
         geometry = LnasGeometry.from_dct(dct["geometry"])
         surfaces: dict[str, np.ndarray] = {}
         for surface_name, surface_b64 in dct["surfaces"].items():
-            surface_bytes = base64.b64decode(surface_b64)
-            surface_arr = np.frombuffer(surface_bytes, dtype=np.uint32)
-            surfaces[surface_name] = surface_arr
+            surfaces[surface_name] = b64decode_array(surface_b64, np.uint32)
 
         return LnasFormat(
             version=version,
@@ -130,9 +539,7 @@ class LnasFormat:
         dct["geometry"] = self.geometry.to_dct()
         dct["surfaces"] = {}
         for surface_name, surface_arr in self.surfaces.items():
-            surface_bytes = surface_arr.astype(np.uint32).tobytes(order="C")
-            surface_b64 = base64.b64encode(surface_bytes)
-            dct["surfaces"][surface_name] = str(surface_b64, encoding="utf-8")
+            dct["surfaces"][surface_name] = b64encode_array(surface_arr, np.uint32)
 
         return dct
 
@@ -150,53 +557,198 @@ class LnasFormat:
         if check_normals:
             geometry.correct_inverted_normals(normals)
 
-        return cls(version=_CURRENT_VERSION, geometry=geometry, surfaces={})
+        return cls(version=CURRENT_VERSION, geometry=geometry, surfaces={})
 
     @classmethod
-    def from_stl(cls, filename: pathlib.Path) -> LnasFormat:
+    @profiled("lnas.from_stl")
+    def from_stl(
+        cls,
+        filename: pathlib.Path,
+        weld_tolerance: float | None = None,
+        relative_tolerance: bool = False,
+    ) -> LnasFormat:
         """Load lagrangian format from STL file.
 
         Matches the behaviour of the Rust stl2lnas command:
         - Degenerate triangles (area < 1e-5) are discarded.
         - Vertices are deduplicated with 5-decimal-place precision.
         - A surface entry keyed by the file stem is added.
+
+        ASCII STL files are detected and each `solid <name>` block is added as its own
+        surface (unnamed solids are keyed by the file stem).
+
+        Args:
+            filename (pathlib.Path): STL filename
+            weld_tolerance (float | None, optional): Distance to merge vertices instead of
+                5-decimal-place deduplication. Defaults to None.
+            relative_tolerance (bool, optional): `weld_tolerance` is relative to the geometry
+                bounding box diagonal. Defaults to False.
         """
 
-        with open(filename, "rb") as f:
-            triangles, normals = read_stl(io.BytesIO(f.read()))
+        from lnas.stl import read_stl_solids
+        from lnas.weld import weld_vertices
 
         # 1. Filter degenerate triangles (area < 1e-5)
-        e1 = triangles[:, 1] - triangles[:, 0]
-        e2 = triangles[:, 2] - triangles[:, 0]
-        areas = np.linalg.norm(np.cross(e1, e2), axis=1) / 2.0
-        valid = areas >= 1e-5
-        triangles = triangles[valid]
-        normals = normals[valid]
-
-        # 2. Deduplicate vertices with 5-decimal precision (matches Rust HashSet hashing)
+        with span("stl.read") as s:
+            if is_enabled():
+                s.add_bytes(pathlib.Path(filename).stat().st_size)
+            solids = read_stl_solids(filename)
+        triangles = np.concatenate([t for _, t, _ in solids])
+        normals = np.concatenate([n for _, _, n in solids])
+
+        # 2. Deduplicate vertices (5-decimal precision matches Rust HashSet hashing)
         n_triangles = triangles.shape[0]
         flat_verts = triangles.reshape((n_triangles * 3, 3)).astype(np.float32)
-        rounded = np.round(flat_verts, 5)
-        contiguous = np.ascontiguousarray(rounded)
-        void_view = contiguous.view(np.dtype((np.void, contiguous.dtype.itemsize * 3))).ravel()
-        _, unique_idx, inverse_idx = np.unique(void_view, return_index=True, return_inverse=True)
+        with span("stl.weld", flat_verts.nbytes):
+            unique_idx, inverse_idx = weld_vertices(
+                flat_verts, tolerance=weld_tolerance, relative=relative_tolerance
+            )
 
         unique_verts = flat_verts[unique_idx]
         tri_indices = inverse_idx.reshape((n_triangles, 3)).astype(np.uint32)
 
-        # 3. Build geometry and fix normals
+        # 3. Remove triangles collapsed by welding, with their normals
+        tri_indices, normals, n_kept = _remove_collapsed(tri_indices, normals)
+
+        # 4. Build geometry and fix normals
         geometry = LnasGeometry(vertices=unique_verts, triangles=tri_indices)
         geometry.correct_inverted_normals(normals)
 
-        # 4. Surface named after file stem, covering all triangles
-        surface_indices = np.arange(n_triangles, dtype=np.uint32)
-        return cls(
-            version=_CURRENT_VERSION,
-            geometry=geometry,
-            surfaces={filename.stem: surface_indices},
+        # 5. Surface for each solid, solids with the same name are joined.
+        # Kept triangles are in the same order, so each solid is still a range
+        surfaces: dict[str, np.ndarray] = {}
+        solid_start = 0
+        for name, solid_triangles, _ in solids:
+            solid_end = solid_start + len(solid_triangles)
+            solid_idxs = np.arange(n_kept[solid_start], n_kept[solid_end], dtype=np.uint32)
+            surfaces[name] = np.concatenate((surfaces.get(name, []), solid_idxs)).astype(np.uint32)
+            solid_start = solid_end
+        return cls(version=CURRENT_VERSION, geometry=geometry, surfaces=surfaces)
+
+    @classmethod
+    def from_stl_files(
+        cls,
+        files: dict[str, pathlib.Path | str] | list[pathlib.Path | str],
+        weld_tolerance: float | None = None,
+        n_workers: int | None = None,
+    ) -> LnasFormat:
+        """Load lagrangian format from multiple STL files, with one surface per file
+
+        Matches the behaviour of the Rust stl2lnas command with `--dir` and `--file`:
+        surfaces are named after the files stems and their triangles are added in
+        surfaces names order. Vertices are deduplicated across all files.
+
+        Files are read in worker processes while the ones already read are welded, so
+        only the welded vertices and the files being read are kept in memory.
+
+        Args:
+            files (dict[str, pathlib.Path | str] | list[pathlib.Path | str]): Map from
+                surface name to STL filename, or list of STL filenames and directories
+            weld_tolerance (float | None, optional): Distance to merge vertices instead of
+                5-decimal-place deduplication. Defaults to None.
+            n_workers (int | None, optional): Number of processes reading files.
+                Defaults to None (no processes).
+        """
+
+        from lnas.stl import find_stl_files, read_stl_valid
+        from lnas.weld import VertexWelder
+
+        stl_files = find_stl_files(files)
+        if len(stl_files) == 0:
+            raise ValueError("No STL file to load")
+        surfaces_names = sorted(stl_files.keys())
+        filenames = [stl_files[s] for s in surfaces_names]
+
+        welder = VertexWelder(tolerance=weld_tolerance)
+        groups_ids, normals, files_start = [], [], [0]
+        for file_triangles, file_normals in map_in_workers(
+            read_stl_valid, filenames, n_workers=n_workers
+        ):
+            file_ids = welder.add(file_triangles.reshape((-1, 3)))
+            groups_ids.append(file_ids.reshape((-1, 3)))
+            normals.append(file_normals)
+            files_start.append(files_start[-1] + len(file_triangles))
+
+        vertices = welder.welded_positions().astype(np.float32)
+        _, groups_remap = welder.finalize()
+        triangles = groups_remap[np.concatenate(groups_ids)].astype(np.uint32)
+        triangles, normals, n_kept = _remove_collapsed(triangles, np.concatenate(normals))
+
+        geometry = LnasGeometry(vertices=vertices, triangles=triangles)
+        geometry.correct_inverted_normals(normals)
+
+        # Kept triangles are in the same order, so each file is still a range
+        surfaces = {
+            name: np.arange(n_kept[start], n_kept[end], dtype=np.uint32)
+            for name, start, end in zip(surfaces_names, files_start[:-1], files_start[1:])
+        }
+        return cls(version=CURRENT_VERSION, geometry=geometry, surfaces=surfaces)
+
+    @classmethod
+    def from_heightfield(
+        cls,
+        heights: np.ndarray | pathlib.Path | str,
+        spacing: float | tuple[float, float],
+        origin: tuple[float, float, float] = (0, 0, 0),
+        surface_name: str = "terrain",
+        tile_size: int | tuple[int, int] | None = None,
+        flat_tolerance: float | None = None,
+        flat_block: int = 8,
+    ) -> LnasFormat:
+        """Build lagrangian format from a heights grid (DEM)
+
+        Point (i, j) is at `origin + (i * spacing[0], j * spacing[1], heights[i, j])`.
+        Triangles normals point up.
+
+        Args:
+            heights (np.ndarray | pathlib.Path | str): Heights grid (shape (Nx, Ny)). It may
+                be an array, a memmap or a `.npy` filename, opened as memmap.
+            spacing (float | tuple[float, float]): Grid spacing in x and y
+            origin (tuple[float, float, float], optional): Position of point (0, 0) at
+                height 0. Defaults to (0, 0, 0).
+            surface_name (str, optional): Surface name, or prefix of tiles surfaces.
+                Defaults to "terrain".
+            tile_size (int | tuple[int, int] | None, optional): Cells in each direction of
+                tiles, saved as surfaces "{surface_name}_{i}_{j}". Defaults to None (one
+                surface).
+            flat_tolerance (float | None, optional): Maximum heights range of blocks
+                simplified with fewer triangles. Defaults to None (no simplification).
+            flat_block (int, optional): Cells in each direction of blocks to simplify.
+                Must be even. Defaults to 8.
+        """
+
+        from lnas.terrain import heightfield_geometry, open_heightfield
+
+        heights = open_heightfield(heights)
+        spacing = (spacing, spacing) if np.isscalar(spacing) else tuple(spacing)
+        geometry, triangles_cells = heightfield_geometry(
+            heights, spacing, origin, flat_tolerance=flat_tolerance, flat_block=flat_block
+        )
+        n_triangles = len(geometry.triangles)
+        if tile_size is None:
+            surfaces = {surface_name: np.arange(n_triangles, dtype=np.uint32)}
+            return cls(version=CURRENT_VERSION, geometry=geometry, surfaces=surfaces)
+
+        tile_size = (tile_size, tile_size) if np.isscalar(tile_size) else tuple(tile_size)
+        if flat_tolerance is not None and (tile_size[0] % flat_block or tile_size[1] % flat_block):
+            raise ValueError("Tile size must be a multiple of flat block")
+        n_tiles_y = -(-(heights.shape[1] - 1) // tile_size[1])
+        tiles_labels = (triangles_cells[:, 0] // tile_size[0]) * n_tiles_y + (
+            triangles_cells[:, 1] // tile_size[1]
         )
+        triangles_idxs = np.argsort(tiles_labels, kind="stable").astype(np.uint32)
+        tiles_counts = np.bincount(tiles_labels)
+        labels = np.flatnonzero(tiles_counts)
+        surfaces = {
+            f"{surface_name}_{lbl // n_tiles_y}_{lbl % n_tiles_y}": arr
+            for lbl, arr in zip(
+                labels, np.split(triangles_idxs, np.cumsum(tiles_counts[labels])[:-1])
+            )
+        }
+        return cls(version=CURRENT_VERSION, geometry=geometry, surfaces=surfaces)
 
     @classmethod
+    @profiled("lnas.from_file")
     def from_file(cls, filename: pathlib.Path) -> LnasFormat:
         """Load lagrangian format from file"""
 
@@ -209,6 +761,52 @@ class LnasFormat:
         except Exception as e:
             raise ValueError(f"Unable to read LNAS file {filename}") from e
 
+    @classmethod
+    def load_many(
+        cls,
+        filenames: Iterable[pathlib.Path | str],
+        executor: Executor | None = None,
+        max_concurrency: int = 8,
+    ) -> Iterator[LoadResult]:
+        """Load LNAS (or STL) files concurrently, giving results as they complete
+
+        Files are read and decoded in worker threads (or in processes, with a process
+        executor), with at most `max_concurrency` files loading at a time. A file failing to
+        load gives a result with its error, without stopping the others.
+
+        Args:
+            filenames (Iterable[pathlib.Path | str]): Files to load
+            executor (Executor | None, optional): Executor to load files in.
+                Defaults to None (threads pool of `max_concurrency` workers).
+            max_concurrency (int, optional): Maximum files loading at a time. Defaults to 8.
+
+        Yields:
+            Iterator[LoadResult]: result of each file (`value` is the LNAS, or `error` the
+                exception raised), in completion order
+        """
+
+        from lnas.loading import load_many
+
+        return load_many(cls.from_file, filenames, executor, max_concurrency)
+
+    @classmethod
+    def load_many_async(
+        cls,
+        filenames: Iterable[pathlib.Path | str],
+        executor: Executor | None = None,
+        max_concurrency: int = 8,
+    ) -> AsyncIterator[LoadResult]:
+        """Load LNAS (or STL) files concurrently without blocking the event loop
+
+        Same as `load_many`, as an async iterator: `async for result in load_many_async(...)`.
+        Defaults to the event loop default executor.
+        """
+
+        from lnas.loading import load_many_async
+
+        return load_many_async(cls.from_file, filenames, executor, max_concurrency)
+
+    @profiled("lnas.to_file")
     def to_file(self, filename: pathlib.Path):
         """Save lagrangian format to file"""
 
@@ -224,56 +822,187 @@ class LnasFormat:
 
         self.geometry.export_stl(filename)
 
-    def filter_triangles(self, triangles_use: np.ndarray) -> LnasFormat:
+    @profiled("lnas.filter_triangles")
+    def filter_triangles(self, triangles_use: np.ndarray, compact: bool = False) -> LnasFormat:
         """Filter triangles of LNAS
 
         Args:
-            triangles_use (np.ndarray): bool array of triangles to use
+            triangles_use (np.ndarray): bool array of triangles to use or array of triangles idxs
+                to use. Filtered triangles follow the order of the idxs array.
+            compact (bool, optional): Remove vertices not used by the filtered triangles.
+                Defaults to False.
 
         Returns:
             LnasFormat: New LNAS with surfaces and geometry filtered
         """
 
-        if len(triangles_use) != self.geometry.triangles.shape[0]:
-            raise ValueError(
-                "Invalid number of triangles to filter. "
-                + f"{len(triangles_use)} != {self.geometry.triangles.shape[0]}"
-            )
+        n_triangles = self.geometry.triangles.shape[0]
+        triangles_use = np.asarray(triangles_use)
+        if triangles_use.dtype == bool:
+            if len(triangles_use) != n_triangles:
+                raise ValueError(
+                    "Invalid number of triangles to filter. "
+                    + f"{len(triangles_use)} != {n_triangles}"
+                )
+            triangles_idxs = np.flatnonzero(triangles_use)
+            # New index of each kept triangle is the number of kept triangles before it
+            triangles_remap = np.cumsum(triangles_use, dtype=np.int64) - 1
+            triangles_remap[~triangles_use] = -1
+        else:
+            triangles_idxs = triangles_use.astype(np.int64, copy=False)
+            if len(triangles_idxs) > 0 and (
+                triangles_idxs.min() < 0 or triangles_idxs.max() >= n_triangles
+            ):
+                raise ValueError(f"Triangles idxs to filter must be in range [0, {n_triangles})")
+            triangles_remap = np.full((n_triangles,), -1, dtype=np.int64)
+            triangles_remap[triangles_idxs] = np.arange(len(triangles_idxs), dtype=np.int64)
+            if np.count_nonzero(triangles_remap >= 0) != len(triangles_idxs):
+                raise ValueError("Triangles idxs to filter must not be repeated")
+
+        new_geometry = self.geometry.filter_triangles(triangles_idxs, compact=compact)
+        new_surfaces = self._remap_surfaces(triangles_remap)
+
+        return LnasFormat(version=self.version, geometry=new_geometry, surfaces=new_surfaces)
+
+    def clip(
+        self,
+        start: tuple[float, ...] | None = None,
+        end: tuple[float, ...] | None = None,
+        planes: list[tuple[np.ndarray, np.ndarray]] | None = None,
+    ) -> LnasFormat:
+        """Clip LNAS to a box and/or to planes
 
-        geometry = self.geometry
-        filtered_triangles = geometry.triangles[triangles_use].copy()
-
-        new_geometry = self.geometry.copy()
-        new_geometry.triangles = filtered_triangles
-        new_geometry._full_update()
-
-        # Build offset of filtered triangles considering past ones
-        offset = 0
-        offsets_arr = np.zeros((triangles_use.shape[0],), dtype=np.int32)
-        for idx, v in enumerate(triangles_use):
-            if not v:
-                offset += 1
-            else:
-                offsets_arr[idx] = offset
-
-        # Filter surfaces
+        Triangles crossing the box faces or planes are split, and the new triangles
+        belong to the same surfaces as the original one.
+
+        Args:
+            start (tuple[float, ...] | None, optional): Box start. Defaults to None.
+            end (tuple[float, ...] | None, optional): Box end. Defaults to None.
+            planes (list[tuple[np.ndarray, np.ndarray]] | None, optional): Planes as
+                (point, normal), keeping the side the normal points to. Defaults to None.
+
+        Returns:
+            LnasFormat: New LNAS with the geometry inside the box and planes
+        """
+
+        new_geometry, parents = self.geometry.clip(start=start, end=end, planes=planes)
+
+        # Parents are sorted, so triangles from each original one are a contiguous range
         new_surfaces = {}
         for s, arr in self.surfaces.items():
-            filtered_arr = np.extract(triangles_use[arr], arr).astype(np.int32)
-            filtered_offset_arr = offsets_arr[filtered_arr].astype(np.int32)
-            filtered_arr -= filtered_offset_arr
-            new_surfaces[s] = filtered_arr
+            first = np.searchsorted(parents, arr, side="left")
+            counts = np.searchsorted(parents, arr, side="right") - first
+            offsets = np.cumsum(counts) - counts
+            idxs = np.repeat(first - offsets, counts) + np.arange(counts.sum())
+            new_surfaces[s] = np.sort(idxs).astype(np.uint32)
+
+        return LnasFormat(version=self.version, geometry=new_geometry, surfaces=new_surfaces)
+
+    def cross_sections(
+        self,
+        normal: tuple[float, ...],
+        offsets: float | list[float] | np.ndarray = 0,
+        origin: tuple[float, ...] = (0, 0, 0),
+    ) -> list[CrossSection]:
+        """Intersect LNAS with one plane or a stack of parallel planes
 
-        new_lnas = LnasFormat(version=self.version, geometry=new_geometry, surfaces=new_surfaces)
+        Same as `LnasGeometry.cross_sections`, with segments tagged by the first
+        surface of their triangle (see `triangles_labels`).
 
-        return new_lnas
+        Args:
+            normal (tuple[float, ...]): Planes normal
+            offsets (float | list[float] | np.ndarray, optional): Planes offsets along
+                normal. Defaults to 0.
+            origin (tuple[float, ...], optional): Planes origin. Defaults to (0, 0, 0).
 
-    def join(self, lnas_fmts: list[LnasFormat], surfaces_suffixes: list[str] | None):
+        Returns:
+            list[CrossSection]: cross section of each plane, in the same order as offsets
+        """
+
+        sections = self.geometry.cross_sections(normal, offsets=offsets, origin=origin)
+        triangles_labels = self.triangles_labels
+        surfaces_names = list(self.surfaces.keys())
+        for section in sections:
+            section.surfaces_labels = triangles_labels[section.triangles_idxs]
+            section.surfaces_names = surfaces_names
+        return sections
+
+    def _remap_surfaces(self, triangles_remap: np.ndarray) -> dict[str, np.ndarray]:
+        # triangles_remap maps each triangle to its new index, or -1 if it was removed
+        new_surfaces = {}
+        for s, arr in self.surfaces.items():
+            arr_remap = triangles_remap[arr]
+            new_surfaces[s] = arr_remap[arr_remap >= 0].astype(np.uint32)
+        return new_surfaces
+
+    def weld_vertices(self, tolerance: float, relative: bool = False):
+        """Merge vertices that are coincident up to a tolerance
+
+        Triangles that collapse are removed from geometry and surfaces.
+
+        Args:
+            tolerance (float): Distance used to consider vertices coincident
+            relative (bool, optional): Tolerance is relative to the geometry bounding box
+                diagonal. Defaults to False.
+        """
+
+        n_triangles = len(self.geometry.triangles)
+        triangles_idxs = self.geometry.weld_vertices(tolerance, relative=relative)
+        if len(triangles_idxs) < n_triangles:
+            triangles_remap = np.full((n_triangles,), -1, dtype=np.int64)
+            triangles_remap[triangles_idxs] = np.arange(len(triangles_idxs), dtype=np.int64)
+            self.surfaces = self._remap_surfaces(triangles_remap)
+
+    def partition(
+        self,
+        n_parts: int | None = None,
+        boxes: list[tuple[np.ndarray, np.ndarray]] | None = None,
+        method: Literal["slab", "bisection"] = "bisection",
+        halo: float = 0,
+        axis: int | None = None,
+    ) -> list[LnasPartition]:
+        """Split LNAS in spatial partitions, for domain decomposition
+
+        Each partition is compacted and keeps the maps between its local and the global
+        triangles and vertices. Use `lnas.partition.save_partitions` to save them.
+
+        Args:
+            n_parts (int | None, optional): Number of partitions, balanced by triangles
+                centroids. Defaults to None (`boxes` must be given).
+            boxes (list[tuple[np.ndarray, np.ndarray]] | None, optional): Partitions boxes
+                (start, end). Defaults to None.
+            method (Literal["slab", "bisection"], optional): Method to split in `n_parts`.
+                Defaults to "bisection".
+            halo (float, optional): Halo width around each partition box. Defaults to 0.
+            axis (int | None, optional): Axis to split slabs. Defaults to None (longest axis).
+
+        Returns:
+            list[LnasPartition]: partitions
+        """
+
+        from lnas.partition import partition_boxes, partition_lnas
+
+        if (n_parts is None) == (boxes is None):
+            raise ValueError("Either number of partitions or boxes must be given")
+        if boxes is None:
+            centroids = self.geometry.vertices[self.geometry.triangles].mean(axis=1)
+            boxes = partition_boxes(centroids, n_parts, method=method, axis=axis)
+        return partition_lnas(self, boxes, halo=halo)
+
+    @profiled("lnas.join")
+    def join(
+        self,
+        lnas_fmts: list[LnasFormat],
+        surfaces_suffixes: list[str] | None = None,
+        weld_tolerance: float | None = None,
+    ):
         """Join into this LNAS a list of other LNAS
 
         Args:
             lnas_fmts (list[LnasFormat]): List of LnasFormat to be combined
             surfaces_suffixes (list[str] | None, optional): Optional suffix list to add to each lnas. Defaults to None.
+            weld_tolerance (float | None, optional): Merge vertices across bodies closer than
+                this tolerance. Defaults to None (no welding).
         """
 
         if len(lnas_fmts) < 1:
@@ -283,26 +1012,32 @@ class LnasFormat:
             if len(surfaces_suffixes) < len(lnas_fmts):
                 raise ValueError("Less surfaces suffixes than required")
 
+        # Surfaces are checked before modifying this LNAS
+        new_surfaces = dict(self.surfaces)
+        tri_offset = len(self.geometry.triangles)
         for i, lnas_fmt in enumerate(lnas_fmts):
-            n_verts, n_tris = len(self.geometry.vertices), len(self.geometry.triangles)
-
-            verts_add = lnas_fmt.geometry.vertices.copy()
-            self.geometry.vertices = np.concatenate(
-                (self.geometry.vertices.copy(), verts_add), axis=0
-            )
-
-            tri_add = lnas_fmt.geometry.triangles + n_verts
-            self.geometry.triangles = np.concatenate(
-                (self.geometry.triangles.copy(), tri_add), axis=0
-            )
-
             suffix = surfaces_suffixes[i] if surfaces_suffixes is not None else ""
             for s, arr in lnas_fmt.surfaces.items():
                 key = s + suffix
-                if key in self.surfaces:
+                if key in new_surfaces:
                     raise KeyError(
                         f"Surface {s} is already in the list of surfaces, provide a suffix for it"
                     )
-                self.surfaces[key] = arr + n_tris
+                new_surfaces[key] = arr.astype(np.uint32) + np.uint32(tri_offset)
+            tri_offset += len(lnas_fmt.geometry.triangles)
+
+        self.geometry.join([lnas_fmt.geometry for lnas_fmt in lnas_fmts])
+        self.surfaces = new_surfaces
+
+        if weld_tolerance is not None:
+            self.weld_vertices(weld_tolerance)
+
 
-        self.geometry._full_update()
+def _unpickle_lnas(
+    version: str, geometry: LnasGeometry, surfaces: dict[str, tuple[Any, str, tuple[int, ...]]]
+) -> LnasFormat:
+    return LnasFormat(
+        version=version,
+        geometry=geometry,
+        surfaces={s: unpickle_array(*args) for s, args in surfaces.items()},
+    )
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import pathlib
+from dataclasses import dataclass
+
+import numpy as np
+
+__all__ = ["SurfacesForces", "integrate_surfaces"]
+
+# Target size of each time series chunk read (in bytes)
+_CHUNK_BYTES = 1 << 26
+
+
+@dataclass
+class SurfacesForces:
+    """Forces and moments of surfaces over time"""
+
+    # Surfaces names, in the same order as arrays second dimension
+    surfaces_names: list[str]
+    # Forces (shape is (T, Ns, 3))
+    forces: np.ndarray
+    # Moments about moment center (shape is (T, Ns, 3))
+    moments: np.ndarray
+
+
+@dataclass
+class _Aggregation:
+    """Aggregation of triangles values into surfaces
+
+    It's a sparse matrix in CSR format, with one row block per surface: the surface s
+    sums `weights[indptr[s] : indptr[s + 1]]` multiplied by the values of the triangles
+    `triangles_idxs[indptr[s] : indptr[s + 1]]`.
+    """
+
+    triangles_idxs: np.ndarray
+    indptr: np.ndarray
+    # Weights for forces and moments of each entry (shape is (K, 6))
+    weights: np.ndarray
+
+    def apply(self, values: np.ndarray) -> np.ndarray:
+        """Aggregate values (shape (T, Nt)) into surfaces (shape (T, Ns, 6))"""
+
+        n_surfaces = len(self.indptr) - 1
+        values_gather = values[:, self.triangles_idxs].astype(self.weights.dtype, copy=False)
+        out = np.empty((len(values), n_surfaces, self.weights.shape[1]), dtype=np.float64)
+        for s in range(n_surfaces):
+            start, end = self.indptr[s], self.indptr[s + 1]
+            out[:, s] = values_gather[:, start:end] @ self.weights[start:end]
+        return out
+
+
+def _open_source(source: np.ndarray | pathlib.Path | str) -> np.ndarray:
+    if isinstance(source, (str, pathlib.Path)):
+        return np.load(source, mmap_mode="r")
+    return source
+
+
+def _reopen_args(source: np.ndarray | pathlib.Path | str) -> tuple | None:
+    """Arguments to open source again in other processes, None if it's in memory"""
+
+    if isinstance(source, (str, pathlib.Path)):
+        return (str(source),)
+    if isinstance(source, np.memmap) and source.filename is not None:
+        if not source.flags.c_contiguous:
+            return None
+        # Views (as `mm[5:]`) keep the offset of the mapped array, so the offset of their
+        # first element is found from the distance to the mapped array data
+        mapped = source
+        while isinstance(mapped.base, np.ndarray):
+            mapped = mapped.base
+        offset = source.offset + (source.ctypes.data - mapped.ctypes.data)
+        return (source.filename, source.dtype.str, offset, source.shape)
+    return None
+
+
+def _open_reopen_args(args: tuple) -> np.ndarray:
+    if len(args) == 1:
+        return np.load(args[0], mmap_mode="r")
+    filename, dtype, offset, shape = args
+    return np.memmap(filename, dtype=np.dtype(dtype), mode="r", offset=offset, shape=shape)
+
+
+def _integrate_block(
+    source: np.ndarray, aggregation: _Aggregation, start: int, end: int, chunk_size: int
+) -> np.ndarray:
+    out = np.empty((end - start, len(aggregation.indptr) - 1, 6), dtype=np.float64)
+    for chunk_start in range(start, end, chunk_size):
+        chunk_end = min(chunk_start + chunk_size, end)
+        out[chunk_start - start : chunk_end - start] = aggregation.apply(
+            np.asarray(source[chunk_start:chunk_end])
+        )
+    return out
+
+
+def _integrate_block_worker(
+    reopen_args: tuple, aggregation: _Aggregation, start: int, end: int, chunk_size: int
+) -> np.ndarray:
+    source = _open_reopen_args(reopen_args)
+    return _integrate_block(source, aggregation, start, end, chunk_size)
+
+
+def integrate_surfaces(
+    source: np.ndarray | pathlib.Path | str,
+    triangles_idxs: np.ndarray,
+    labels: np.ndarray,
+    n_surfaces: int,
+    areas: np.ndarray,
+    normals: np.ndarray,
+    centroids: np.ndarray,
+    moment_center: np.ndarray,
+    chunk_size: int | None = None,
+    n_workers: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Integrate triangles pressure time series into surfaces forces and moments
+
+    The force of each triangle is `-p * area * normal`, pressure pushes against the normal.
+
+    Args:
+        source (np.ndarray | pathlib.Path | str): Pressure time series (shape (T, Nt)).
+            It may be an array, a memmap or a `.npy` filename, opened as memmap.
+        triangles_idxs (np.ndarray): Triangles of each surface, concatenated
+        labels (np.ndarray): Surface of each value in triangles_idxs (sorted)
+        n_surfaces (int): Number of surfaces
+        areas (np.ndarray): Triangles areas (shape (Nt,))
+        normals (np.ndarray): Triangles normals (shape (Nt, 3))
+        centroids (np.ndarray): Triangles centroids (shape (Nt, 3))
+        moment_center (np.ndarray): Point to calculate moments about
+        chunk_size (int | None, optional): Number of time steps read at a time.
+            Defaults to None, using chunks of about 64 MB.
+        n_workers (int | None, optional): Number of processes to split time steps.
+            Source must be a `.npy` filename or a memmap. Defaults to None (no processes).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: forces and moments, shapes (T, Ns, 3)
+    """
+
+    values = _open_source(source)
+    if values.ndim != 2 or values.shape[1] != len(areas):
+        raise ValueError(
+            f"Pressure time series shape must be (T, {len(areas)}). Shape is {values.shape}"
+        )
+    n_steps = values.shape[0]
+
+    forces_weights = -(areas[triangles_idxs, None] * normals[triangles_idxs]).astype(np.float64)
+    arms = (centroids[triangles_idxs] - moment_center).astype(np.float64)
+    weights = np.concatenate((forces_weights, np.cross(arms, forces_weights)), axis=1)
+    indptr = np.zeros((n_surfaces + 1,), dtype=np.int64)
+    np.cumsum(np.bincount(labels, minlength=n_surfaces), out=indptr[1:])
+    aggregation = _Aggregation(triangles_idxs=triangles_idxs, indptr=indptr, weights=weights)
+
+    if chunk_size is None:
+        chunk_size = max(1, _CHUNK_BYTES // max(1, values.shape[1] * values.dtype.itemsize))
+
+    if n_workers is None or n_workers <= 1 or n_steps <= chunk_size:
+        result = _integrate_block(values, aggregation, 0, n_steps, chunk_size)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        reopen_args = _reopen_args(source)
+        if reopen_args is None:
+            raise ValueError("Multiple workers require a .npy filename or a memmap as source")
+        # Blocks are multiple of chunks, so each worker reads whole chunks
+        block_size = max(chunk_size, -(-n_steps // n_workers // chunk_size) * chunk_size)
+        blocks = [(s, min(s + block_size, n_steps)) for s in range(0, n_steps, block_size)]
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = [
+                executor.submit(
+                    _integrate_block_worker, reopen_args, aggregation, start, end, chunk_size
+                )
+                for start, end in blocks
+            ]
+            result = np.concatenate([f.result() for f in futures], axis=0)
+
+    return result[..., :3], result[..., 3:]
@@ -1,19 +1,28 @@
 from __future__ import annotations
 
-import base64
 import logging
 import pathlib
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any, ClassVar, Literal
 
 import numpy as np
 
-from lnas import TransformationsMatrix
-from lnas.stl import stl_binary
+from lnas.encoding import b64decode_array, b64encode_array
+from lnas.profiling import profiled
 from lnas.transformations import apply_transformation_matrix
+from lnas.utils import pickle_array, unpickle_array
+
+# Modules of features other than loading and saving are imported in the methods using them,
+# so workers only loading LNAS files don't import them
+if TYPE_CHECKING:
+    from lnas import TransformationsMatrix
+    from lnas.section import CrossSection
 
 logger = logging.getLogger(__name__)
 
+# Derived values cached as attributes, vertices areas are a dict by scheme
+_DERIVED_ATTRS = ("_triangles_vertices", "_normals", "_areas", "_vertices_normals")
+
 
 @dataclass
 class LnasGeometry:
@@ -24,6 +33,11 @@ class LnasGeometry:
     # Triangles vertices indexes (shape is (Nt, 3))
     triangles: np.ndarray
 
+    # Scratch space for derived values calculated out of core (see `use_scratch`)
+    _scratch = None
+    # Include derived values already calculated when pickled. May be set per instance
+    pickle_derived: ClassVar[bool] = False
+
     def __eq__(self, __o: object) -> bool:
         if not isinstance(self, type(__o)):
             return False
@@ -33,7 +47,14 @@ class LnasGeometry:
             return False
         return True
 
+    @profiled("geometry.triangles_vertices")
     def _update_triangles_vertices(self):
+        if self._scratch is not None:
+            self._triangles_vertices = self._scratch.map_chunks(
+                self._chunk_triangles_vertices, len(self.triangles)
+            )
+            return
+
         nt = self.triangles.shape[0]
         # Indexed as (idx_triangle, n_vert, vert_value)
         idxs_triangles = self.triangles.flatten(order="C")
@@ -41,6 +62,19 @@ class LnasGeometry:
 
         self._triangles_vertices = verts.reshape(nt, 3, 3)
 
+    def __reduce_ex__(self, protocol: int):
+        # Only vertices and triangles (and derived values with `pickle_derived`) are
+        # pickled, as pickle 5 buffers
+        arrays = {"vertices": self.vertices, "triangles": self.triangles}
+        if self.pickle_derived:
+            for attr in _DERIVED_ATTRS:
+                if hasattr(self, attr):
+                    arrays[attr] = getattr(self, attr)
+            for scheme, arr in getattr(self, "_vertices_areas", {}).items():
+                arrays[f"_vertices_areas.{scheme}"] = arr
+        arrays_pickle = {key: pickle_array(arr, protocol) for key, arr in arrays.items()}
+        return _unpickle_geometry, (arrays_pickle, self.pickle_derived)
+
     def correct_inverted_normals(self, normals_correct: np.ndarray):
         self._update_normals()
         # Negative product means normal is inverted
@@ -59,14 +93,149 @@ class LnasGeometry:
         geometry = LnasGeometry(vertices=vertices, triangles=triangles)
         return geometry
 
+    def compact_vertices(self) -> tuple[LnasGeometry, np.ndarray]:
+        """Build geometry keeping only the vertices referenced by triangles
+
+        Triangle derived values (normals, areas, triangles vertices) are carried over
+        if already calculated, and vertices normals are sliced from the current ones.
+
+        Returns:
+            tuple[LnasGeometry, np.ndarray]: compacted geometry and the array with the
+                original vertices idxs (new vertex idx -> original vertex idx)
+        """
+
+        vertices_used = np.zeros((len(self.vertices),), dtype=bool)
+        vertices_used[self.triangles.ravel()] = True
+        vertices_idxs = np.flatnonzero(vertices_used).astype(np.uint32)
+
+        # Map from original vertex index to its index in compacted geometry
+        vertices_remap = np.zeros((len(self.vertices),), dtype=np.uint32)
+        vertices_remap[vertices_idxs] = np.arange(len(vertices_idxs), dtype=np.uint32)
+
+        triangles = vertices_remap[self.triangles].astype(self.triangles.dtype, copy=False)
+        geometry = LnasGeometry(vertices=self.vertices[vertices_idxs], triangles=triangles)
+
+        for attr in ("_triangles_vertices", "_normals", "_areas"):
+            if hasattr(self, attr):
+                setattr(geometry, attr, getattr(self, attr).copy())
+        if hasattr(self, "_vertices_normals"):
+            geometry._vertices_normals = self._vertices_normals[vertices_idxs]
+        if hasattr(self, "_vertices_areas"):
+            geometry._vertices_areas = {
+                scheme: arr[vertices_idxs] for scheme, arr in self._vertices_areas.items()
+            }
+
+        return geometry, vertices_idxs
+
+    @profiled("geometry.filter_triangles")
+    def filter_triangles(self, triangles_use: np.ndarray, compact: bool = False) -> LnasGeometry:
+        """Build geometry with a subset of the triangles
+
+        Triangle derived values (normals, areas, triangles vertices) already calculated
+        are sliced instead of recalculated.
+
+        Args:
+            triangles_use (np.ndarray): bool array of triangles to use or array of triangles idxs
+            compact (bool, optional): Keep only vertices used by the filtered triangles.
+                Defaults to False.
+
+        Returns:
+            LnasGeometry: Geometry with filtered triangles
+        """
+
+        triangles = self.triangles[triangles_use]
+        vertices = self.vertices if compact else self.vertices.copy()
+        geometry = LnasGeometry(vertices=vertices, triangles=triangles)
+        for attr in ("_triangles_vertices", "_normals", "_areas"):
+            if hasattr(self, attr):
+                setattr(geometry, attr, getattr(self, attr)[triangles_use])
+
+        if compact:
+            geometry, _ = geometry.compact_vertices()
+        return geometry
+
+    def reorder(
+        self, curve: Literal["morton", "hilbert"] = "hilbert"
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Reorder vertices and triangles along a space filling curve, for memory locality
+
+        Vertices are sorted by the curve key of their position and triangles by the key
+        of their centroid. Derived values already calculated are permuted as well.
+
+        Args:
+            curve (Literal["morton", "hilbert"], optional): Space filling curve.
+                Defaults to "hilbert".
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: vertices and triangles permutations
+                (new idx -> original idx)
+        """
+
+        from lnas.ordering import space_filling_keys
+
+        bounds = (self.vertices.min(axis=0), self.vertices.max(axis=0))
+        vertices_keys = space_filling_keys(self.vertices, curve=curve, bounds=bounds)
+        vertices_perm = np.argsort(vertices_keys, kind="stable")
+
+        centroids = self.vertices[self.triangles].mean(axis=1)
+        triangles_keys = space_filling_keys(centroids, curve=curve, bounds=bounds)
+        triangles_perm = np.argsort(triangles_keys, kind="stable")
+
+        vertices_remap = np.empty_like(vertices_perm)
+        vertices_remap[vertices_perm] = np.arange(len(vertices_perm))
+
+        self.vertices = self.vertices[vertices_perm]
+        triangles = vertices_remap[self.triangles[triangles_perm]]
+        self.triangles = triangles.astype(self.triangles.dtype, copy=False)
+
+        for attr in ("_triangles_vertices", "_normals", "_areas"):
+            if hasattr(self, attr):
+                setattr(self, attr, getattr(self, attr)[triangles_perm])
+        if hasattr(self, "_vertices_normals"):
+            self._vertices_normals = self._vertices_normals[vertices_perm]
+        if hasattr(self, "_vertices_areas"):
+            self._vertices_areas = {
+                scheme: arr[vertices_perm] for scheme, arr in self._vertices_areas.items()
+            }
+
+        return vertices_perm, triangles_perm
+
+    def use_scratch(
+        self, scratch_dir: pathlib.Path | str | None = None, chunk_size: int = 1 << 20
+    ):
+        """Calculate derived values out of core, for geometries larger than memory
+
+        Normals, areas, triangles vertices, vertices normals and vertices areas are
+        calculated in chunks of triangles into memmapped scratch files. The full triangles
+        vertices tensor is only built (on disk) if `triangle_vertices` is accessed.
+        Vertices and triangles may be memmaps as well (see `from_npy`).
+
+        Scratch files are in a temporary directory, removed with the geometry. Geometries
+        created from this one (as by `copy` or `filter_triangles`) are in memory.
+
+        Args:
+            scratch_dir (pathlib.Path | str | None, optional): Directory for scratch files.
+                Defaults to None (system temporary directory).
+            chunk_size (int, optional): Triangles processed at a time. Defaults to 2**20.
+        """
+
+        from lnas.scratch import ScratchSpace
+
+        self._scratch = ScratchSpace(scratch_dir, chunk_size)
+        self._clear_derived()
+
+    def _chunk_triangles_vertices(self, start: int, end: int) -> np.ndarray:
+        return self.vertices[np.asarray(self.triangles[start:end])]
+
     @property
     def triangle_vertices(self):
         if not hasattr(self, "_triangles_vertices"):
             self._update_triangles_vertices()
         return self._triangles_vertices
 
-    def _cross_prod(self):
-        triangle_points = self.triangle_vertices
+    def _cross_prod(self, triangle_points: np.ndarray | None = None):
+        if triangle_points is None:
+            triangle_points = self.triangle_vertices
 
         # Same convention as OpenGL (right hand rule)
         # U = p1 - p0; V = p2 - p0
@@ -79,58 +248,176 @@ class LnasGeometry:
 
     def _remove_invalid_normals(self):
         # Find rows where any element is NaN
-        invalid_mask = np.isnan(self._normals).any(axis=1)
+        if self._scratch is not None:
+            invalid_mask = np.zeros((len(self._normals),), dtype=bool)
+            for start, end in self._scratch.chunks(len(self._normals)):
+                invalid_mask[start:end] = np.isnan(self._normals[start:end]).any(axis=1)
+        else:
+            invalid_mask = np.isnan(self._normals).any(axis=1)
         num_removed = np.count_nonzero(invalid_mask)
 
         if num_removed > 0:
             # Keep only valid normals and triangles
-            self.triangles = self.triangles[~invalid_mask]
+            if self._scratch is not None:
+                self.triangles = self._scratch.filter_rows(self.triangles, ~invalid_mask)
+            else:
+                self.triangles = self.triangles[~invalid_mask]
             logger.warning(
                 f"{num_removed} triangles removed due to invalid normals. Triangles indexes changed"
             )
             self._full_update()
 
+    @profiled("geometry.normals")
     def _update_normals(self, remove_invalid_normals: bool = True):
-        cross_prod = self._cross_prod()
+        if self._scratch is not None:
+            self._normals = self._scratch.map_chunks(self._chunk_normals, len(self.triangles))
+        else:
+            cross_prod = self._cross_prod()
 
-        # with np.errstate(invalid="ignore", divide="ignore"):
-        self._normals = cross_prod / np.linalg.norm(cross_prod, axis=1)[:, np.newaxis]
+            # with np.errstate(invalid="ignore", divide="ignore"):
+            self._normals = cross_prod / np.linalg.norm(cross_prod, axis=1)[:, np.newaxis]
 
         if remove_invalid_normals:
             self._remove_invalid_normals()
 
-        if np.isnan(self._normals).any():
+        if self._has_nan(self._normals):
             raise ValueError("Invalid normals generated, there is a NaN value")
 
+    def _chunk_normals(self, start: int, end: int) -> np.ndarray:
+        cross_prod = self._cross_prod(self._chunk_triangles_vertices(start, end))
+        return cross_prod / np.linalg.norm(cross_prod, axis=1)[:, np.newaxis]
+
+    def _has_nan(self, arr: np.ndarray) -> bool:
+        if self._scratch is not None:
+            return self._scratch.any_rows(lambda start, end: np.isnan(arr[start:end]), len(arr))
+        return bool(np.isnan(arr).any())
+
+    @profiled("geometry.areas")
     def _update_areas(self):
+        if self._scratch is not None:
+            self._areas = self._scratch.map_chunks(self._chunk_areas, len(self.triangles))
+            return
+
         cross_prod = self._cross_prod()
         self._areas = np.linalg.norm(cross_prod, axis=1) / 2
 
+    def _chunk_areas(self, start: int, end: int) -> np.ndarray:
+        cross_prod = self._cross_prod(self._chunk_triangles_vertices(start, end))
+        return np.linalg.norm(cross_prod, axis=1) / 2
+
     @property
     def normals(self) -> np.ndarray:
         if not hasattr(self, "_normals"):
             self._update_normals()
         return self._normals
 
+    def _scatter_to_vertices(self, values: np.ndarray) -> np.ndarray:
+        """Sum values of triangles' vertices into vertices
+
+        Args:
+            values (np.ndarray): values for each triangle vertex, shape (Nt, 3) or (Nt, 3, k)
+
+        Returns:
+            np.ndarray: sum for each vertex, shape (Nv,) or (Nv, k)
+        """
+
+        n_vertices = len(self.vertices)
+        idxs = self.triangles.ravel()
+        values_flat = values.reshape((len(idxs), -1))
+        sums = [
+            np.bincount(idxs, weights=values_flat[:, k], minlength=n_vertices)
+            for k in range(values_flat.shape[1])
+        ]
+        return np.stack(sums, axis=-1).reshape((n_vertices, *values.shape[2:]))
+
+    @profiled("geometry.vertices_normals")
     def _update_vertices_normals(self):
-        normals, areas, triangles = self.normals, self.areas, self.triangles
-        vertices_normals = np.zeros((len(self.vertices), 3), dtype=np.float32)
+        normals, areas = self.normals, self.areas
+
+        # Add triangle normal to its vertices, considering triangle area
+        def weighted_normals(start: int, end: int) -> np.ndarray:
+            weighted = normals[start:end] * areas[start:end, np.newaxis]
+            return np.repeat(weighted[:, np.newaxis, :], 3, axis=1)
+
+        if self._scratch is not None:
+            sums = self._scratch.scatter_add(self.triangles, len(self.vertices), weighted_normals)
+            self._vertices_normals = self._scratch.map_chunks(
+                lambda start, end: self._normalize_vertices_normals(
+                    sums[start:end].astype(np.float32)
+                ),
+                len(self.vertices),
+            )
+        else:
+            vertices_normals = self._scatter_to_vertices(
+                weighted_normals(0, len(self.triangles))
+            ).astype(np.float32)
+            self._vertices_normals = self._normalize_vertices_normals(vertices_normals)
+
+        if self._has_nan(self._vertices_normals):
+            raise ValueError("Invalid vertices normals generated, there is a NaN value")
 
-        # Add triangle normal to vertices, considering triangle area
-        for normal, triangle, area in zip(normals, triangles, areas):
-            for v_idx in triangle:
-                vertices_normals[v_idx] += normal * area
+    @staticmethod
+    def _normalize_vertices_normals(vertices_normals: np.ndarray) -> np.ndarray:
         # Normalize normal to its norm
         norms = np.linalg.norm(vertices_normals, axis=1)
         # Check where no vertex was used, to avoid division by zero
         v_idxs_zero = (vertices_normals == 0).all(axis=1)
-        for v_idx in np.where(v_idxs_zero):
-            norms[v_idx] = 1
-
-        self._vertices_normals = vertices_normals / np.expand_dims(norms, axis=1)
-
-        if np.isnan(self._vertices_normals).any():
-            raise ValueError("Invalid vertices normals generated, there is a NaN value")
+        norms[v_idxs_zero] = 1
+        return vertices_normals / np.expand_dims(norms, axis=1)
+
+    @profiled("geometry.vertices_areas")
+    def _update_vertices_areas(self, scheme: Literal["barycentric", "voronoi"]):
+        if scheme not in ("barycentric", "voronoi"):
+            raise ValueError(f"Unknown vertices areas scheme {scheme}")
+
+        def triangles_areas(start: int, end: int) -> np.ndarray:
+            areas = np.asarray(self.areas[start:end], dtype=np.float64)
+            if scheme == "barycentric":
+                # One third of triangle area for each vertex
+                return np.repeat(areas[:, np.newaxis] / 3, 3, axis=1)
+            return self._triangles_voronoi_areas(self._chunk_triangles_vertices(start, end), areas)
+
+        if not hasattr(self, "_vertices_areas"):
+            self._vertices_areas = {}
+        if self._scratch is not None:
+            sums = self._scratch.scatter_add(self.triangles, len(self.vertices), triangles_areas)
+            self._vertices_areas[scheme] = self._scratch.map_chunks(
+                lambda start, end: sums[start:end].astype(np.float32), len(self.vertices)
+            )
+        else:
+            self._vertices_areas[scheme] = self._scatter_to_vertices(
+                triangles_areas(0, len(self.triangles))
+            ).astype(np.float32)
+
+    @staticmethod
+    def _triangles_voronoi_areas(points: np.ndarray, areas: np.ndarray) -> np.ndarray:
+        """Mixed Voronoi area of each triangle vertex (Meyer et al., 2003)"""
+
+        points = points.astype(np.float64)
+        # Edge opposite to vertex k is from vertex k + 1 to vertex k + 2
+        edges_opposite = np.roll(points, -2, axis=1) - np.roll(points, -1, axis=1)
+        edges_sq = np.sum(edges_opposite**2, axis=2)
+
+        # Cotangent of angle at vertex k is u.v / |u x v|, with |u x v| = 2 * area
+        u = np.roll(points, -1, axis=1) - points
+        v = np.roll(points, -2, axis=1) - points
+        dot_prod = np.sum(u * v, axis=2)
+        double_area = 2 * areas[:, np.newaxis]
+        cot = np.divide(dot_prod, double_area, out=np.zeros_like(dot_prod), where=double_area > 0)
+
+        # Voronoi area of vertex k uses edges k->k+1 and k->k+2, opposite to k+2 and k+1
+        voronoi = (
+            np.roll(edges_sq, -2, axis=1) * np.roll(cot, -2, axis=1)
+            + np.roll(edges_sq, -1, axis=1) * np.roll(cot, -1, axis=1)
+        ) / 8
+
+        # Obtuse triangles give half area to the obtuse vertex and a quarter to others
+        is_obtuse_vertex = dot_prod < 0
+        is_obtuse = is_obtuse_vertex.any(axis=1)
+        obtuse_areas = np.where(
+            is_obtuse_vertex, areas[:, np.newaxis] / 2, areas[:, np.newaxis] / 4
+        )
+        return np.where(is_obtuse[:, np.newaxis], obtuse_areas, voronoi)
 
     @property
     def vertices_normals(self) -> np.ndarray:
@@ -144,12 +431,46 @@ class LnasGeometry:
             self._update_areas()
         return self._areas
 
+    def get_vertices_areas(
+        self, scheme: Literal["barycentric", "voronoi"] = "barycentric"
+    ) -> np.ndarray:
+        """Area associated to each vertex, used as Lagrangian markers weights
+
+        Args:
+            scheme (Literal["barycentric", "voronoi"], optional): "barycentric" gives one third
+                of each incident triangle area, "voronoi" gives the mixed Voronoi area.
+                Defaults to "barycentric".
+
+        Returns:
+            np.ndarray: vertices areas, shape (Nv,)
+        """
+        if not hasattr(self, "_vertices_areas") or scheme not in self._vertices_areas:
+            self._update_vertices_areas(scheme)
+        return self._vertices_areas[scheme]
+
+    @property
+    def vertices_areas(self) -> np.ndarray:
+        return self.get_vertices_areas("barycentric")
+
+    def _clear_derived(self):
+        # Derived values are lazily recalculated on next access
+        for attr in (*_DERIVED_ATTRS, "_vertices_areas"):
+            if hasattr(self, attr):
+                delattr(self, attr)
+
+    @profiled("geometry.full_update")
     def _full_update(self, remove_invalid_normals: bool = True):
         # ORDER IS IMPORTANT, one depends on the other
-        self._update_triangles_vertices()
+        if self._scratch is not None:
+            # Triangles vertices are only built out of core when accessed
+            self._clear_derived()
+        else:
+            self._update_triangles_vertices()
         self._update_normals(remove_invalid_normals=remove_invalid_normals)
         self._update_areas()
         self._update_vertices_normals()
+        # Vertices areas are calculated on demand, for the scheme used
+        self._vertices_areas = {}
 
     @classmethod
     def from_dct(cls, dct: dict[str, Any]) -> LnasGeometry:
@@ -159,32 +480,55 @@ class LnasGeometry:
             ("vertices", np.float32, 3),
             ("triangles", np.uint32, 3),
         ]:
-            val_str = dct[key]
-            val_b64_bytes = val_str.encode("ascii")
-            val_bytes = base64.b64decode(val_b64_bytes)
-            np_arr = np.frombuffer(val_bytes, dtype=dtype_use)
+            np_arr = b64decode_array(dct[key], dtype_use)
             # Reshape to right dimension
             np_arr = np_arr.reshape((len(np_arr) // last_dim, last_dim))
             dct_use[key] = np_arr
 
         return LnasGeometry(**dct_use)
 
+    @classmethod
+    def from_npy(
+        cls, directory: pathlib.Path | str, mmap_mode: Literal["r", "r+", "c"] | None = "r"
+    ) -> LnasGeometry:
+        """Load lagrangian geometry from `vertices.npy` and `triangles.npy` files
+
+        Args:
+            directory (pathlib.Path | str): Directory with the files
+            mmap_mode (Literal["r", "r+", "c"] | None, optional): Memmap mode of arrays.
+                Defaults to "r" (read only memmaps). None reads them into memory.
+
+        Returns:
+            LnasGeometry: geometry with memmapped vertices and triangles
+        """
+
+        directory = pathlib.Path(directory)
+        vertices = np.load(directory / "vertices.npy", mmap_mode=mmap_mode)
+        triangles = np.load(directory / "triangles.npy", mmap_mode=mmap_mode)
+        return LnasGeometry(vertices=vertices, triangles=triangles)
+
+    def to_npy(self, directory: pathlib.Path | str):
+        """Save vertices and triangles as `vertices.npy` and `triangles.npy`, for `from_npy`
+
+        Args:
+            directory (pathlib.Path | str): Directory to save to
+        """
+
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "vertices.npy", np.asarray(self.vertices, dtype=np.float32))
+        np.save(directory / "triangles.npy", np.asarray(self.triangles, dtype=np.uint32))
+
     def to_dct(self) -> dict[str, Any]:
         """Get lagrangian geometry as dictionary"""
 
-        def arr_to_string(arr_np: np.ndarray, dtype: np.dtype) -> str:
-            arr_use = arr_np.astype(dtype=dtype)
-            arr_bytes = arr_use.tobytes(order="C")
-            arr_b64 = base64.b64encode(arr_bytes)
-            arr_str = str(arr_b64, encoding="utf-8")
-            return arr_str
-
-        vertices_pos = arr_to_string(self.vertices, np.float32)
-        triangles = arr_to_string(self.triangles, np.uint32)
+        vertices_pos = b64encode_array(self.vertices, np.float32)
+        triangles = b64encode_array(self.triangles, np.uint32)
         dct = {"vertices": vertices_pos, "triangles": triangles}
 
         return dct
 
+    @profiled("geometry.transform")
     def apply_transformation(
         self,
         transf: TransformationsMatrix,
@@ -196,6 +540,7 @@ class LnasGeometry:
         self.vertices = transf.apply_points(self.vertices, invert_transf=invert_transf)
         self._full_update(remove_invalid_normals=remove_invalid_normals)
 
+    @profiled("geometry.transform")
     def apply_transformation_matrix(self, M: np.ndarray, invert_transf: bool = False):
         """Apply transformation in geometry"""
 
@@ -206,6 +551,9 @@ class LnasGeometry:
 
     def binary_stl(self) -> bytes:
         """Get lagrangian geometry as STL binary format"""
+
+        from lnas.stl import stl_binary
+
         data = stl_binary(self.triangle_vertices, self.normals)
         return data
 
@@ -223,6 +571,43 @@ class LnasGeometry:
         with open(filename, "wb") as f:
             f.write(data)
 
+    def markers_array(
+        self, scheme: Literal["barycentric", "voronoi"] = "barycentric"
+    ) -> np.ndarray:
+        """Lagrangian markers as vertices position, normal and area
+
+        Args:
+            scheme (Literal["barycentric", "voronoi"], optional): Vertices areas scheme.
+                Defaults to "barycentric".
+
+        Returns:
+            np.ndarray: markers as (x, y, z, nx, ny, nz, area) in f32, shape (Nv, 7)
+        """
+
+        markers = np.empty((len(self.vertices), 7), dtype=np.float32)
+        markers[:, 0:3] = self.vertices
+        markers[:, 3:6] = self.vertices_normals
+        markers[:, 6] = self.get_vertices_areas(scheme)
+        return markers
+
+    def export_markers(
+        self, filename: pathlib.Path, scheme: Literal["barycentric", "voronoi"] = "barycentric"
+    ):
+        """Export Lagrangian markers as raw binary f32 (little endian), 7 values per vertex
+
+        Args:
+            filename (pathlib.Path): filename to save to
+            scheme (Literal["barycentric", "voronoi"], optional): Vertices areas scheme.
+                Defaults to "barycentric".
+        """
+
+        data = self.markers_array(scheme).astype("<f4").tobytes(order="C")
+
+        filename.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(filename, "wb") as f:
+            f.write(data)
+
     def triangles_inside_volume(
         self, start: tuple[float, ...], end: tuple[float, ...]
     ) -> np.ndarray:
@@ -245,27 +630,170 @@ class LnasGeometry:
         smaller_end = (self.vertices <= end_arr).all(axis=1)
         bool_arr = np.logical_and(bigger_start, smaller_end)
 
-        bool_triangles = np.zeros((self.triangles.shape[0],), dtype=bool)
-        for t_idx, t in enumerate(self.triangles):
-            if any(bool_arr[v_idx] for v_idx in t):
-                bool_triangles[t_idx] = True
+        bool_triangles = bool_arr[self.triangles].any(axis=1)
 
         return bool_triangles
 
-    def join(self, geometries_list: list[LnasGeometry]):
+    def clip(
+        self,
+        start: tuple[float, ...] | None = None,
+        end: tuple[float, ...] | None = None,
+        planes: list[tuple[np.ndarray, np.ndarray]] | None = None,
+    ) -> tuple[LnasGeometry, np.ndarray]:
+        """Clip geometry to a box and/or to planes
+
+        Triangles crossing the box faces or planes are split and re-triangulated, so the
+        clipped geometry is exactly the part inside. Vertices created on crossing edges are
+        shared by neighbour triangles.
+
+        Args:
+            start (tuple[float, ...] | None, optional): Box start. Defaults to None.
+            end (tuple[float, ...] | None, optional): Box end. Defaults to None.
+            planes (list[tuple[np.ndarray, np.ndarray]] | None, optional): Planes as
+                (point, normal), keeping the side the normal points to. Defaults to None.
+
+        Returns:
+            tuple[LnasGeometry, np.ndarray]: clipped geometry (compacted) and the original
+                triangle idx of each clipped triangle (sorted)
+        """
+
+        from lnas.clip import clip_half_spaces, half_spaces
+
+        normals, offsets = half_spaces(start, end, planes)
+        vertices, triangles, parents = clip_half_spaces(
+            self.vertices, self.triangles, normals, offsets
+        )
+        geometry = LnasGeometry(
+            vertices=vertices.astype(self.vertices.dtype),
+            triangles=triangles.astype(self.triangles.dtype),
+        )
+
+        # Slivers may have null area after rounding vertices
+        geometry._update_triangles_vertices()
+        geometry._update_areas()
+        triangles_valid = geometry._areas > 0
+        geometry = geometry.filter_triangles(triangles_valid, compact=True)
+        parents = parents[triangles_valid]
+        # Clipped triangles are in the plane of the original one
+        if hasattr(self, "_normals"):
+            geometry._normals = self._normals[parents]
+
+        return geometry, parents
+
+    def cross_sections(
+        self,
+        normal: tuple[float, ...],
+        offsets: float | list[float] | np.ndarray = 0,
+        origin: tuple[float, ...] = (0, 0, 0),
+    ) -> list[CrossSection]:
+        """Intersect geometry with one plane or a stack of parallel planes
+
+        Planes are `normal . (x - origin) = offset`, with normal normalized. Segments are
+        grouped into connected polylines, closed for loops.
+
+        Args:
+            normal (tuple[float, ...]): Planes normal
+            offsets (float | list[float] | np.ndarray, optional): Planes offsets along
+                normal. Defaults to 0.
+            origin (tuple[float, ...], optional): Planes origin. Defaults to (0, 0, 0).
+
+        Returns:
+            list[CrossSection]: cross section of each plane, in the same order as offsets
+        """
+
+        from lnas.section import cross_sections
+
+        return cross_sections(self.vertices, self.triangles, normal, offsets, origin)
+
+    def weld_vertices(self, tolerance: float, relative: bool = False) -> np.ndarray:
+        """Merge vertices that are coincident up to a tolerance
+
+        Triangles that collapse (two or more vertices merged) are removed.
+
+        Args:
+            tolerance (float): Distance used to consider vertices coincident
+            relative (bool, optional): Tolerance is relative to the geometry bounding box
+                diagonal. Defaults to False.
+
+        Returns:
+            np.ndarray: idxs of the triangles kept, referencing the triangles before welding
+        """
+
+        from lnas.weld import collapsed_triangles, weld_vertices
+
+        vertices_idxs, vertices_remap = weld_vertices(
+            self.vertices, tolerance=tolerance, relative=relative
+        )
+        triangles = vertices_remap[self.triangles].astype(self.triangles.dtype, copy=False)
+
+        triangles_idxs = np.flatnonzero(~collapsed_triangles(triangles))
+        if len(triangles_idxs) < len(triangles):
+            logger.warning(
+                f"{len(triangles) - len(triangles_idxs)} triangles removed due to welding. "
+                + "Triangles indexes changed"
+            )
+            triangles = triangles[triangles_idxs]
+
+        self.vertices = self.vertices[vertices_idxs]
+        self.triangles = triangles
+        self._clear_derived()
+        return triangles_idxs
+
+    @profiled("geometry.join")
+    def join(self, geometries_list: list[LnasGeometry], weld_tolerance: float | None = None):
         """Join into this geometry a list of LnasGeometry
 
+        The joined arrays are allocated once and filled in a single pass.
+
         Args:
             geometries_list (list[LnasGeometry]): List of LnasGeometry to be combined
+            weld_tolerance (float | None, optional): Merge vertices across geometries closer
+                than this tolerance. Defaults to None (no welding).
         """
         if len(geometries_list) < 1:
             raise ValueError(
                 "No geometry to combine. It must be a list of at least two LnasGeometry"
             )
 
-        for geometry in geometries_list:
-            new_tri = geometry.triangles.copy() + len(self.vertices)
-            self.vertices = np.vstack((self.vertices, geometry.vertices.copy()))
-            self.triangles = np.vstack((self.triangles, new_tri))
+        geometries = [self, *geometries_list]
+        n_verts = [len(g.vertices) for g in geometries]
+        n_tris = [len(g.triangles) for g in geometries]
 
-        self._full_update()
+        vertices = np.concatenate([g.vertices for g in geometries], axis=0)
+        triangles = np.empty(
+            (sum(n_tris), 3), dtype=np.result_type(*[g.triangles.dtype for g in geometries])
+        )
+        vert_offset, tri_offset = 0, 0
+        for g, nv, nt in zip(geometries, n_verts, n_tris):
+            np.add(
+                g.triangles,
+                vert_offset,
+                out=triangles[tri_offset : tri_offset + nt],
+                casting="unsafe",
+            )
+            vert_offset += nv
+            tri_offset += nt
+
+        self.vertices = vertices
+        self.triangles = triangles
+        self._clear_derived()
+
+        if weld_tolerance is not None:
+            self.weld_vertices(weld_tolerance)
+
+
+def _unpickle_geometry(
+    arrays_pickle: dict[str, tuple[Any, str, tuple[int, ...]]], pickle_derived: bool
+) -> LnasGeometry:
+    arrays = {key: unpickle_array(*args) for key, args in arrays_pickle.items()}
+    geometry = LnasGeometry(vertices=arrays.pop("vertices"), triangles=arrays.pop("triangles"))
+    if pickle_derived != LnasGeometry.pickle_derived:
+        geometry.pickle_derived = pickle_derived
+    for key, arr in arrays.items():
+        if key.startswith("_vertices_areas."):
+            if not hasattr(geometry, "_vertices_areas"):
+                geometry._vertices_areas = {}
+            geometry._vertices_areas[key.split(".", 1)[1]] = arr
+        else:
+            setattr(geometry, key, arr)
+    return geometry
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import pathlib
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import asyncio
+
+__all__ = ["LoadResult", "load_many", "load_many_async"]
+
+
+@dataclass
+class LoadResult:
+    """Result of loading a file, with the error raised if it failed"""
+
+    # File loaded
+    filename: pathlib.Path
+    # Loaded value, None if loading failed
+    value: Any = None
+    # Exception raised loading the file, None if it succeeded
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _check_concurrency(max_concurrency: int):
+    if max_concurrency < 1:
+        raise ValueError(f"Max concurrency must be at least 1. It is {max_concurrency}")
+
+
+def _future_result(future: Future | asyncio.Future, filename: pathlib.Path) -> LoadResult:
+    # Errors are isolated per file. `load` is any callable and workers may break, so any
+    # exception is a failure of this file only
+    try:
+        return LoadResult(filename=filename, value=future.result())
+    except Exception as e:  # noqa: BLE001
+        return LoadResult(filename=filename, error=e)
+
+
+def _load_as_completed(
+    load: Callable[[pathlib.Path], Any],
+    filenames: list[pathlib.Path],
+    executor: Executor,
+    max_concurrency: int,
+) -> Iterator[LoadResult]:
+    to_submit = iter(filenames)
+    pending: dict[Future, pathlib.Path] = {}
+
+    def submit_next():
+        filename = next(to_submit, None)
+        if filename is not None:
+            pending[executor.submit(load, filename)] = filename
+
+    try:
+        for _ in range(max_concurrency):
+            submit_next()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                filename = pending.pop(future)
+                submit_next()
+                yield _future_result(future, filename)
+    finally:
+        # Iteration stopped early
+        for future in pending:
+            future.cancel()
+
+
+def load_many(
+    load: Callable[[pathlib.Path], Any],
+    filenames: Iterable[pathlib.Path | str],
+    executor: Executor | None = None,
+    max_concurrency: int = 8,
+) -> Iterator[LoadResult]:
+    """Load files concurrently, giving results as they complete
+
+    At most `max_concurrency` files are loading at a time. A file failing to load gives a
+    result with its error, without stopping the others.
+
+    Args:
+        load (Callable[[pathlib.Path], Any]): Function loading a file. Must be picklable
+            for process executors
+        filenames (Iterable[pathlib.Path | str]): Files to load
+        executor (Executor | None, optional): Executor to load files in (threads or
+            processes). Defaults to None (threads pool of `max_concurrency` workers).
+        max_concurrency (int, optional): Maximum files loading at a time. Defaults to 8.
+
+    Yields:
+        Iterator[LoadResult]: result of each file, in completion order
+    """
+
+    _check_concurrency(max_concurrency)
+    filenames = [pathlib.Path(f) for f in filenames]
+    if executor is not None:
+        yield from _load_as_completed(load, filenames, executor, max_concurrency)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    try:
+        yield from _load_as_completed(load, filenames, executor, max_concurrency)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+async def load_many_async(
+    load: Callable[[pathlib.Path], Any],
+    filenames: Iterable[pathlib.Path | str],
+    executor: Executor | None = None,
+    max_concurrency: int = 8,
+) -> AsyncIterator[LoadResult]:
+    """Load files concurrently without blocking the event loop, as `load_many`
+
+    Args:
+        load (Callable[[pathlib.Path], Any]): Function loading a file. Must be picklable
+            for process executors
+        filenames (Iterable[pathlib.Path | str]): Files to load
+        executor (Executor | None, optional): Executor to load files in (threads or
+            processes). Defaults to None (event loop default executor).
+        max_concurrency (int, optional): Maximum files loading at a time. Defaults to 8.
+
+    Yields:
+        AsyncIterator[LoadResult]: result of each file, in completion order
+    """
+
+    # asyncio is imported on first use, it's slow to import
+    import asyncio
+
+    _check_concurrency(max_concurrency)
+    loop = asyncio.get_running_loop()
+    to_submit = iter([pathlib.Path(f) for f in filenames])
+    pending: dict[asyncio.Future, pathlib.Path] = {}
+
+    def submit_next():
+        filename = next(to_submit, None)
+        if filename is not None:
+            pending[loop.run_in_executor(executor, load, filename)] = filename
+
+    try:
+        for _ in range(max_concurrency):
+            submit_next()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                filename = pending.pop(future)
+                submit_next()
+                yield _future_result(future, filename)
+    finally:
+        for future in pending:
+            future.cancel()
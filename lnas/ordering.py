@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from typing import Literal
+
+import numpy as np
+
+__all__ = ["hilbert_keys", "morton_keys", "space_filling_keys"]
+
+# Bits per dimension, so 3D keys fit in 63 bits
+_MAX_BITS = 21
+
+
+def _quantize(points: np.ndarray, bits: int, start: np.ndarray, size: float) -> np.ndarray:
+    """Quantize points into a grid of 2^bits cells per dimension"""
+
+    n_cells = (1 << bits) - 1
+    scale = n_cells / size if size > 0 else 0.0
+    quantized = np.floor((points.astype(np.float64) - start) * scale)
+    return np.clip(quantized, 0, n_cells).astype(np.uint64)
+
+
+def _spread_bits(x: np.ndarray) -> np.ndarray:
+    """Spread the 21 lower bits of x, leaving 2 zero bits between each of them"""
+
+    x = x & np.uint64(0x1FFFFF)
+    x = (x | (x << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+    x = (x | (x << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+    x = (x | (x << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+    x = (x | (x << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+    x = (x | (x << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return x
+
+
+def _interleave(coords: np.ndarray) -> np.ndarray:
+    # First coordinate gives the most significant bit of each triple
+    return (
+        (_spread_bits(coords[:, 0]) << np.uint64(2))
+        | (_spread_bits(coords[:, 1]) << np.uint64(1))
+        | _spread_bits(coords[:, 2])
+    )
+
+
+def morton_keys(coords: np.ndarray) -> np.ndarray:
+    """Morton (Z-order) keys of quantized coordinates
+
+    Args:
+        coords (np.ndarray): integer coordinates with up to 21 bits, shape (N, 3)
+
+    Returns:
+        np.ndarray: keys as uint64, shape (N,)
+    """
+
+    return _interleave(coords.astype(np.uint64))
+
+
+def hilbert_keys(coords: np.ndarray, bits: int = _MAX_BITS) -> np.ndarray:
+    """Hilbert keys of quantized coordinates
+
+    Uses Skilling's algorithm ("Programming the Hilbert curve", 2004), vectorized over points.
+
+    Args:
+        coords (np.ndarray): integer coordinates with up to `bits` bits, shape (N, 3)
+        bits (int, optional): Bits per coordinate. Defaults to 21.
+
+    Returns:
+        np.ndarray: keys as uint64, shape (N,)
+    """
+
+    X = coords.astype(np.uint64, copy=True)
+    M = np.uint64(1 << (bits - 1))
+
+    # Inverse undo
+    Q = M
+    while Q > 1:
+        P = Q - np.uint64(1)
+        for i in range(3):
+            is_set = (X[:, i] & Q) != 0
+            X[is_set, 0] ^= P
+            not_set = ~is_set
+            t = (X[not_set, 0] ^ X[not_set, i]) & P
+            X[not_set, 0] ^= t
+            X[not_set, i] ^= t
+        Q >>= np.uint64(1)
+
+    # Gray encode
+    for i in range(1, 3):
+        X[:, i] ^= X[:, i - 1]
+    t = np.zeros((len(X),), dtype=np.uint64)
+    Q = M
+    while Q > 1:
+        is_set = (X[:, 2] & Q) != 0
+        t[is_set] ^= Q - np.uint64(1)
+        Q >>= np.uint64(1)
+    X ^= t[:, np.newaxis]
+
+    # X is the transposed Hilbert index, its bits are interleaved
+    return _interleave(X)
+
+
+def space_filling_keys(
+    points: np.ndarray,
+    curve: Literal["morton", "hilbert"] = "hilbert",
+    bits: int = _MAX_BITS,
+    bounds: tuple[np.ndarray, np.ndarray] | None = None,
+) -> np.ndarray:
+    """Space filling curve keys of points
+
+    Points are quantized in a cubic grid of 2^bits cells per dimension covering
+    their bounding box.
+
+    Args:
+        points (np.ndarray): Points, shape (N, 3)
+        curve (Literal["morton", "hilbert"], optional): Curve to use. Defaults to "hilbert".
+        bits (int, optional): Bits per dimension (at most 21). Defaults to 21.
+        bounds (tuple[np.ndarray, np.ndarray] | None, optional): Bounding box (start, end)
+            to quantize points. Defaults to None (points bounding box).
+
+    Returns:
+        np.ndarray: keys as uint64, shape (N,)
+    """
+
+    if not 1 <= bits <= _MAX_BITS:
+        raise ValueError(f"Bits per dimension must be in [1, {_MAX_BITS}], got {bits}")
+    if len(points) == 0:
+        return np.empty((0,), dtype=np.uint64)
+
+    if bounds is None:
+        bounds = (points.min(axis=0), points.max(axis=0))
+    start = np.asarray(bounds[0], dtype=np.float64)
+    size = float(np.max(np.asarray(bounds[1], dtype=np.float64) - start))
+    coords = _quantize(points, bits, start, size)
+
+    if curve == "morton":
+        return morton_keys(coords)
+    elif curve == "hilbert":
+        return hilbert_keys(coords, bits=bits)
+    raise ValueError(f"Unknown space filling curve {curve}")
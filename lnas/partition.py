@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+
+from lnas.geometry import LnasGeometry
+
+if TYPE_CHECKING:
+    from lnas.fmt import LnasFormat
+
+__all__ = ["LnasPartition", "partition_boxes", "partition_lnas", "save_partitions"]
+
+
+@dataclass
+class LnasPartition:
+    """Part of a LNAS inside a box, plus a halo around it"""
+
+    # Compacted LNAS with partition triangles (owned and halo ones)
+    lnas: LnasFormat
+    # Partition box start and end, without halo
+    start: np.ndarray
+    end: np.ndarray
+    # Global idx of each local triangle (sorted)
+    triangles_idxs: np.ndarray
+    # Global idx of each local vertex (sorted)
+    vertices_idxs: np.ndarray
+    # Whether partition owns each local triangle (its centroid is in the box).
+    # Each triangle is owned by at most one partition, the others have it in halo
+    owned: np.ndarray
+
+    def triangles_global_to_local(self, triangles_idxs: np.ndarray) -> np.ndarray:
+        """Local idx of global triangles, -1 for the ones not in partition"""
+        return _global_to_local(self.triangles_idxs, triangles_idxs)
+
+    def vertices_global_to_local(self, vertices_idxs: np.ndarray) -> np.ndarray:
+        """Local idx of global vertices, -1 for the ones not in partition"""
+        return _global_to_local(self.vertices_idxs, vertices_idxs)
+
+    def save(self, filename: pathlib.Path):
+        """Save partition LNAS and, alongside it, its maps as `<filename>.maps.npz`
+
+        Args:
+            filename (pathlib.Path): LNAS filename to save to
+        """
+
+        self.lnas.to_file(filename)
+        np.savez(
+            filename.with_name(filename.name + ".maps.npz"),
+            start=self.start,
+            end=self.end,
+            triangles_idxs=self.triangles_idxs,
+            vertices_idxs=self.vertices_idxs,
+            owned=self.owned,
+        )
+
+
+def _global_to_local(local_to_global: np.ndarray, idxs: np.ndarray) -> np.ndarray:
+    idxs = np.asarray(idxs)
+    pos = np.searchsorted(local_to_global, idxs)
+    pos_clip = np.minimum(pos, max(len(local_to_global) - 1, 0))
+    found = (pos < len(local_to_global)) & (local_to_global[pos_clip] == idxs)
+    return np.where(found, pos, -1).astype(np.int64)
+
+
+def _split_counts(values: np.ndarray, n_parts: int) -> np.ndarray:
+    """Values that split sorted positions in n_parts parts with balanced counts"""
+
+    quantiles = np.arange(1, n_parts) / n_parts
+    return np.quantile(values, quantiles) if len(values) > 0 else np.zeros((n_parts - 1,))
+
+
+def partition_boxes(
+    points: np.ndarray,
+    n_parts: int,
+    method: Literal["slab", "bisection"] = "bisection",
+    axis: int | None = None,
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Split points bounding box in boxes with balanced number of points
+
+    Args:
+        points (np.ndarray): Points to balance (usually triangles centroids), shape (N, 3)
+        n_parts (int): Number of boxes
+        method (Literal["slab", "bisection"], optional): "slab" splits along a single axis,
+            "bisection" recursively splits the longest axis of each box. Defaults to "bisection".
+        axis (int | None, optional): Axis to split slabs. Defaults to None (longest axis).
+
+    Returns:
+        list[tuple[np.ndarray, np.ndarray]]: boxes (start, end)
+    """
+
+    if n_parts < 1:
+        raise ValueError(f"Number of partitions must be at least 1, got {n_parts}")
+    start, end = points.min(axis=0).astype(np.float64), points.max(axis=0).astype(np.float64)
+
+    if method == "slab":
+        if axis is None:
+            axis = int(np.argmax(end - start))
+        cuts = np.concatenate(
+            ([start[axis]], _split_counts(points[:, axis], n_parts), [end[axis]])
+        )
+        boxes = []
+        for i in range(n_parts):
+            box_start, box_end = start.copy(), end.copy()
+            box_start[axis], box_end[axis] = cuts[i], cuts[i + 1]
+            boxes.append((box_start, box_end))
+        return boxes
+    elif method == "bisection":
+        boxes = []
+        pending = [(start, end, points, n_parts)]
+        while pending:
+            box_start, box_end, box_points, n = pending.pop(0)
+            if n == 1:
+                boxes.append((box_start, box_end))
+                continue
+            split_axis = int(np.argmax(box_end - box_start))
+            n_left = n // 2
+            if len(box_points) > 0:
+                cut = float(np.quantile(box_points[:, split_axis], n_left / n))
+            else:
+                cut = (box_start[split_axis] + box_end[split_axis]) / 2
+            left_end, right_start = box_end.copy(), box_start.copy()
+            left_end[split_axis], right_start[split_axis] = cut, cut
+            is_left = box_points[:, split_axis] <= cut
+            pending.append((box_start, left_end, box_points[is_left], n_left))
+            pending.append((right_start, box_end, box_points[~is_left], n - n_left))
+        return boxes
+    raise ValueError(f"Unknown partition method {method}")
+
+
+def partition_lnas(
+    lnas: LnasFormat, boxes: list[tuple[np.ndarray, np.ndarray]], halo: float = 0
+) -> list[LnasPartition]:
+    """Split LNAS in partitions, one for each box
+
+    A partition has all triangles whose bounding box intersects its box expanded by halo.
+    Triangles are owned by the first box that contains its centroid.
+
+    Args:
+        lnas (LnasFormat): LNAS to split
+        boxes (list[tuple[np.ndarray, np.ndarray]]): boxes (start, end) of partitions
+        halo (float, optional): Halo width around each box. Defaults to 0.
+
+    Returns:
+        list[LnasPartition]: partitions, in the same order as boxes
+    """
+
+    geometry = lnas.geometry
+    n_triangles = len(geometry.triangles)
+    triangles_points = geometry.vertices[geometry.triangles]
+    triangles_min = triangles_points.min(axis=1)
+    triangles_max = triangles_points.max(axis=1)
+    centroids = triangles_points.mean(axis=1)
+    del triangles_points
+
+    owner = np.full((n_triangles,), -1, dtype=np.int64)
+    for k, (start, end) in enumerate(boxes):
+        is_inside = (centroids >= start).all(axis=1) & (centroids <= end).all(axis=1)
+        is_inside &= owner == -1
+        owner[is_inside] = k
+
+    partitions = []
+    for k, (start, end) in enumerate(boxes):
+        start, end = np.asarray(start, dtype=np.float64), np.asarray(end, dtype=np.float64)
+        is_in = (triangles_max >= start - halo).all(axis=1) & (triangles_min <= end + halo).all(
+            axis=1
+        )
+        is_in |= owner == k
+        triangles_idxs = np.flatnonzero(is_in)
+
+        triangles_remap = np.full((n_triangles,), -1, dtype=np.int64)
+        triangles_remap[triangles_idxs] = np.arange(len(triangles_idxs))
+        part_geometry = LnasGeometry(
+            vertices=geometry.vertices, triangles=geometry.triangles[triangles_idxs]
+        )
+        part_geometry, vertices_idxs = part_geometry.compact_vertices()
+        part_lnas = type(lnas)(
+            version=lnas.version,
+            geometry=part_geometry,
+            surfaces=lnas._remap_surfaces(triangles_remap),
+        )
+
+        partitions.append(
+            LnasPartition(
+                lnas=part_lnas,
+                start=start,
+                end=end,
+                triangles_idxs=triangles_idxs.astype(np.uint32),
+                vertices_idxs=vertices_idxs,
+                owned=owner[triangles_idxs] == k,
+            )
+        )
+    return partitions
+
+
+def save_partitions(
+    partitions: list[LnasPartition],
+    directory: pathlib.Path,
+    name: str = "partition",
+    n_workers: int | None = None,
+) -> list[pathlib.Path]:
+    """Save partitions in parallel, as `<directory>/<name>_<k>.lnas` (and its maps)
+
+    Args:
+        partitions (list[LnasPartition]): partitions to save
+        directory (pathlib.Path): directory to save to
+        name (str, optional): files name prefix. Defaults to "partition".
+        n_workers (int | None, optional): Number of threads. Defaults to None (executor default).
+
+    Returns:
+        list[pathlib.Path]: LNAS filenames
+    """
+
+    directory.mkdir(parents=True, exist_ok=True)
+    filenames = [directory / f"{name}_{k}.lnas" for k in range(len(partitions))]
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        futures = [executor.submit(p.save, f) for p, f in zip(partitions, filenames)]
+        for future in futures:
+            future.result()
+    return filenames
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import logging
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+__all__ = [
+    "LoggingSink",
+    "ProfileReport",
+    "SpanRecord",
+    "add_sink",
+    "is_enabled",
+    "profile",
+    "profiled",
+    "remove_sink",
+    "span",
+]
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+# Sinks receiving finished spans. Profiling is disabled when empty
+_sinks: tuple[Callable[[SpanRecord], Any], ...] = ()
+_sinks_lock = threading.Lock()
+# Stack of open spans of each thread
+_local = threading.local()
+
+
+@dataclass
+class SpanRecord:
+    """Measures of a finished span"""
+
+    # Operation name, as "lnas.from_file"
+    name: str
+    # Wall time in seconds
+    duration: float
+    # Bytes processed (read, written or produced), None if not known
+    n_bytes: int | None = None
+    # Peak memory allocated during the span, over its start. None if tracemalloc isn't tracing
+    peak_memory: int | None = None
+    # Name of the enclosing span, None for top level spans
+    parent: str | None = None
+    # Number of enclosing spans
+    depth: int = 0
+
+
+def _spans_stack() -> list[Span]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+class Span:
+    """Open span, measuring time (and memory if tracemalloc is tracing) until exited"""
+
+    __slots__ = ("_depth", "_parent", "_peak", "_start", "_start_memory", "n_bytes", "name")
+
+    def __init__(self, name: str, n_bytes: int | None = None):
+        self.name = name
+        self.n_bytes = n_bytes
+        self._parent: Span | None = None
+        self._depth = 0
+        self._start = 0.0
+        self._start_memory: int | None = None
+        self._peak = 0
+
+    def add_bytes(self, n_bytes: int):
+        """Add to bytes processed in span"""
+
+        self.n_bytes = (self.n_bytes or 0) + int(n_bytes)
+
+    def __enter__(self) -> Self:
+        stack = _spans_stack()
+        self._parent = stack[-1] if stack else None
+        self._depth = len(stack)
+        stack.append(self)
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # Peak is reset for this span, the parent keeps the peak until now
+            if self._parent is not None:
+                self._parent._peak = max(self._parent._peak, peak)
+            tracemalloc.reset_peak()
+            self._start_memory = self._peak = current
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        duration = time.perf_counter() - self._start
+        stack = _spans_stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+
+        peak_memory = None
+        if self._start_memory is not None and tracemalloc.is_tracing():
+            peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            peak_memory = peak - self._start_memory
+            if self._parent is not None:
+                self._parent._peak = max(self._parent._peak, peak)
+
+        record = SpanRecord(
+            name=self.name,
+            duration=duration,
+            n_bytes=self.n_bytes,
+            peak_memory=peak_memory,
+            parent=self._parent.name if self._parent is not None else None,
+            depth=self._depth,
+        )
+        for sink in _sinks:
+            sink(record)
+
+
+class _NullSpan:
+    """Span used when profiling is disabled, doing nothing"""
+
+    __slots__ = ()
+
+    def add_bytes(self, n_bytes: int):
+        pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, n_bytes: int | None = None) -> Span | _NullSpan:
+    """Context manager measuring an operation, sent to the sinks when exited
+
+    When no sink is added it does nothing, so instrumented code has near zero overhead.
+
+    Args:
+        name (str): Operation name
+        n_bytes (int | None, optional): Bytes processed, may be added later with
+            `add_bytes`. Defaults to None.
+
+    Example:
+        with span("yaml.load") as s:
+            if is_enabled():
+                s.add_bytes(filename.stat().st_size)
+            ...
+    """
+
+    if not _sinks:
+        return _NULL_SPAN
+    return Span(name, n_bytes)
+
+
+def is_enabled() -> bool:
+    """If profiling is enabled (there are sinks), to skip measures only used by spans"""
+
+    return bool(_sinks)
+
+
+def profiled(name: str) -> Callable[[_F], _F]:
+    """Decorator measuring each call of the function as a span named `name`"""
+
+    def decorator(func: _F) -> _F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _sinks:
+                return func(*args, **kwargs)
+            with Span(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def add_sink(sink: Callable[[SpanRecord], Any]):
+    """Add sink to receive finished spans, enabling profiling
+
+    Sinks are called in the thread that finished the span, so must be thread safe if
+    operations run in multiple threads.
+    """
+
+    global _sinks
+    with _sinks_lock:
+        _sinks = (*_sinks, sink)
+
+
+def remove_sink(sink: Callable[[SpanRecord], Any]):
+    """Remove sink added with `add_sink`. Profiling is disabled without sinks"""
+
+    global _sinks
+    with _sinks_lock:
+        sinks = list(_sinks)
+        sinks.remove(sink)
+        _sinks = tuple(sinks)
+
+
+class LoggingSink:
+    """Sink logging each span, indented by its depth"""
+
+    def __init__(self, logger: logging.Logger | None = None, level: int = logging.INFO):
+        self.logger = logger if logger is not None else logging.getLogger("lnas.profiling")
+        self.level = level
+
+    def __call__(self, record: SpanRecord):
+        if not self.logger.isEnabledFor(self.level):
+            return
+        msg = f"{'  ' * record.depth}{record.name}: {record.duration * 1e3:.2f} ms"
+        if record.n_bytes is not None:
+            msg += f", {record.n_bytes / 2**20:.2f} MiB processed"
+        if record.peak_memory is not None:
+            msg += f", {record.peak_memory / 2**20:.2f} MiB peak"
+        self.logger.log(self.level, msg)
+
+
+class ProfileReport:
+    """Sink keeping spans in memory, summarized by operation name"""
+
+    def __init__(self):
+        self.records: list[SpanRecord] = []
+
+    def __call__(self, record: SpanRecord):
+        self.records.append(record)
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Spans summary by name, in order of first finish
+
+        Returns:
+            dict[str, dict[str, Any]]: for each name, "count", "total_time" (seconds),
+                "n_bytes" (sum, None if never given) and "peak_memory" (max, None if not
+                traced)
+        """
+
+        summary: dict[str, dict[str, Any]] = {}
+        for record in list(self.records):
+            entry = summary.setdefault(
+                record.name, {"count": 0, "total_time": 0.0, "n_bytes": None, "peak_memory": None}
+            )
+            entry["count"] += 1
+            entry["total_time"] += record.duration
+            if record.n_bytes is not None:
+                entry["n_bytes"] = (entry["n_bytes"] or 0) + record.n_bytes
+            if record.peak_memory is not None:
+                entry["peak_memory"] = max(entry["peak_memory"] or 0, record.peak_memory)
+        return summary
+
+    def format(self) -> str:
+        """Summary as a text table, slowest operations first"""
+
+        summary = sorted(self.summary().items(), key=lambda item: -item[1]["total_time"])
+        lines = [f"{'operation':<32} {'count':>7} {'time (ms)':>12} {'MiB':>10} {'peak MiB':>10}"]
+        for name, entry in summary:
+            n_bytes, peak = entry["n_bytes"], entry["peak_memory"]
+            lines.append(
+                f"{name:<32} {entry['count']:>7} {entry['total_time'] * 1e3:>12.2f} "
+                f"{'-' if n_bytes is None else f'{n_bytes / 2**20:.2f}':>10} "
+                f"{'-' if peak is None else f'{peak / 2**20:.2f}':>10}"
+            )
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def profile(
+    sink: Callable[[SpanRecord], Any] | None = None, trace_memory: bool = False
+) -> Iterator[Any]:
+    """Profile lnas operations inside the context
+
+    Args:
+        sink (Callable[[SpanRecord], Any] | None, optional): Sink of spans, as a
+            `LoggingSink` or any callable. Defaults to None (a new `ProfileReport`).
+        trace_memory (bool, optional): Trace allocations with `tracemalloc` to measure
+            peak memory of spans, if not already tracing. Slows down operations.
+            Defaults to False.
+
+    Yields:
+        Iterator[Any]: the sink
+
+    Example:
+        with profile() as report:
+            LnasFormat.from_file(filename)
+        print(report.format())
+    """
+
+    if sink is None:
+        sink = ProfileReport()
+    start_tracing = trace_memory and not tracemalloc.is_tracing()
+    if start_tracing:
+        tracemalloc.start()
+    add_sink(sink)
+    try:
+        yield sink
+    finally:
+        remove_sink(sink)
+        if start_tracing:
+            tracemalloc.stop()
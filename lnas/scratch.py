@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import tempfile
+from collections.abc import Callable, Iterator
+
+import numpy as np
+
+__all__ = ["ScratchSpace"]
+
+
+class ScratchSpace:
+    """Memmapped arrays in scratch files, filled in chunks of rows
+
+    Files are in a temporary directory, removed with `cleanup` or when the object is
+    garbage collected.
+    """
+
+    def __init__(self, scratch_dir: pathlib.Path | str | None = None, chunk_size: int = 1 << 20):
+        """Scratch space constructor
+
+        Args:
+            scratch_dir (pathlib.Path | str | None, optional): Directory to create the
+                scratch files in. Defaults to None (system temporary directory).
+            chunk_size (int, optional): Rows processed at a time. Defaults to 2**20.
+        """
+
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size must be at least 1. It is {chunk_size}")
+        if scratch_dir is not None:
+            pathlib.Path(scratch_dir).mkdir(parents=True, exist_ok=True)
+        self._tmp_dir = tempfile.TemporaryDirectory(prefix="lnas_", dir=scratch_dir)
+        self.directory = pathlib.Path(self._tmp_dir.name)
+        self.chunk_size = chunk_size
+
+    def cleanup(self):
+        """Remove scratch files. Arrays using them must not be accessed afterwards"""
+
+        self._tmp_dir.cleanup()
+
+    def zeros(self, shape: tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        """Memmapped array in a new scratch file, filled with zeros"""
+
+        fd, filename = tempfile.mkstemp(suffix=".npy", dir=self.directory)
+        os.close(fd)
+        return np.lib.format.open_memmap(filename, mode="w+", dtype=dtype, shape=shape)
+
+    def chunks(self, n: int) -> Iterator[tuple[int, int]]:
+        """Chunks (start, end) of `n` rows"""
+
+        for start in range(0, n, self.chunk_size):
+            yield start, min(start + self.chunk_size, n)
+
+    def map_chunks(self, func: Callable[[int, int], np.ndarray], n: int) -> np.ndarray:
+        """Memmapped array with rows `func(start, end)` of each chunk
+
+        Args:
+            func (Callable[[int, int], np.ndarray]): Rows values of chunk (start, end)
+            n (int): Number of rows
+
+        Returns:
+            np.ndarray: memmapped array with all rows
+        """
+
+        values = func(0, min(n, self.chunk_size))
+        arr = self.zeros((n, *values.shape[1:]), values.dtype)
+        arr[: len(values)] = values
+        for start, end in self.chunks(n):
+            if start > 0:
+                arr[start:end] = func(start, end)
+        return arr
+
+    def filter_rows(self, arr: np.ndarray, rows_use: np.ndarray) -> np.ndarray:
+        """Memmapped array with the rows of `arr` where `rows_use` (bool mask) is true"""
+
+        filtered = self.zeros((int(np.count_nonzero(rows_use)), *arr.shape[1:]), arr.dtype)
+        n_filtered = 0
+        for start, end in self.chunks(len(arr)):
+            chunk = np.asarray(arr[start:end])[rows_use[start:end]]
+            filtered[n_filtered : n_filtered + len(chunk)] = chunk
+            n_filtered += len(chunk)
+        return filtered
+
+    def any_rows(self, func: Callable[[int, int], np.ndarray], n: int) -> bool:
+        """If `func(start, end)` (bool array) has any true value for a chunk"""
+
+        return any(bool(np.any(func(start, end))) for start, end in self.chunks(n))
+
+    def scatter_add(
+        self, idxs: np.ndarray, n_out: int, func: Callable[[int, int], np.ndarray]
+    ) -> np.ndarray:
+        """Sum values of rows into output idxs, as float64
+
+        Each chunk is reduced to its unique idxs before being added to the memmapped output,
+        so only the output pages of the idxs used are accessed.
+
+        Args:
+            idxs (np.ndarray): Output idxs of each row (shape (N, m))
+            n_out (int): Output size
+            func (Callable[[int, int], np.ndarray]): Values of rows (start, end), with shape
+                (end - start, m) or (end - start, m, k)
+
+        Returns:
+            np.ndarray: memmapped sums, shape (n_out,) or (n_out, k)
+        """
+
+        values = func(0, min(len(idxs), self.chunk_size))
+        values_shape = values.shape[2:]
+        sums = self.zeros((n_out, int(np.prod(values_shape))), np.float64)
+        for start, end in self.chunks(len(idxs)):
+            if start > 0:
+                values = func(start, end)
+            chunk_idxs = np.asarray(idxs[start:end]).ravel()
+            unique_idxs, inverse = np.unique(chunk_idxs, return_inverse=True)
+            values_flat = values.reshape((len(chunk_idxs), -1))
+            for k in range(values_flat.shape[1]):
+                sums[unique_idxs, k] += np.bincount(
+                    inverse.ravel(), weights=values_flat[:, k], minlength=len(unique_idxs)
+                )
+        return sums.reshape((n_out, *values_shape))
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+__all__ = ["CrossSection", "cross_sections"]
+
+
+@dataclass
+class CrossSection:
+    """Intersection of a geometry with a plane, as polylines"""
+
+    # Plane offset from origin, along its normal
+    offset: float
+    # Segments start and end points (shape is (Ns, 2, 3))
+    segments: np.ndarray
+    # Triangle of each segment (shape is (Ns,))
+    triangles_idxs: np.ndarray
+    # Segments of polyline i are `segments[polylines_indptr[i] : polylines_indptr[i + 1]]`
+    polylines_indptr: np.ndarray
+    # If each polyline is a closed loop
+    closed: np.ndarray
+    # Surface label of each segment (-1 for no surface) and surfaces names, for LNAS sections
+    surfaces_labels: np.ndarray | None = None
+    surfaces_names: list[str] | None = None
+
+    @property
+    def polylines(self) -> list[np.ndarray]:
+        """Points of each polyline. Closed loops repeat the first point at the end"""
+
+        return [
+            np.concatenate((self.segments[start:end, 0], self.segments[end - 1 : end, 1]))
+            for start, end in zip(self.polylines_indptr[:-1], self.polylines_indptr[1:])
+        ]
+
+
+def _pointer_min(labels: np.ndarray, ptr: np.ndarray) -> np.ndarray:
+    # Minimum label along pointers (ptr[i] == i at chains end), by pointer doubling.
+    # Pointers in loops never settle, so it runs until covering the longest loop
+    labels = labels.copy()
+    for _ in range(max(1, len(ptr).bit_length())):
+        labels = np.minimum(labels, labels[ptr])
+        ptr = ptr[ptr]
+    return labels
+
+
+def _chain_distances(nxt: np.ndarray) -> np.ndarray:
+    # Number of segments after each one in its chain, by pointer doubling (Wyllie)
+    ptr = np.where(nxt >= 0, nxt, np.arange(len(nxt)))
+    dist = (nxt >= 0).astype(np.int64)
+    for _ in range(max(1, len(ptr).bit_length())):
+        dist = dist + dist[ptr]
+        ptr = ptr[ptr]
+    return dist
+
+
+def _group_polylines(
+    starts: np.ndarray, ends: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Group segments into polylines, following the start and end nodes of each segment
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: polyline of each segment (as its lowest
+            segment idx), position of segment in polyline (descending) and if it's in a loop
+    """
+
+    n_segments = len(starts)
+    idxs = np.arange(n_segments)
+    segment_of_start = np.full((max(starts.max(initial=0), ends.max(initial=0)) + 1,), -1)
+    segment_of_start[starts] = idxs
+    nxt = segment_of_start[ends]
+    # Keep only one previous segment for each one, for non manifold nodes
+    prv = np.full((n_segments,), -1, dtype=np.int64)
+    prv[nxt[nxt >= 0]] = idxs[nxt >= 0]
+    nxt[(nxt >= 0) & (prv[np.maximum(nxt, 0)] != idxs)] = -1
+
+    labels = np.minimum(
+        _pointer_min(idxs, np.where(nxt >= 0, nxt, idxs)),
+        _pointer_min(idxs, np.where(prv >= 0, prv, idxs)),
+    )
+
+    # Loops have no segment without previous. They are cut before their lowest segment
+    has_head = np.zeros((n_segments,), dtype=bool)
+    has_head[labels[prv < 0]] = True
+    is_loop = ~has_head[labels]
+    loops_starts = np.flatnonzero(is_loop & (labels == idxs))
+    nxt[prv[loops_starts]] = -1
+
+    return labels, _chain_distances(nxt), is_loop
+
+
+def cross_sections(
+    vertices: np.ndarray,
+    triangles: np.ndarray,
+    normal: np.ndarray,
+    offsets: np.ndarray,
+    origin: np.ndarray,
+) -> list[CrossSection]:
+    """Intersect triangles with parallel planes `normal . (x - origin) = offset`
+
+    Vectorized over triangles and planes: each triangle is only tested against the planes
+    between its minimum and maximum distance. Vertices on a plane count as above it,
+    so segments are not repeated for edges lying on the plane.
+
+    Segments point along `triangle normal x plane normal`: for a closed geometry with
+    normals pointing out, loops turn clockwise around the plane normal.
+
+    Args:
+        vertices (np.ndarray): Vertices (shape (Nv, 3))
+        triangles (np.ndarray): Triangles (shape (Nt, 3))
+        normal (np.ndarray): Planes normal
+        offsets (np.ndarray): Planes offsets along normal
+        origin (np.ndarray): Planes origin
+
+    Returns:
+        list[CrossSection]: cross section of each plane, in the same order as offsets
+    """
+
+    normal = np.asarray(normal, dtype=np.float64)
+    norm = np.linalg.norm(normal)
+    if norm == 0:
+        raise ValueError("Planes normal must not be zero")
+    normal = normal / norm
+    offsets = np.atleast_1d(np.asarray(offsets, dtype=np.float64))
+    if len(offsets) == 0:
+        return []
+    planes_order = np.argsort(offsets, kind="stable")
+    sorted_offsets = offsets[planes_order]
+
+    vertices = np.asarray(vertices, dtype=np.float64)
+    triangles = np.asarray(triangles, dtype=np.int64)
+    n_vertices = len(vertices)
+    dist = (vertices - np.asarray(origin, dtype=np.float64)) @ normal
+
+    # Pairs of triangle and plane where the plane is between triangle vertices
+    triangles_dist = dist[triangles]
+    first = np.searchsorted(sorted_offsets, triangles_dist.min(axis=1), side="left")
+    counts = np.searchsorted(sorted_offsets, triangles_dist.max(axis=1), side="right") - first
+    pairs_triangles = np.repeat(np.arange(len(triangles)), counts)
+    pairs_planes = np.repeat(first - (np.cumsum(counts) - counts), counts) + np.arange(
+        counts.sum()
+    )
+
+    pairs_dist = triangles_dist[pairs_triangles] - sorted_offsets[pairs_planes, np.newaxis]
+    above = pairs_dist >= 0
+    n_above = np.count_nonzero(above, axis=1)
+    is_cut = (n_above == 1) | (n_above == 2)
+    pairs_triangles, pairs_planes = pairs_triangles[is_cut], pairs_planes[is_cut]
+    above, one_above = above[is_cut], n_above[is_cut] == 1
+
+    # Rotate triangles so the vertex alone in its side comes first, keeping the winding
+    alone = np.where(one_above[:, np.newaxis], above, ~above)
+    rotation = (alone.argmax(axis=1)[:, np.newaxis] + np.arange(3)) % 3
+    a, b, c = np.take_along_axis(triangles[pairs_triangles], rotation, axis=1).T
+
+    # Nodes are the crossing edges (lo, hi) or the vertex v (as (v, v)) lying on the plane
+    def edge_nodes(v0: np.ndarray, v1: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        lo, hi = np.minimum(v0, v1), np.maximum(v0, v1)
+        plane_offsets = sorted_offsets[pairs_planes]
+        dist_lo, dist_hi = dist[lo] - plane_offsets, dist[hi] - plane_offsets
+        lo = np.where(dist_hi == 0, hi, lo)
+        hi = np.where(dist_lo == 0, lo, hi)
+        t = np.zeros_like(dist_lo)
+        is_edge = lo != hi
+        t[is_edge] = dist_lo[is_edge] / (dist_lo[is_edge] - dist_hi[is_edge])
+        points = vertices[lo] + t[:, np.newaxis] * (vertices[hi] - vertices[lo])
+        return lo * n_vertices + hi, points
+
+    nodes_ab, points_ab = edge_nodes(a, b)
+    nodes_ac, points_ac = edge_nodes(a, c)
+
+    # Segments go from the edge crossing up to the edge crossing down the plane
+    starts = np.where(one_above, nodes_ac, nodes_ab)
+    ends = np.where(one_above, nodes_ab, nodes_ac)
+    segments = np.where(
+        one_above[:, np.newaxis, np.newaxis],
+        np.stack((points_ac, points_ab), axis=1),
+        np.stack((points_ab, points_ac), axis=1),
+    )
+
+    # Segments with a single vertex on the plane are degenerate
+    is_valid = starts != ends
+    starts, ends = starts[is_valid], ends[is_valid]
+    segments, pairs_triangles = segments[is_valid], pairs_triangles[is_valid]
+    pairs_planes = pairs_planes[is_valid]
+
+    # Nodes ids are unique per plane, so polylines don't link segments from different planes
+    nodes = np.concatenate((starts, ends))
+    _, nodes = np.unique(nodes, return_inverse=True)
+    _, nodes = np.unique(
+        np.tile(pairs_planes, 2) * len(starts) * 2 + nodes.ravel(), return_inverse=True
+    )
+    nodes = nodes.ravel()
+    labels, distances, is_loop = _group_polylines(nodes[: len(starts)], nodes[len(starts) :])
+    order = np.lexsort((-distances, labels, pairs_planes))
+    labels, is_loop = labels[order], is_loop[order]
+
+    segments_planes = pairs_planes[order]
+    planes_indptr = np.searchsorted(segments_planes, np.arange(len(offsets) + 1))
+    sections = []
+    for plane_idx in range(len(offsets)):
+        start, end = planes_indptr[plane_idx], planes_indptr[plane_idx + 1]
+        plane_labels = labels[start:end]
+        is_polyline_start = np.ones((end - start,), dtype=bool)
+        is_polyline_start[1:] = plane_labels[1:] != plane_labels[:-1]
+        polylines_starts = np.flatnonzero(is_polyline_start)
+        sections.append(
+            CrossSection(
+                offset=float(sorted_offsets[plane_idx]),
+                segments=segments[order[start:end]].astype(np.float32),
+                triangles_idxs=pairs_triangles[order[start:end]].astype(np.uint32),
+                polylines_indptr=np.append(polylines_starts, end - start),
+                closed=is_loop[start:end][polylines_starts],
+            )
+        )
+
+    # Sections in the same order as the offsets given
+    planes_rank = np.empty_like(planes_order)
+    planes_rank[planes_order] = np.arange(len(planes_order))
+    return [sections[rank] for rank in planes_rank]
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import sys
+import weakref
+from dataclasses import dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from lnas.fmt import LnasFormat
+from lnas.geometry import _DERIVED_ATTRS, LnasGeometry
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+__all__ = ["SharedLnas", "SharedLnasHandle"]
+
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    """Array in a shared memory block"""
+
+    # Shared memory block name
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+@dataclass(frozen=True)
+class SharedLnasHandle:
+    """Description of a LNAS published in shared memory, sent to workers to attach to it"""
+
+    version: str
+    # Arrays by key ("vertices", "triangles", "surfaces" and derived values)
+    arrays: dict[str, SharedArraySpec]
+    # Surface i is `surfaces[surfaces_indptr[i] : surfaces_indptr[i + 1]]`
+    surfaces_names: tuple[str, ...]
+    surfaces_indptr: tuple[int, ...]
+
+    def attach(self) -> SharedLnas:
+        """Attach to the published LNAS, see `SharedLnas.attach`"""
+
+        return SharedLnas.attach(self)
+
+
+def _create_block(arr: np.ndarray) -> tuple[SharedMemory, SharedArraySpec]:
+    arr = np.ascontiguousarray(arr)
+    # Blocks can't be empty
+    block = SharedMemory(create=True, size=max(1, arr.nbytes))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=block.buf)[...] = arr
+    return block, SharedArraySpec(name=block.name, shape=arr.shape, dtype=arr.dtype.str)
+
+
+def _attach_block(name: str) -> SharedMemory:
+    # Blocks are owned by the publisher. Python < 3.13 registers attached blocks to be
+    # unlinked when the process exits, so registration is skipped
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _release_blocks(blocks: list[SharedMemory], unlink: bool):
+    # Called on garbage collection. Blocks are unlinked first, so they are removed even if
+    # still mapped by arrays, which release the mapping with them
+    if unlink:
+        for block in blocks:
+            block.unlink()
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            pass
+
+
+class SharedLnas:
+    """LNAS in shared memory blocks, published once and attached by worker processes
+
+    The publisher copies the LNAS arrays into shared memory and sends `handle` (small and
+    picklable) to workers, which attach to it as a zero copy, read only `LnasFormat`. So N
+    workers share one copy of the mesh.
+
+    Blocks are unlinked by the publisher on `close` (or when it's garbage collected), and
+    workers only release their mapping. Arrays of `lnas` must not be used after `close`.
+
+    Example:
+        with SharedLnas.publish(lnas) as shared:
+            executor.map(analyse, repeat(shared.handle), surfaces)
+
+        def analyse(handle, surface):
+            with handle.attach() as shared:
+                shared.lnas.geometry_from_surface(surface)
+    """
+
+    def __init__(
+        self, lnas: LnasFormat, handle: SharedLnasHandle, blocks: list[SharedMemory], owner: bool
+    ):
+        self.lnas: LnasFormat | None = lnas
+        self.handle = handle
+        self.owner = owner
+        self._blocks = blocks
+        self._unlinked = False
+        self._finalizer = weakref.finalize(self, _release_blocks, blocks, owner)
+
+    @classmethod
+    def publish(cls, lnas: LnasFormat, include_derived: bool = True) -> SharedLnas:
+        """Copy LNAS into shared memory blocks
+
+        Args:
+            lnas (LnasFormat): LNAS to publish
+            include_derived (bool, optional): Publish the geometry derived values already
+                calculated (triangles vertices, normals, areas, vertices normals and
+                vertices areas), so workers don't recalculate them. Defaults to True.
+
+        Returns:
+            SharedLnas: published LNAS, owner of the blocks
+        """
+
+        surfaces_names = tuple(lnas.surfaces.keys())
+        surfaces_arrs = [np.asarray(lnas.surfaces[s], dtype=np.uint32) for s in surfaces_names]
+        surfaces_indptr = np.cumsum([0] + [len(arr) for arr in surfaces_arrs])
+
+        arrays = {
+            "vertices": lnas.geometry.vertices,
+            "triangles": lnas.geometry.triangles,
+            "surfaces": np.concatenate(surfaces_arrs + [np.zeros((0,), dtype=np.uint32)]),
+        }
+        if include_derived:
+            geometry = lnas.geometry
+            for attr in _DERIVED_ATTRS:
+                if hasattr(geometry, attr):
+                    arrays[attr] = getattr(geometry, attr)
+            for scheme, arr in getattr(geometry, "_vertices_areas", {}).items():
+                arrays[f"_vertices_areas.{scheme}"] = arr
+
+        blocks, specs = [], {}
+        try:
+            for key, arr in arrays.items():
+                block, specs[key] = _create_block(arr)
+                blocks.append(block)
+        except BaseException:
+            _release_blocks(blocks, unlink=True)
+            raise
+
+        handle = SharedLnasHandle(
+            version=lnas.version,
+            arrays=specs,
+            surfaces_names=surfaces_names,
+            surfaces_indptr=tuple(int(i) for i in surfaces_indptr),
+        )
+        return cls(_lnas_from_blocks(handle, blocks), handle, blocks, owner=True)
+
+    @classmethod
+    def attach(cls, handle: SharedLnasHandle) -> SharedLnas:
+        """Attach to a LNAS published in shared memory, without copying it
+
+        Args:
+            handle (SharedLnasHandle): Handle of the published LNAS
+
+        Returns:
+            SharedLnas: attached LNAS, with read only arrays
+        """
+
+        blocks = []
+        try:
+            for spec in handle.arrays.values():
+                blocks.append(_attach_block(spec.name))
+        except BaseException:
+            _release_blocks(blocks, unlink=False)
+            raise
+        return cls(_lnas_from_blocks(handle, blocks), handle, blocks, owner=False)
+
+    def close(self):
+        """Release shared memory, unlinking the blocks if this is the publisher
+
+        The mapping is only released when no array of `lnas` is referenced, otherwise
+        `close` may be called again after deleting them.
+
+        Raises:
+            BufferError: arrays of `lnas` are still referenced
+        """
+
+        self.lnas = None
+        self._finalizer.detach()
+        if self.owner and not self._unlinked:
+            for block in self._blocks:
+                block.unlink()
+            self._unlinked = True
+        for block in self._blocks:
+            block.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _lnas_from_blocks(handle: SharedLnasHandle, blocks: list[SharedMemory]) -> LnasFormat:
+    arrays = {}
+    for (key, spec), block in zip(handle.arrays.items(), blocks):
+        # Arrays keep the buffer exported, so the block can't be closed while they are used
+        count = int(np.prod(spec.shape))
+        arr = np.frombuffer(block.buf, dtype=np.dtype(spec.dtype), count=count)
+        arr = arr.reshape(spec.shape)
+        arr.flags.writeable = False
+        arrays[key] = arr
+
+    geometry = LnasGeometry(vertices=arrays["vertices"], triangles=arrays["triangles"])
+    for key, arr in arrays.items():
+        if key in _DERIVED_ATTRS:
+            setattr(geometry, key, arr)
+        elif key.startswith("_vertices_areas."):
+            if not hasattr(geometry, "_vertices_areas"):
+                geometry._vertices_areas = {}
+            geometry._vertices_areas[key.split(".", 1)[1]] = arr
+
+    indptr = handle.surfaces_indptr
+    surfaces = {
+        name: arrays["surfaces"][indptr[i] : indptr[i + 1]]
+        for i, name in enumerate(handle.surfaces_names)
+    }
+    return LnasFormat(version=handle.version, geometry=geometry, surfaces=surfaces)
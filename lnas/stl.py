@@ -1,7 +1,30 @@
 import io
+import pathlib
 
 import numpy as np
 
+# Binary STL triangle record (50 bytes)
+_STL_TRIANGLE_DTYPE = np.dtype(
+    [("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")]
+)
+# Keywords of an ASCII STL facet, around its normal and vertices values
+_ASCII_FACET_KEYWORDS = b"facet normal outer loop vertex vertex vertex endloop endfacet"
+_ASCII_KEYWORDS_LETTERS = bytes(sorted(set(_ASCII_FACET_KEYWORDS) - set(b" ")))
+# Keywords letters of a facet, in order, without "e" (also used by values exponents)
+_ASCII_FACET_LETTERS = _ASCII_FACET_KEYWORDS.replace(b" ", b"").replace(b"e", b"")
+# Translation keeping only keywords letters (lower case) without "e"
+_ASCII_LETTERS_TABLE = bytes.maketrans(_ASCII_KEYWORDS_LETTERS.upper(), _ASCII_KEYWORDS_LETTERS)
+_ASCII_LETTERS_DELETE = bytes(
+    set(range(256)) - set(_ASCII_KEYWORDS_LETTERS + _ASCII_KEYWORDS_LETTERS.upper()) | set(b"eE")
+)
+# Translation replacing keywords letters by spaces, but "e" (lower case)
+_ASCII_VALUES_TABLE = bytes.maketrans(
+    _ASCII_KEYWORDS_LETTERS + _ASCII_KEYWORDS_LETTERS.upper(),
+    bytes(c if c == ord("e") else ord(" ") for c in _ASCII_KEYWORDS_LETTERS * 2),
+)
+# Values of a facet: normal and 3 vertices
+_ASCII_FACET_N_VALUES = 12
+
 
 def stl_binary(triangles: np.ndarray, normals: np.ndarray) -> bytes:
     """Binary representation of triangles and its normals in STL format
@@ -50,8 +73,109 @@ def stl_binary(triangles: np.ndarray, normals: np.ndarray) -> bytes:
     return stl_content
 
 
+def _is_ascii_stl(head: bytes, size: int) -> bool:
+    # ASCII STL starts with "solid", but binary headers may as well. Binary files size
+    # matches the number of triangles after the header
+    if head.lstrip()[:5].lower() != b"solid":
+        return False
+    if size >= 84:
+        n_triangles = int.from_bytes(head[80:84], "little")
+        return size != 84 + n_triangles * _STL_TRIANGLE_DTYPE.itemsize
+    return True
+
+
+def is_ascii_stl(content: bytes) -> bool:
+    """If STL content is ASCII (binary otherwise)"""
+
+    return _is_ascii_stl(content[:84], len(content))
+
+
+def is_ascii_stl_file(filename: pathlib.Path | str) -> bool:
+    """If STL file is ASCII (binary otherwise), reading only its header"""
+
+    with open(filename, "rb") as f:
+        head = f.read(84)
+    return _is_ascii_stl(head, pathlib.Path(filename).stat().st_size)
+
+
+def _ascii_solids_bodies(content: bytes) -> list[tuple[str, int, int]]:
+    # Name and body (start, end) of each "solid <name>" ... "endsolid" block
+    lowered = content.lower()
+    solids = []
+    name, body_start = None, 0
+    pos = lowered.find(b"solid")
+    while pos >= 0:
+        line_end = lowered.find(b"\n", pos)
+        line_end = len(content) if line_end < 0 else line_end
+        if lowered[max(0, pos - 3) : pos] == b"end":
+            if name is None:
+                raise ValueError("ASCII STL has `endsolid` without `solid`")
+            solids.append((name, body_start, pos - 3))
+            name = None
+        else:
+            if name is not None:
+                raise ValueError(f"ASCII STL solid {name!r} has no `endsolid`")
+            name = content[pos + 5 : line_end].strip().decode(errors="replace")
+            body_start = line_end
+        pos = lowered.find(b"solid", line_end)
+    if name is not None:
+        raise ValueError(f"ASCII STL solid {name!r} has no `endsolid`")
+    return solids
+
+
+def _read_ascii_facets(body: bytes, name: str) -> tuple[np.ndarray, np.ndarray]:
+    # Keywords letters must repeat in facets order, then keywords are replaced by spaces
+    # and all values are parsed at once
+    letters = body.translate(_ASCII_LETTERS_TABLE, _ASCII_LETTERS_DELETE)
+    n_facets = len(letters) // len(_ASCII_FACET_LETTERS)
+    if letters != _ASCII_FACET_LETTERS * n_facets:
+        raise ValueError(f"ASCII STL solid {name!r} has invalid facets")
+    if n_facets == 0:
+        if body.strip():
+            raise ValueError(f"ASCII STL solid {name!r} has invalid facets")
+        return np.empty((0, 3, 3), dtype=np.float32), np.empty((0, 3), dtype=np.float32)
+
+    # "e" of keywords are the ones not after a digit or point (as exponents are)
+    text = bytearray(body.translate(_ASCII_VALUES_TABLE))
+    chars = np.frombuffer(text, dtype=np.uint8)
+    e_idxs = np.flatnonzero(chars == ord("e"))
+    e_prev = chars[e_idxs - 1]
+    is_exponent = ((e_prev - np.uint8(ord("0"))) < 10) | (e_prev == ord("."))
+    chars[e_idxs[~is_exponent]] = ord(" ")
+
+    try:
+        values = np.fromstring(bytes(text), dtype=np.float64, sep=" ")
+    except ValueError as e:
+        raise ValueError(f"ASCII STL solid {name!r} has invalid values") from e
+    if len(values) != n_facets * _ASCII_FACET_N_VALUES:
+        raise ValueError(f"ASCII STL solid {name!r} has incomplete facets")
+    # Parsed as float64, then rounded to float32 as binary STL values
+    values = values.astype(np.float32).reshape((n_facets, _ASCII_FACET_N_VALUES))
+    return values[:, 3:].reshape((n_facets, 3, 3)), values[:, :3].copy()
+
+
+def read_stl_ascii(content: bytes) -> list[tuple[str, np.ndarray, np.ndarray]]:
+    """Read ASCII STL content, with each `solid <name>` block on its own
+
+    Args:
+        content (bytes): ASCII STL content
+
+    Returns:
+        list[tuple[str, np.ndarray, np.ndarray]]: (name, triangles, normals) of each solid,
+            in file order. Unnamed solids have an empty name.
+    """
+
+    solids = [
+        (name, *_read_ascii_facets(content[start:end], name))
+        for name, start, end in _ascii_solids_bodies(content)
+    ]
+    if sum(len(triangles) for _, triangles, _ in solids) == 0:
+        raise ValueError("Unable to read ASCII STL with no facets")
+    return solids
+
+
 def read_stl(buff: io.BytesIO) -> tuple[np.ndarray, np.ndarray]:
-    """Read buffer content as STL file
+    """Read buffer content as STL file, binary or ASCII (all solids together)
 
     Args:
         buff (io.BufferedReader): buffer to read from
@@ -60,22 +184,142 @@ def read_stl(buff: io.BytesIO) -> tuple[np.ndarray, np.ndarray]:
         tuple[np.ndarray, np.ndarray]: return STL representation as (triangles, normals).
     """
 
-    # pass header
-    buff.read(80)
-    # Read number of triangles
+    content = buff.read()
+    if is_ascii_stl(content):
+        solids = read_stl_ascii(content)
+        triangles = np.concatenate([triangles for _, triangles, _ in solids])
+        normals = np.concatenate([normals for _, _, normals in solids])
+        return triangles, normals
 
-    n_triangles = np.frombuffer(buff.read(4), dtype=np.uint32)[0]
+    # Pass header and read number of triangles
+    n_triangles = (
+        int(np.frombuffer(content[80:84], dtype=np.uint32)[0]) if len(content) >= 84 else 0
+    )
     if n_triangles == 0:
         raise ValueError("Unable to read number of triangles as 0")
 
-    triangles = np.empty((n_triangles, 3, 3), dtype=np.float32)
-    normals = np.empty((n_triangles, 3), dtype=np.float32)
-
-    for idx in range(n_triangles):
-        content = buff.read(50)
-        normal = np.frombuffer(content[0:12], dtype=np.float32)
-        triangle = np.frombuffer(content[12:48], dtype=np.float32).reshape((3, 3))
-        triangles[idx] = triangle
-        normals[idx] = normal
+    if len(content) < 84 + n_triangles * _STL_TRIANGLE_DTYPE.itemsize:
+        raise ValueError(f"STL content is smaller than its {n_triangles} triangles")
+    records = np.frombuffer(content, dtype=_STL_TRIANGLE_DTYPE, count=n_triangles, offset=84)
 
+    triangles = records["vertices"].astype(np.float32)
+    normals = records["normal"].astype(np.float32)
     return triangles, normals
+
+
+def read_stl_solids(filename: pathlib.Path | str) -> list[tuple[str, np.ndarray, np.ndarray]]:
+    """Read STL file solids, discarding degenerate triangles (area < 1e-5) as `stl2lnas`
+
+    ASCII files give each `solid <name>` block, and binary files a single solid. Solids
+    without name are named after the file stem.
+
+    Args:
+        filename (pathlib.Path | str): STL filename
+
+    Returns:
+        list[tuple[str, np.ndarray, np.ndarray]]: (name, triangles, normals) of each solid
+    """
+
+    with open(filename, "rb") as f:
+        content = f.read()
+    stem = pathlib.Path(filename).stem
+    if is_ascii_stl(content):
+        solids = [(name or stem, t, n) for name, t, n in read_stl_ascii(content)]
+    else:
+        solids = [(stem, *read_stl(io.BytesIO(content)))]
+
+    valid_solids = []
+    for name, triangles, normals in solids:
+        valid = valid_triangles(triangles)
+        valid_solids.append((name, triangles[valid], normals[valid]))
+    return valid_solids
+
+
+def read_stl_valid(filename: pathlib.Path | str) -> tuple[np.ndarray, np.ndarray]:
+    """Read STL file, discarding degenerate triangles (area < 1e-5) as `stl2lnas`
+
+    Args:
+        filename (pathlib.Path | str): STL filename
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: return STL representation as (triangles, normals).
+    """
+
+    with open(filename, "rb") as f:
+        triangles, normals = read_stl(io.BytesIO(f.read()))
+
+    valid = valid_triangles(triangles)
+    return triangles[valid], normals[valid]
+
+
+def valid_triangles(triangles: np.ndarray) -> np.ndarray:
+    """Mask of triangles that are not degenerate (area >= 1e-5), as `stl2lnas`
+
+    Args:
+        triangles (np.ndarray): Triangles vertices, shape (N, 3, 3)
+
+    Returns:
+        np.ndarray: bool mask of valid triangles
+    """
+
+    e1 = triangles[:, 1] - triangles[:, 0]
+    e2 = triangles[:, 2] - triangles[:, 0]
+    areas = np.linalg.norm(np.cross(e1, e2), axis=1) / 2.0
+    return areas >= 1e-5
+
+
+def open_stl(filename: pathlib.Path | str) -> np.ndarray:
+    """Open binary STL file as a memmap of triangles records, without reading it
+
+    Records have fields "normal" (shape (3,)), "vertices" (shape (3, 3)) and "attribute".
+
+    Args:
+        filename (pathlib.Path | str): STL filename
+
+    Returns:
+        np.ndarray: triangles records (memmap)
+    """
+
+    if is_ascii_stl_file(filename):
+        raise ValueError(f"Unable to open ASCII STL {filename} as binary records")
+    with open(filename, "rb") as f:
+        head = f.read(84)
+    n_triangles = int(np.frombuffer(head[80:84], dtype=np.uint32)[0])
+    if n_triangles == 0:
+        raise ValueError("Unable to read number of triangles as 0")
+    if pathlib.Path(filename).stat().st_size < 84 + n_triangles * _STL_TRIANGLE_DTYPE.itemsize:
+        raise ValueError(f"STL content is smaller than its {n_triangles} triangles")
+    return np.memmap(
+        filename, dtype=_STL_TRIANGLE_DTYPE, mode="r", offset=84, shape=(n_triangles,)
+    )
+
+
+def find_stl_files(
+    files: dict[str, pathlib.Path | str] | list[pathlib.Path | str],
+) -> dict[str, pathlib.Path]:
+    """STL files by name, as `stl2lnas` `--dir` and `--file` arguments
+
+    Directories give all `.stl` files in them. Names are the files stems.
+
+    Args:
+        files (dict[str, pathlib.Path | str] | list[pathlib.Path | str]): Map from name to
+            STL filename, or list of STL filenames and directories
+
+    Returns:
+        dict[str, pathlib.Path]: STL filename by name
+    """
+
+    if isinstance(files, dict):
+        return {name: pathlib.Path(f) for name, f in files.items()}
+
+    stl_files: dict[str, pathlib.Path] = {}
+    for path in map(pathlib.Path, files):
+        if path.is_dir():
+            paths = sorted(p for p in path.iterdir() if p.suffix == ".stl" and p.is_file())
+        else:
+            paths = [path]
+        for p in paths:
+            if p.stem in stl_files:
+                raise ValueError(f"Repeated name {p.stem} in STL files")
+            stl_files[p.stem] = p
+    return stl_files
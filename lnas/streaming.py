@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import base64
+import contextlib
+import json
+import pathlib
+import tempfile
+from typing import BinaryIO
+
+import numpy as np
+
+from lnas.fmt import CURRENT_VERSION
+from lnas.stl import open_stl, valid_triangles
+
+__all__ = ["stl_to_lnas"]
+
+# Vertex occurrence in a hash partition: its key (rounded position bits) and its position
+# in the stream of valid vertices
+_RECORD_DTYPE = np.dtype([("key", "<u4", (3,)), ("occurrence", "<i8")])
+_HASH_PRIMES = np.array([73856093, 19349663, 83492791], dtype=np.uint64)
+# Approximate bytes used per triangle of a batch and per record of a partition
+_BATCH_BYTES_PER_TRIANGLE = 1024
+_PARTITION_BYTES_PER_RECORD = 128
+# Bytes encoded at a time when writing base64 (multiple of 3, so chunks concatenate)
+_B64_CHUNK_BYTES = 3 << 20
+
+
+def _vertices_keys(vertices: np.ndarray, decimals: int) -> np.ndarray:
+    # Same key as `VertexWelder` without tolerance, so vertices are grouped the same way
+    return np.round(vertices, decimals).view(np.uint32)
+
+
+def _keys_partitions(keys: np.ndarray, n_partitions: int) -> np.ndarray:
+    keys_u = keys.astype(np.uint64)
+    h = (keys_u[:, 0] * _HASH_PRIMES[0]) ^ (keys_u[:, 1] * _HASH_PRIMES[1])
+    h ^= keys_u[:, 2] * _HASH_PRIMES[2]
+    h ^= h >> np.uint64(29)
+    return (h % np.uint64(n_partitions)).astype(np.int64)
+
+
+def _batches(n: int, batch_size: int):
+    for start in range(0, n, batch_size):
+        yield start, min(start + batch_size, n)
+
+
+def _partition_vertices(
+    records: np.ndarray,
+    partitions_files: list[BinaryIO],
+    batch_size: int,
+    decimals: int,
+) -> int:
+    # Write each valid vertex occurrence to the partition of its key
+    n_occurrences = 0
+    for start, end in _batches(len(records), batch_size):
+        triangles = np.asarray(records[start:end]["vertices"], dtype=np.float32)
+        vertices = triangles[valid_triangles(triangles)].reshape((-1, 3))
+        batch = np.empty((len(vertices),), dtype=_RECORD_DTYPE)
+        batch["key"] = _vertices_keys(vertices, decimals)
+        batch["occurrence"] = np.arange(n_occurrences, n_occurrences + len(vertices))
+        n_occurrences += len(vertices)
+
+        partitions = _keys_partitions(batch["key"], len(partitions_files))
+        order = np.argsort(partitions, kind="stable")
+        bounds = np.searchsorted(partitions[order], np.arange(len(partitions_files) + 1))
+        for p, f in enumerate(partitions_files):
+            if bounds[p + 1] > bounds[p]:
+                batch[order[bounds[p] : bounds[p + 1]]].tofile(f)
+    return n_occurrences
+
+
+def _group_partition(records: np.ndarray, representatives: np.ndarray, is_first: np.ndarray):
+    # Representative of each occurrence is the first occurrence with the same key
+    keys = records["key"]
+    order = np.lexsort((records["occurrence"], keys[:, 2], keys[:, 1], keys[:, 0]))
+    keys_sorted = keys[order]
+    occurrences_sorted = records["occurrence"][order]
+    is_group_start = np.ones((len(order),), dtype=bool)
+    is_group_start[1:] = (keys_sorted[1:] != keys_sorted[:-1]).any(axis=1)
+    group_start = np.maximum.accumulate(np.where(is_group_start, np.arange(len(order)), 0))
+
+    first_occurrences = occurrences_sorted[group_start]
+    representatives[occurrences_sorted] = first_occurrences
+    is_first[occurrences_sorted[is_group_start]] = True
+
+
+def _write_b64(f: BinaryIO, arr: np.ndarray, dtype: np.dtype, chunk_rows: int):
+    # Rows are encoded in chunks whose size in bytes is a multiple of 3
+    f.writelines(
+        base64.b64encode(np.ascontiguousarray(arr[start:end], dtype=dtype).tobytes())
+        for start, end in _batches(len(arr), chunk_rows)
+    )
+
+
+def _write_lnas(
+    filename: pathlib.Path, vertices: np.ndarray, triangles: np.ndarray, surface_name: str
+):
+    # Block style YAML with the same content as `LnasFormat.to_file`. Values are double
+    # quoted, so base64 strings are never resolved as other types
+    chunk_rows = _B64_CHUNK_BYTES // 12
+    n_triangles = len(triangles)
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    with open(filename, "wb") as f:
+        f.write(f'---\nversion: {CURRENT_VERSION}\ngeometry:\n  vertices: "'.encode())
+        _write_b64(f, vertices, np.dtype("<f4"), chunk_rows)
+        f.write(b'"\n  triangles: "')
+        _write_b64(f, triangles, np.dtype("<u4"), chunk_rows)
+        # JSON strings are valid YAML double quoted scalars
+        f.write(f'"\nsurfaces:\n  {json.dumps(surface_name)}: "'.encode())
+        f.writelines(
+            base64.b64encode(np.arange(start, end, dtype="<u4").tobytes())
+            for start, end in _batches(n_triangles, 3 * chunk_rows)
+        )
+        f.write(b'"\n')
+
+
+def stl_to_lnas(
+    stl_filename: pathlib.Path,
+    lnas_filename: pathlib.Path,
+    memory_budget: int = 1 << 30,
+    scratch_dir: pathlib.Path | None = None,
+    decimals: int = 5,
+) -> tuple[int, int]:
+    """Convert binary STL to LNAS out of core, for meshes larger than memory
+
+    Gives the same LNAS as `LnasFormat.from_stl(...).to_file(...)`: degenerate triangles
+    are discarded, vertices are deduplicated with `decimals` places (ordered by first
+    appearance) and inverted triangles are corrected using STL normals. The surface is
+    named after the file stem.
+
+    The STL is read in batches of triangles. Vertices occurrences are hash partitioned by
+    their rounded position into scratch files, and each partition is deduplicated on its
+    own. Intermediate arrays are memmaps in the scratch directory, and the LNAS file is
+    written incrementally, so memory used is bounded by `memory_budget`.
+
+    Args:
+        stl_filename (pathlib.Path): Binary STL filename
+        lnas_filename (pathlib.Path): LNAS filename to write
+        memory_budget (int, optional): Approximate memory to use, in bytes.
+            Defaults to 1 GB.
+        scratch_dir (pathlib.Path | None, optional): Directory for scratch files.
+            Defaults to None (system temporary directory).
+        decimals (int, optional): Decimal places to deduplicate vertices. Defaults to 5.
+
+    Returns:
+        tuple[int, int]: number of vertices and triangles written
+    """
+
+    records = open_stl(stl_filename)
+    n_records = len(records)
+    batch_size = max(1, memory_budget // _BATCH_BYTES_PER_TRIANGLE)
+    n_partitions = max(1, -(-3 * n_records * _PARTITION_BYTES_PER_RECORD // memory_budget))
+
+    with tempfile.TemporaryDirectory(dir=scratch_dir) as scratch_str:
+        scratch = pathlib.Path(scratch_str)
+
+        # 1. Hash partition vertices occurrences by their key
+        partitions_filenames = [scratch / f"partition_{p}.bin" for p in range(n_partitions)]
+        with contextlib.ExitStack() as stack:
+            partitions_files = [stack.enter_context(open(p, "wb")) for p in partitions_filenames]
+            n_occurrences = _partition_vertices(records, partitions_files, batch_size, decimals)
+        if n_occurrences == 0:
+            raise ValueError(f"No valid triangle in STL {stl_filename}")
+
+        # 2. Deduplicate each partition, finding the first occurrence of each key
+        open_memmap = np.lib.format.open_memmap
+        representatives = open_memmap(
+            scratch / "representatives.npy", mode="w+", dtype=np.int64, shape=(n_occurrences,)
+        )
+        is_first = open_memmap(
+            scratch / "is_first.npy", mode="w+", dtype=bool, shape=(n_occurrences,)
+        )
+        for p in partitions_filenames:
+            _group_partition(np.fromfile(p, dtype=_RECORD_DTYPE), representatives, is_first)
+            p.unlink()
+
+        # Vertex index of first occurrences, ordered by first appearance
+        vertices_idxs = open_memmap(
+            scratch / "vertices_idxs.npy", mode="w+", dtype=np.uint32, shape=(n_occurrences,)
+        )
+        n_vertices = 0
+        for start, end in _batches(n_occurrences, batch_size * 3):
+            batch_first = np.asarray(is_first[start:end])
+            vertices_idxs[start:end] = n_vertices + np.cumsum(batch_first) - 1
+            n_vertices += int(np.count_nonzero(batch_first))
+
+        # 3. Write vertices and triangles, correcting inverted normals
+        vertices = open_memmap(
+            scratch / "vertices.npy", mode="w+", dtype=np.float32, shape=(n_vertices, 3)
+        )
+        triangles = open_memmap(
+            scratch / "triangles.npy",
+            mode="w+",
+            dtype=np.uint32,
+            shape=(n_occurrences // 3, 3),
+        )
+        n_written_vertices, n_triangles, occurrence = 0, 0, 0
+        for start, end in _batches(n_records, batch_size):
+            batch = np.asarray(records[start:end])
+            batch_triangles = batch["vertices"].astype(np.float32)
+            valid = valid_triangles(batch_triangles)
+            batch_vertices = batch_triangles[valid].reshape((-1, 3))
+            n_batch = len(batch_vertices)
+            occurrences = slice(occurrence, occurrence + n_batch)
+            occurrence += n_batch
+
+            # Vertices are written before the triangles that use them
+            new_vertices = batch_vertices[np.asarray(is_first[occurrences])]
+            vertices[n_written_vertices : n_written_vertices + len(new_vertices)] = new_vertices
+            n_written_vertices += len(new_vertices)
+
+            batch_idxs = np.asarray(vertices_idxs)[np.asarray(representatives[occurrences])]
+            batch_idxs = batch_idxs.reshape((-1, 3))
+            triangles_vertices = np.asarray(vertices[batch_idxs.ravel()]).reshape((-1, 3, 3))
+            cross_prod = np.cross(
+                triangles_vertices[:, 1] - triangles_vertices[:, 0],
+                triangles_vertices[:, 2] - triangles_vertices[:, 0],
+            )
+            with np.errstate(invalid="ignore", divide="ignore"):
+                normals = cross_prod / np.linalg.norm(cross_prod, axis=1)[:, np.newaxis]
+            # Triangles collapsed by deduplication are removed, as in `from_stl`
+            is_collapsed = np.isnan(normals).any(axis=1)
+            swap = np.sum(normals * batch["normal"][valid], axis=1) < 0
+            batch_idxs[swap, 1:] = batch_idxs[swap][:, [2, 1]]
+            batch_idxs = batch_idxs[~is_collapsed]
+            triangles[n_triangles : n_triangles + len(batch_idxs)] = batch_idxs
+            n_triangles += len(batch_idxs)
+
+        _write_lnas(
+            lnas_filename,
+            vertices,
+            triangles[:n_triangles],
+            pathlib.Path(stl_filename).stem,
+        )
+        del representatives, is_first, vertices_idxs, vertices, triangles
+
+    return n_vertices, n_triangles
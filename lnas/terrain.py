@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import pathlib
+
+import numpy as np
+
+from lnas.geometry import LnasGeometry
+
+__all__ = ["heightfield_geometry", "open_heightfield"]
+
+# Target number of grid points processed at a time
+_CHUNK_POINTS = 1 << 22
+
+
+def open_heightfield(heights: np.ndarray | pathlib.Path | str) -> np.ndarray:
+    """Open heights grid, `.npy` files are opened as memmap"""
+
+    if isinstance(heights, (str, pathlib.Path)):
+        heights = np.load(heights, mmap_mode="r")
+    if heights.ndim != 2 or heights.shape[0] < 2 or heights.shape[1] < 2:
+        raise ValueError(
+            f"Heights must be a grid with at least 2x2 points. Shape is {heights.shape}"
+        )
+    return heights
+
+
+def _flat_blocks(heights: np.ndarray, block: int, tolerance: float) -> np.ndarray:
+    # Blocks of block x block cells whose heights range is within tolerance
+    nx, ny = heights.shape
+    n_blocks_x, n_blocks_y = (nx - 1) // block, (ny - 1) // block
+    flat = np.zeros((n_blocks_x, n_blocks_y), dtype=bool)
+    if n_blocks_y == 0:
+        return flat
+
+    cols_starts = np.arange(n_blocks_y) * block
+    for bi in range(n_blocks_x):
+        rows = np.asarray(heights[bi * block : (bi + 1) * block + 1, : n_blocks_y * block + 1])
+        cols_max, cols_min = rows.max(axis=0), rows.min(axis=0)
+        # Blocks share their border columns
+        blocks_max = np.maximum(np.maximum.reduceat(cols_max, cols_starts), cols_max[block::block])
+        blocks_min = np.minimum(np.minimum.reduceat(cols_min, cols_starts), cols_min[block::block])
+        flat[bi] = (blocks_max - blocks_min) <= tolerance
+    return flat
+
+
+def _fan_offsets(block: int) -> tuple[np.ndarray, np.ndarray]:
+    # Border points of a block, counterclockwise seen from +z
+    steps = np.arange(block)
+    zeros, full = np.zeros((block,), dtype=np.int64), np.full((block,), block)
+    di = np.concatenate((steps, full, block - steps, zeros))
+    dj = np.concatenate((zeros, steps, full, block - steps))
+    return di, dj
+
+
+def heightfield_geometry(
+    heights: np.ndarray,
+    spacing: tuple[float, float],
+    origin: tuple[float, float, float],
+    flat_tolerance: float | None = None,
+    flat_block: int = 8,
+) -> tuple[LnasGeometry, np.ndarray]:
+    """Triangulate a heights grid
+
+    Point (i, j) is at `origin + (i * spacing[0], j * spacing[1], heights[i, j])` and each
+    cell gives two triangles with normals pointing up. Flat blocks are triangulated as a
+    fan from the block center to all its border points, so they match neighbour cells.
+
+    Args:
+        heights (np.ndarray): Heights grid (shape (Nx, Ny)), may be a memmap
+        spacing (tuple[float, float]): Grid spacing in x and y
+        origin (tuple[float, float, float]): Position of point (0, 0) at height 0
+        flat_tolerance (float | None, optional): Maximum heights range of a block to be
+            simplified. Defaults to None (no simplification).
+        flat_block (int, optional): Cells in each direction of blocks to simplify. Must be
+            even. Defaults to 8.
+
+    Returns:
+        tuple[LnasGeometry, np.ndarray]: geometry and the cell (i, j) of each triangle
+            (block start cell for simplified blocks), shape (Nt, 2)
+    """
+
+    nx, ny = heights.shape
+    dx, dy = spacing
+    if flat_tolerance is not None and (flat_block < 2 or flat_block % 2 != 0):
+        raise ValueError(f"Flat block must be an even number of cells. It is {flat_block}")
+
+    # Point (i, j) is the vertex i * ny + j, so indexing is shared by construction
+    vertices = np.empty((nx * ny, 3), dtype=np.float32)
+    ys = origin[1] + np.arange(ny, dtype=np.float64) * dy
+    chunk_rows = max(1, _CHUNK_POINTS // ny)
+    for start in range(0, nx, chunk_rows):
+        end = min(start + chunk_rows, nx)
+        chunk = vertices[start * ny : end * ny].reshape((end - start, ny, 3))
+        chunk[..., 0] = (origin[0] + np.arange(start, end, dtype=np.float64) * dx)[:, None]
+        chunk[..., 1] = ys
+        chunk[..., 2] = origin[2] + np.asarray(heights[start:end], dtype=np.float64)
+
+    cells_flat = np.zeros((nx - 1, ny - 1), dtype=bool)
+    if flat_tolerance is not None:
+        blocks_flat = _flat_blocks(heights, flat_block, flat_tolerance)
+        cells_blocks = np.repeat(np.repeat(blocks_flat, flat_block, axis=0), flat_block, axis=1)
+        cells_flat[: cells_blocks.shape[0], : cells_blocks.shape[1]] = cells_blocks
+    else:
+        blocks_flat = np.zeros((0, 0), dtype=bool)
+
+    # Two triangles for each cell, (v00, v10, v11) and (v00, v11, v01)
+    cells_i, cells_j = np.nonzero(~cells_flat)
+    v00 = (cells_i * ny + cells_j).astype(np.uint32)
+    cells_triangles = np.empty((len(v00), 2, 3), dtype=np.uint32)
+    cells_triangles[:, :, 0] = v00[:, np.newaxis]
+    cells_triangles[:, 0, 1] = v00 + ny
+    cells_triangles[:, :, 2] = np.stack((v00 + ny + 1, v00 + 1), axis=1)
+    cells_triangles[:, 1, 1] = v00 + ny + 1
+    cells = np.repeat(np.stack((cells_i, cells_j), axis=1).astype(np.int32), 2, axis=0)
+    triangles = cells_triangles.reshape((-1, 3))
+
+    # Fan of triangles (center, border k, border k + 1) for each flat block
+    blocks_i, blocks_j = np.nonzero(blocks_flat)
+    if len(blocks_i) > 0:
+        blocks_i, blocks_j = blocks_i * flat_block, blocks_j * flat_block
+        di, dj = _fan_offsets(flat_block)
+        border = (blocks_i[:, None] + di) * ny + (blocks_j[:, None] + dj)
+        center = (blocks_i + flat_block // 2) * ny + (blocks_j + flat_block // 2)
+        fans_triangles = np.stack(
+            (np.broadcast_to(center[:, None], border.shape), border, np.roll(border, -1, axis=1)),
+            axis=-1,
+        ).reshape((-1, 3))
+        fans_cells = np.repeat(np.stack((blocks_i, blocks_j), axis=1), len(di), axis=0)
+
+        # Triangles ordered by cell, for memory locality
+        cells = np.concatenate((cells, fans_cells.astype(np.int32)))
+        order = np.argsort(cells[:, 0].astype(np.int64) * ny + cells[:, 1], kind="stable")
+        triangles = np.concatenate((triangles, fans_triangles.astype(np.uint32)))[order]
+        cells = cells[order]
+
+    geometry = LnasGeometry(vertices=vertices, triangles=triangles)
+    if len(blocks_i) > 0:
+        # Points inside flat blocks are not used
+        geometry, _ = geometry.compact_vertices()
+    return geometry, cells
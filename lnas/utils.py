@@ -1,23 +1,42 @@
+from __future__ import annotations
+
 import pathlib
-from typing import Any
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from pickle import PickleBuffer
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
 
-from ruamel.yaml import YAML
+from lnas.profiling import is_enabled, span
 
+if TYPE_CHECKING:
+    from ruamel.yaml import YAML
 
-def read_yaml(filename: pathlib.Path, loader: YAML = YAML(typ="safe")) -> Any:
+
+def read_yaml(filename: pathlib.Path, loader: YAML | None = None) -> Any:
     """Read YAML from file
 
     Args:
         filename (pathlib.Path): File to read from
+        loader (YAML | None, optional): YAML loader. Defaults to None (new safe loader, as
+            loaders can't be shared by threads).
 
     Returns:
         Any: YAML content as python objects (dict, list, etc.)
     """
+    if loader is None:
+        # ruamel.yaml is imported on first use, it's slow to import
+        from ruamel.yaml import YAML
+
+        loader = YAML(typ="safe")
     if not filename.exists():
         raise FileNotFoundError(f"Unable to read yaml. Filename {filename} does not exists")
 
     # Read YAML from file
-    with open(filename, "r") as f:
+    with span("yaml.load") as s, open(filename, "r") as f:
+        if is_enabled():
+            s.add_bytes(filename.stat().st_size)
         try:
             return loader.load(f)
         except Exception as e:
@@ -32,11 +51,13 @@ def save_yaml(data: Any, filename: pathlib.Path):
         filename (pathlib.Path): filename to save to
     """
 
+    from ruamel.yaml import YAML
+
     def repr_path(representer, data):
         return representer.represent_scalar("tag:yaml.org,2002:str", str(data))
 
     filename.parent.mkdir(parents=True, exist_ok=True)
-    with open(filename, "w") as f:
+    with span("yaml.dump") as s, open(filename, "w") as f:
         with YAML(typ="safe", output=f) as yaml:
             for p in [pathlib.PosixPath, pathlib.WindowsPath]:
                 yaml.representer.add_representer(p, repr_path)
@@ -44,3 +65,79 @@ def save_yaml(data: Any, filename: pathlib.Path):
             # yaml.register_class(pathlib.PosixPath)
             yaml.explicit_start = True
             yaml.dump(data, f)
+        s.add_bytes(f.tell())
+
+
+def map_in_workers(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    n_workers: int | None = None,
+    max_pending: int | None = None,
+) -> Iterator[Any]:
+    """Map function over items in worker processes, yielding results in items order
+
+    Only `max_pending` items are submitted ahead of the results consumed, so results
+    waiting to be consumed don't accumulate in memory.
+
+    Args:
+        func (Callable[[Any], Any]): Function to apply, must be picklable
+        items (Iterable[Any]): Items to apply function to
+        n_workers (int | None, optional): Number of processes. Defaults to None
+            (no processes, items are mapped in this process).
+        max_pending (int | None, optional): Maximum items submitted and not consumed.
+            Defaults to None (two per worker).
+
+    Yields:
+        Iterator[Any]: function result for each item
+    """
+
+    if n_workers is None or n_workers <= 1:
+        yield from map(func, items)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    max_pending = max_pending or 2 * n_workers
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        pending: deque = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def pickle_array(arr: np.ndarray, protocol: int) -> tuple[Any, str, tuple[int, ...]]:
+    """Array as (data, dtype, shape) to pickle, reconstructed with `unpickle_array`
+
+    With protocol 5 data is a `PickleBuffer` of the contiguous array, so it's not copied
+    into the pickle stream and is sent out of band if a `buffer_callback` is given.
+    Memmaps are pickled as their data, so are unpickled as plain arrays.
+
+    Args:
+        arr (np.ndarray): Array to pickle
+        protocol (int): Pickle protocol
+
+    Returns:
+        tuple[Any, str, tuple[int, ...]]: data, dtype and shape of array
+    """
+
+    arr = np.ascontiguousarray(arr)
+    data = PickleBuffer(arr) if protocol >= 5 else arr
+    return data, arr.dtype.str, arr.shape
+
+
+def unpickle_array(data: Any, dtype: str, shape: tuple[int, ...]) -> np.ndarray:
+    """Array from data pickled with `pickle_array`
+
+    The array is writable. Data in a writable buffer (as out of band buffers in a
+    `bytearray`) is used without copying, read only data (as in band buffers) is copied.
+    """
+
+    if isinstance(data, np.ndarray):
+        return data
+    arr = np.frombuffer(data, dtype=np.dtype(dtype)).reshape(shape)
+    if not arr.flags.writeable:
+        arr = arr.copy()
+    return arr
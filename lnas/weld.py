@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import numpy as np
+
+__all__ = ["VertexWelder", "collapsed_triangles", "weld_vertices"]
+
+# Primes used to hash the integer keys of vertices (as in "Optimized Spatial Hashing")
+_HASH_PRIMES = np.array([73856093, 19349663, 83492791], dtype=np.uint64)
+_EMPTY = -1
+_CLAIM_FREE = np.iinfo(np.int64).max
+
+# Offsets of the 26 neighbour cells of a grid cell
+_NEIGHBOURS_OFFSETS = np.array(
+    [
+        (i, j, k)
+        for i in (-1, 0, 1)
+        for j in (-1, 0, 1)
+        for k in (-1, 0, 1)
+        if (i, j, k) != (0, 0, 0)
+    ],
+    dtype=np.int64,
+)
+
+
+class VertexWelder:
+    """Incremental vertex welding using a spatial hash table
+
+    Vertices are added in chunks and each one receives the id of the group it belongs to.
+    The hash table is an open addressing one, probed in a vectorized way, so welding
+    is linear in the number of vertices.
+
+    Two modes are supported:
+    - Decimals (`tolerance=None`): vertices are grouped when their positions rounded to
+      `decimals` places (as float32) are equal. This is the same criteria used by `stl2lnas`.
+    - Tolerance: vertices are snapped to a grid with spacing `tolerance`. Vertices in the
+      same cell are grouped, and groups in neighbour cells whose representatives are
+      closer than `tolerance` are merged.
+
+    Call `finalize` after adding all vertices to get the welded vertices and the map from
+    groups ids to the welded vertices indexes.
+    """
+
+    def __init__(
+        self,
+        tolerance: float | None = None,
+        decimals: int = 5,
+        chunk_size: int = 1 << 20,
+        capacity: int = 1 << 16,
+    ):
+        if tolerance is not None and tolerance <= 0:
+            raise ValueError(f"Weld tolerance must be positive, got {tolerance}")
+        self.tolerance = tolerance
+        self.decimals = decimals
+        self.chunk_size = chunk_size
+
+        # Number of groups and number of vertices added
+        self.n_groups = 0
+        self.n_added = 0
+
+        table_size = 1 << max(int(np.ceil(np.log2(max(capacity, 2) * 2))), 4)
+        self._table = np.full((table_size,), _EMPTY, dtype=np.int64)
+        self._claims = np.full((table_size,), _CLAIM_FREE, dtype=np.int64)
+        # Groups information (key, representative position, first vertex added and parent)
+        self._keys = np.empty((table_size // 2, 3), dtype=np.int64)
+        self._positions = np.empty((table_size // 2, 3), dtype=np.float64)
+        self._first = np.empty((table_size // 2,), dtype=np.int64)
+        self._parent = np.empty((table_size // 2,), dtype=np.int64)
+
+    def _vertices_keys(self, vertices: np.ndarray) -> np.ndarray:
+        if self.tolerance is None:
+            rounded = np.round(vertices.astype(np.float32), self.decimals)
+            return rounded.view(np.uint32).astype(np.int64)
+        return np.floor(vertices / self.tolerance).astype(np.int64)
+
+    def _hash(self, keys: np.ndarray) -> np.ndarray:
+        keys_u = keys.astype(np.uint64)
+        h = (keys_u[:, 0] * _HASH_PRIMES[0]) ^ (keys_u[:, 1] * _HASH_PRIMES[1])
+        h ^= keys_u[:, 2] * _HASH_PRIMES[2]
+        h ^= h >> np.uint64(29)
+        return (h & np.uint64(len(self._table) - 1)).astype(np.int64)
+
+    def _lookup(self, keys: np.ndarray) -> np.ndarray:
+        """Groups ids of keys, -1 for the ones not in table"""
+
+        ids = np.full((len(keys),), _EMPTY, dtype=np.int64)
+        slots = self._hash(keys)
+        pending = np.arange(len(keys))
+        mask = len(self._table) - 1
+        while len(pending) > 0:
+            occupant = self._table[slots[pending]]
+            is_empty = occupant == _EMPTY
+            is_match = ~is_empty
+            is_match[is_match] = (self._keys[occupant[is_match]] == keys[pending[is_match]]).all(
+                axis=1
+            )
+            ids[pending[is_match]] = occupant[is_match]
+
+            pending = pending[~(is_empty | is_match)]
+            slots[pending] = (slots[pending] + 1) & mask
+        return ids
+
+    def _insert(self, keys: np.ndarray, positions: np.ndarray, first: np.ndarray) -> np.ndarray:
+        """Groups ids of keys, creating groups for keys that are not in table yet"""
+
+        ids = np.full((len(keys),), _EMPTY, dtype=np.int64)
+        slots = self._hash(keys)
+        pending = np.arange(len(keys))
+        mask = len(self._table) - 1
+        while len(pending) > 0:
+            pending_slots = slots[pending]
+            occupant = self._table[pending_slots]
+            is_empty = occupant == _EMPTY
+
+            # Keys already in table
+            is_match = ~is_empty
+            is_match[is_match] = (self._keys[occupant[is_match]] == keys[pending[is_match]]).all(
+                axis=1
+            )
+            ids[pending[is_match]] = occupant[is_match]
+
+            # Empty slots are claimed by the first pending key that reaches it.
+            # The other keys probe the same slot again on next iteration.
+            claim_slots, claim_idxs = pending_slots[is_empty], pending[is_empty]
+            np.minimum.at(self._claims, claim_slots, claim_idxs)
+            is_winner = self._claims[claim_slots] == claim_idxs
+            self._claims[claim_slots] = _CLAIM_FREE
+
+            win_slots, win_idxs = claim_slots[is_winner], claim_idxs[is_winner]
+            new_ids = self.n_groups + np.arange(len(win_idxs), dtype=np.int64)
+            self._table[win_slots] = new_ids
+            self._keys[new_ids] = keys[win_idxs]
+            self._positions[new_ids] = positions[win_idxs]
+            self._first[new_ids] = first[win_idxs]
+            self._parent[new_ids] = new_ids
+            self.n_groups += len(new_ids)
+            ids[win_idxs] = new_ids
+
+            is_collision = ~(is_empty | is_match)
+            slots[pending[is_collision]] = (pending_slots[is_collision] + 1) & mask
+            pending = pending[ids[pending] == _EMPTY]
+        return ids
+
+    def _place(self, ids: np.ndarray):
+        """Place groups, with unique keys, in the table"""
+
+        slots = self._hash(self._keys[ids])
+        pending = np.arange(len(ids))
+        mask = len(self._table) - 1
+        while len(pending) > 0:
+            pending_slots = slots[pending]
+            is_empty = self._table[pending_slots] == _EMPTY
+
+            claim_slots, claim_idxs = pending_slots[is_empty], pending[is_empty]
+            np.minimum.at(self._claims, claim_slots, claim_idxs)
+            is_winner = self._claims[claim_slots] == claim_idxs
+            self._claims[claim_slots] = _CLAIM_FREE
+            self._table[claim_slots[is_winner]] = ids[claim_idxs[is_winner]]
+
+            is_placed = np.zeros((len(pending),), dtype=bool)
+            is_placed[np.flatnonzero(is_empty)[is_winner]] = True
+            pending = pending[~is_placed]
+            slots[pending] = (slots[pending] + 1) & mask
+
+    def _grow(self, n_add: int):
+        """Grow table to keep its load factor under 0.5"""
+
+        if 2 * (self.n_groups + n_add) <= len(self._table):
+            return
+        table_size = len(self._table)
+        while 2 * (self.n_groups + n_add) > table_size:
+            table_size *= 2
+
+        n = self.n_groups
+        self._table = np.full((table_size,), _EMPTY, dtype=np.int64)
+        self._claims = np.full((table_size,), _CLAIM_FREE, dtype=np.int64)
+        for attr in ("_keys", "_positions", "_first", "_parent"):
+            arr = getattr(self, attr)
+            new_arr = np.empty((table_size // 2, *arr.shape[1:]), dtype=arr.dtype)
+            new_arr[:n] = arr[:n]
+            setattr(self, attr, new_arr)
+        self._place(np.arange(n, dtype=np.int64))
+
+    def _find(self, ids: np.ndarray) -> np.ndarray:
+        """Root group of each group id"""
+
+        roots = self._parent[ids]
+        while True:
+            grand_parent = self._parent[roots]
+            if np.array_equal(grand_parent, roots):
+                return roots
+            roots = grand_parent
+
+    def _compress(self):
+        """Point all groups directly to their roots (path compression)"""
+
+        parent = self._parent[: self.n_groups]
+        while True:
+            grand_parent = parent[parent]
+            if np.array_equal(grand_parent, parent):
+                break
+            parent[:] = grand_parent
+
+    def _merge_neighbours(self, start: int, end: int):
+        """Merge groups [start, end) with close groups in neighbour cells"""
+
+        tol = self.tolerance
+        ids = np.arange(start, end, dtype=np.int64)
+        keys, positions = self._keys[start:end], self._positions[start:end]
+        pairs_a, pairs_b = [], []
+        for offset in _NEIGHBOURS_OFFSETS:
+            neighbours = self._lookup(keys + offset)
+            # Only pair with older groups, so each pair is checked once
+            is_close = (neighbours != _EMPTY) & (neighbours < ids)
+            is_close[is_close] = (
+                np.linalg.norm(self._positions[neighbours[is_close]] - positions[is_close], axis=1)
+                <= tol
+            )
+            pairs_a.append(ids[is_close])
+            pairs_b.append(neighbours[is_close])
+        pairs_a, pairs_b = np.concatenate(pairs_a), np.concatenate(pairs_b)
+
+        # Union of the roots of each pair, linking the newer root to the older one.
+        # Repeated until all pairs share a root, so the groups merged are the connected
+        # components of close groups, whatever the order of insertion.
+        while len(pairs_a) > 0:
+            roots_a, roots_b = self._find(pairs_a), self._find(pairs_b)
+            is_split = roots_a != roots_b
+            if not is_split.any():
+                break
+            pairs_a, pairs_b = pairs_a[is_split], pairs_b[is_split]
+            roots_a, roots_b = roots_a[is_split], roots_b[is_split]
+            np.minimum.at(self._parent, np.maximum(roots_a, roots_b), np.minimum(roots_a, roots_b))
+        self._parent[start:end] = self._find(ids)
+
+    def add(self, vertices: np.ndarray) -> np.ndarray:
+        """Add vertices to welder
+
+        Args:
+            vertices (np.ndarray): Vertices positions, shape must be (N, 3)
+
+        Returns:
+            np.ndarray: group id of each vertex. Use `finalize` to map it to welded vertices
+        """
+
+        ids = np.empty((len(vertices),), dtype=np.int64)
+        for start in range(0, len(vertices), self.chunk_size):
+            chunk = vertices[start : start + self.chunk_size]
+            self._grow(len(chunk))
+            first = self.n_added + np.arange(len(chunk), dtype=np.int64)
+            n_groups_before = self.n_groups
+            ids[start : start + len(chunk)] = self._insert(
+                self._vertices_keys(chunk), chunk.astype(np.float64), first
+            )
+            if self.tolerance is not None and self.n_groups > n_groups_before:
+                self._merge_neighbours(n_groups_before, self.n_groups)
+            self.n_added += len(chunk)
+        return ids
+
+    def finalize(self) -> tuple[np.ndarray, np.ndarray]:
+        """Welded vertices and map from groups ids to welded vertices indexes
+
+        Welded vertices are ordered by the first time they were added.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: idxs of the welded vertices (first vertex added
+                in each group, referencing all vertices added) and welded vertex index of
+                each group
+        """
+
+        self._compress()
+        n = self.n_groups
+        parent, first = self._parent[:n], self._first[:n]
+        is_root = parent == np.arange(n)
+
+        # Ordering by first vertex added is done with a mask, avoiding sorting
+        first_is_root = np.zeros((self.n_added,), dtype=bool)
+        first_is_root[first[is_root]] = True
+        rank = np.cumsum(first_is_root, dtype=np.int64) - 1
+
+        vertices_idxs = np.flatnonzero(first_is_root)
+        groups_remap = rank[first[parent]]
+        return vertices_idxs, groups_remap
+
+    def welded_positions(self) -> np.ndarray:
+        """Positions of welded vertices, in the same order as `finalize`"""
+
+        n = self.n_groups
+        roots = np.flatnonzero(self._parent[:n] == np.arange(n))
+        _, groups_remap = self.finalize()
+        positions = np.empty((len(roots), 3), dtype=np.float64)
+        positions[groups_remap[roots]] = self._positions[roots]
+        return positions
+
+
+def weld_vertices(
+    vertices: np.ndarray,
+    tolerance: float | None = None,
+    relative: bool = False,
+    decimals: int = 5,
+    chunk_size: int = 1 << 20,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Merge vertices that are coincident up to a tolerance
+
+    The first vertex in each group is used as its representative. See `VertexWelder`
+    for the welding criteria.
+
+    Args:
+        vertices (np.ndarray): Vertices positions, shape must be (N, 3)
+        tolerance (float | None, optional): Distance to consider vertices coincident.
+            Defaults to None, grouping vertices equal up to `decimals` places.
+        relative (bool, optional): Tolerance is relative to the vertices bounding box diagonal.
+            Defaults to False.
+        decimals (int, optional): Decimal places used when there is no tolerance. Defaults to 5.
+        chunk_size (int, optional): Number of vertices processed at a time.
+            Defaults to 1 << 20.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: idxs of the vertices kept (sorted) and, for each vertex,
+            the index of its representative in the kept vertices
+    """
+
+    if tolerance is not None and relative and len(vertices) > 0:
+        diagonal = np.linalg.norm(vertices.max(axis=0) - vertices.min(axis=0))
+        tolerance = tolerance * float(diagonal) if diagonal > 0 else tolerance
+
+    welder = VertexWelder(
+        tolerance=tolerance, decimals=decimals, chunk_size=chunk_size, capacity=len(vertices)
+    )
+    groups_ids = welder.add(vertices)
+    vertices_idxs, groups_remap = welder.finalize()
+    return vertices_idxs, groups_remap[groups_ids]
+
+
+def collapsed_triangles(triangles: np.ndarray) -> np.ndarray:
+    """Mask of triangles collapsed by welding (two or more vertices merged)
+
+    Args:
+        triangles (np.ndarray): Triangles vertices indexes, after welding. Shape is (N, 3)
+
+    Returns:
+        np.ndarray: boolean mask, True for collapsed triangles
+    """
+
+    return (
+        (triangles[:, 0] == triangles[:, 1])
+        | (triangles[:, 1] == triangles[:, 2])
+        | (triangles[:, 0] == triangles[:, 2])
+    )
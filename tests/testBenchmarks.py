@@ -0,0 +1,62 @@
+import json
+
+import numpy as np
+import pytest
+
+from benchmarks.generators import generate
+from benchmarks.imports import run_import_benchmarks
+from benchmarks.suite import CASES, compare, main, run_benchmarks
+
+
+@pytest.mark.parametrize("mesh", ["sphere", "cylinder", "terrain"])
+def test_generators(mesh):
+    lnas = generate(mesh, 1000)
+    assert 900 <= len(lnas.geometry.triangles) <= 1400
+    assert generate(mesh, 1000) == lnas
+    assert not np.isnan(lnas.geometry.normals).any()
+    assert len(lnas.geometry.normals) == len(lnas.geometry.triangles)
+
+    surfaces_idxs = np.sort(np.concatenate(list(lnas.surfaces.values())))
+    np.testing.assert_equal(surfaces_idxs, np.arange(len(lnas.geometry.triangles)))
+
+
+@pytest.mark.parametrize("mesh", ["sphere", "cylinder"])
+def test_generators_closed_outwards(mesh):
+    geometry = generate(mesh, 1000).geometry
+    centroids = geometry.triangle_vertices.mean(axis=1)
+    # Divergence theorem, positive for normals pointing outwards
+    volume = np.sum(np.sum(centroids * geometry.normals, axis=1) * geometry.areas) / 3
+    expected = 4 / 3 * np.pi if mesh == "sphere" else 4 * np.pi
+    assert volume == pytest.approx(expected, rel=0.05)
+
+
+def test_run_benchmarks():
+    results = run_benchmarks(sizes=[200], meshes=["cylinder"], repeat=1, log=None)
+    assert {r["case"] for r in results["results"]} == set(CASES)
+    for record in results["results"]:
+        assert record["best"] >= 0 and record["peak_memory"] >= 0
+
+    slower = json.loads(json.dumps(results))
+    for record in slower["results"]:
+        record["best"] *= 2
+    comparison = compare(slower, results, threshold=1.5)
+    assert len(comparison) == len(CASES)
+    assert all(c["regression"] for c in comparison if c["time_ratio"] > 1.5)
+
+
+def test_benchmarks_cli(tmp_path):
+    output = tmp_path / "results.json"
+    args = ["--sizes", "200", "--meshes", "sphere", "--cases", "normals", "join", "--repeat", "1"]
+    assert main(args + ["-o", str(output), "--no-memory"]) == 0
+    results = json.loads(output.read_text())
+    assert [r["case"] for r in results["results"]] == ["normals", "join"]
+    assert "peak_memory" not in results["results"][0]
+
+    assert main(args + ["--baseline", str(output), "--threshold", "1e6"]) == 0
+
+
+def test_import_benchmarks():
+    results = run_import_benchmarks(cases=["lnas"], repeat=1, log=None)
+    (record,) = results["results"]
+    assert record["case"] == "lnas" and record["best"] > 0
+    assert record["loaded"] == []
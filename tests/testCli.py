@@ -0,0 +1,123 @@
+import json
+import os
+import pathlib
+import shutil
+
+import numpy as np
+import pytest
+
+from lnas import LnasFormat
+from lnas.cli import main
+
+
+@pytest.fixture()
+def stl_tree(tmp_path):
+    (tmp_path / "in" / "sub").mkdir(parents=True)
+    shutil.copy("fixture/cube.stl", tmp_path / "in")
+    shutil.copy("fixture/cylinder.stl", tmp_path / "in" / "sub")
+    yield tmp_path / "in"
+
+
+def test_convert_tree(stl_tree, tmp_path, capsys):
+    out = tmp_path / "out"
+    assert main(["convert", str(stl_tree), "-o", str(out), "-j", "2"]) == 0
+    lnas = LnasFormat.from_file(out / "sub" / "cylinder.lnas")
+    assert lnas == LnasFormat.from_stl(pathlib.Path("fixture/cylinder.stl"))
+    assert "2 converted, 0 up to date, 0 failed" in capsys.readouterr().err
+
+    assert main(["convert", str(stl_tree), "-o", str(out)]) == 0
+    assert "0 converted, 2 up to date, 0 failed" in capsys.readouterr().err
+
+    # Outputs older than their input are converted again
+    os.utime(out / "cube.lnas", (0, 0))
+    assert main(["convert", str(stl_tree), "-o", str(out), "-j", "1"]) == 0
+    assert "1 converted, 1 up to date, 0 failed" in capsys.readouterr().err
+
+
+def test_convert_failed(stl_tree, tmp_path, capsys):
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "broken.lnas").write_text("previous")
+    os.utime(out / "broken.lnas", (0, 0))
+    (stl_tree / "broken.stl").write_bytes(b"\0" * 90)
+    assert main(["convert", str(stl_tree), "-o", str(out), "-j", "1"]) == 1
+    assert "2 converted, 0 up to date, 1 failed" in capsys.readouterr().err
+
+    # Outputs are replaced only when converted, no partial or temporary file is left
+    assert (out / "broken.lnas").read_text() == "previous"
+    assert sorted(p.name for p in out.rglob("*")) == [
+        "broken.lnas",
+        "cube.lnas",
+        "cylinder.lnas",
+        "sub",
+    ]
+
+
+def test_convert_memory_budget(tmp_path):
+    ascii_stl = tmp_path / "facet.stl"
+    ascii_stl.write_text(
+        "solid facet\nfacet normal 0 0 1\nouter loop\n"
+        "vertex 0 0 0\nvertex 1 0 0\nvertex 0 1 0\nendloop\nendfacet\nendsolid facet\n"
+    )
+    shutil.copy("fixture/cylinder.stl", tmp_path)
+    args = ["convert", str(ascii_stl), str(tmp_path / "cylinder.stl"), "-q", "-j", "1"]
+    assert main(args + ["--memory-budget", str(1 << 20)]) == 0
+
+    # ASCII STL are converted in memory, binary ones out of core
+    for name in ("facet", "cylinder"):
+        lnas = LnasFormat.from_file(tmp_path / f"{name}.lnas")
+        assert lnas == LnasFormat.from_stl(tmp_path / f"{name}.stl")
+
+    # Out of core conversion doesn't weld vertices
+    (tmp_path / "cylinder.lnas").unlink()
+    assert main(args + ["--memory-budget", str(1 << 20), "--weld-tolerance", "1e-4"]) == 1
+    assert not (tmp_path / "cylinder.lnas").exists()
+
+
+def test_convert_merge(stl_tree, tmp_path):
+    output = tmp_path / "merged.lnas"
+    args = ["convert", str(stl_tree / "cube.stl"), str(stl_tree / "sub"), "-o", str(output)]
+    assert main(args + ["--merge", "-j", "1"]) == 0
+    assert list(LnasFormat.from_file(output).surfaces) == ["cube", "cylinder"]
+
+
+def test_info(capsys):
+    assert main(["info", "fixture/cube.lnas", "--json"]) == 0
+    info = json.loads(capsys.readouterr().out)
+    assert info["n_triangles"] == 12
+    assert info["surfaces"] == {"cube": 12}
+
+    assert main(["info", "fixture/cube.lnas", "fixture/cylinder.stl"]) == 0
+    assert "cylinder:" in capsys.readouterr().out
+
+
+def test_transform_join_extract(tmp_path):
+    moved = tmp_path / "moved.lnas"
+    args = ["transform", "fixture/cube.lnas", "-o", str(moved), "--translate", "1", "2", "3"]
+    assert main(args) == 0
+    cube = LnasFormat.from_file(pathlib.Path("fixture/cube.lnas"))
+    np.testing.assert_allclose(
+        LnasFormat.from_file(moved).geometry.vertices, cube.geometry.vertices + [1, 2, 3]
+    )
+
+    joined = tmp_path / "joined.lnas"
+    args = ["join", "fixture/cube.lnas", str(moved), "-o", str(joined)]
+    assert main(args + ["--suffixes", "", "_moved"]) == 0
+    lnas = LnasFormat.from_file(joined)
+    assert list(lnas.surfaces) == ["cube", "cube_moved"]
+    assert main(args) == 1
+
+    extracted = tmp_path / "extracted.stl"
+    assert main(["extract-surface", str(joined), "cube_moved", "-o", str(extracted)]) == 0
+    np.testing.assert_allclose(
+        LnasFormat.from_stl(extracted).geometry.triangle_vertices,
+        LnasFormat.from_file(moved).geometry.triangle_vertices,
+    )
+    assert main(["extract-surface", str(joined), "unknown", "-o", str(extracted)]) == 1
+
+
+def test_export_stl(tmp_path):
+    output = tmp_path / "cylinder.stl"
+    assert main(["export-stl", "fixture/cylinder.lnas", "-o", str(output), "-q"]) == 0
+    lnas = LnasFormat.from_file(pathlib.Path("fixture/cylinder.lnas"))
+    assert len(LnasFormat.from_stl(output).geometry.triangles) == len(lnas.geometry.triangles)
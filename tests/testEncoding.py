@@ -0,0 +1,51 @@
+import base64
+
+import numpy as np
+import pytest
+
+from lnas import encoding
+from lnas.encoding import b64decode_array, b64encode_array
+
+
+@pytest.fixture()
+def small_chunks(monkeypatch):
+    # Many chunks for small arrays, so threads are used
+    monkeypatch.setattr(encoding, "_CHUNK_GROUPS", 5)
+
+
+@pytest.mark.parametrize("n_threads", [1, 3])
+def test_b64_matches_base64(small_chunks, n_threads):
+    rng = np.random.default_rng(0)
+    for n_bytes in [*range(40), 1000, 1001, 1002]:
+        raw = rng.integers(0, 256, n_bytes, dtype=np.uint8)
+        expected = base64.b64encode(raw.tobytes()).decode("ascii")
+
+        assert b64encode_array(raw, np.uint8, n_threads=n_threads) == expected
+        decoded = b64decode_array(expected, np.uint8, n_threads=n_threads)
+        np.testing.assert_equal(decoded, raw)
+
+
+def test_b64_arrays(small_chunks):
+    vertices = np.random.default_rng(0).random((100, 3))
+    encoded = b64encode_array(vertices, np.float32, n_threads=4)
+    assert encoded == base64.b64encode(vertices.astype(np.float32).tobytes()).decode("ascii")
+
+    decoded = b64decode_array(encoded, np.float32, n_threads=4)
+    assert decoded.dtype == np.float32
+    np.testing.assert_equal(decoded.reshape((-1, 3)), vertices.astype(np.float32))
+
+    # Characters out of the alphabet are discarded, as base64.b64decode
+    wrapped = "\n".join(encoded[i : i + 76] for i in range(0, len(encoded), 76))
+    np.testing.assert_equal(b64decode_array(wrapped, np.float32, n_threads=4), decoded)
+
+
+def test_n_threads_default(small_chunks, monkeypatch):
+    monkeypatch.setattr(encoding.os, "cpu_count", lambda: 8)
+    # Threads only with enough chunks, as they are slower than binascii per CPU
+    assert encoding._n_threads(None, 5 * 3) == 1
+    assert encoding._n_threads(None, 5 * 4) == 4
+    assert encoding._n_threads(None, 5 * 100) == 8
+    assert encoding._n_threads(2, 5 * 100) == 2
+
+    monkeypatch.setattr(encoding.os, "cpu_count", lambda: 2)
+    assert encoding._n_threads(None, 5 * 100) == 1
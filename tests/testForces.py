@@ -0,0 +1,69 @@
+import pathlib
+
+import numpy as np
+import pytest
+
+from lnas import LnasFormat
+
+
+@pytest.fixture()
+def cube():
+    cube = LnasFormat.from_file(pathlib.Path("fixture/cube.lnas"))
+    normals = cube.geometry.normals
+    cube.surfaces["x_positive"] = np.flatnonzero(normals[:, 0] > 0.5).astype(np.uint32)
+    cube.surfaces["z_negative"] = np.flatnonzero(normals[:, 2] < -0.5).astype(np.uint32)
+    yield cube
+
+
+def test_surfaces_forces_uniform_pressure(cube):
+    n_steps, n_triangles = 5, len(cube.geometry.triangles)
+    pressure = np.arange(1, n_steps + 1, dtype=np.float32)[:, None] * np.ones((1, n_triangles))
+
+    forces = cube.surfaces_forces(pressure, reference_area=100, reference_length=10)
+
+    assert forces.surfaces_names == ["cube", "x_positive", "z_negative"]
+    assert forces.forces.shape == (n_steps, 3, 3)
+    steps = np.arange(1, n_steps + 1)[:, None]
+    # Closed body has no resulting force
+    np.testing.assert_allclose(forces.forces[:, 0], 0, atol=1e-5)
+    np.testing.assert_allclose(forces.forces[:, 1], steps * [[-1, 0, 0]], atol=1e-5)
+    np.testing.assert_allclose(forces.forces[:, 2], steps * [[0, 0, 1]], atol=1e-5)
+    # Face x=10 centroid is (10, 5, 5), force (-100, 0, 0) per unit pressure
+    np.testing.assert_allclose(forces.moments[:, 1], steps * [[0, -0.5, 0.5]], atol=1e-5)
+
+
+def test_surfaces_forces_streaming_workers(cube, tmp_path):
+    rng = np.random.default_rng(0)
+    pressure = rng.random((40, len(cube.geometry.triangles))).astype(np.float32)
+    filename = tmp_path / "pressure.npy"
+    np.save(filename, pressure)
+
+    forces_memory = cube.surfaces_forces(pressure, moment_center=(5, 5, 5))
+    forces_stream = cube.surfaces_forces(
+        filename, moment_center=(5, 5, 5), chunk_size=3, n_workers=2
+    )
+
+    np.testing.assert_allclose(forces_stream.forces, forces_memory.forces, atol=1e-5)
+    np.testing.assert_allclose(forces_stream.moments, forces_memory.moments, atol=1e-5)
+
+    with pytest.raises(ValueError):
+        cube.surfaces_forces(pressure, chunk_size=3, n_workers=2)
+    with pytest.raises(ValueError):
+        cube.surfaces_forces(pressure[:, 1:])
+
+
+def test_surfaces_forces_workers_memmap_view(cube, tmp_path):
+    rng = np.random.default_rng(0)
+    pressure = rng.random((20, len(cube.geometry.triangles))).astype(np.float32)
+    filename = tmp_path / "pressure.bin"
+    pressure.tofile(filename)
+    memmap = np.memmap(filename, dtype=np.float32, mode="r", shape=pressure.shape)
+    # Memmap of .npy starts after the header
+    np.save(tmp_path / "pressure.npy", pressure)
+    memmap_npy = np.load(tmp_path / "pressure.npy", mmap_mode="r")
+
+    for view in (memmap[5:], memmap[5:17], memmap[5:][2:], memmap_npy[5:]):
+        forces_serial = cube.surfaces_forces(view, chunk_size=2)
+        forces_workers = cube.surfaces_forces(view, chunk_size=2, n_workers=2)
+        np.testing.assert_allclose(forces_workers.forces, forces_serial.forces, atol=1e-5)
+        np.testing.assert_allclose(forces_workers.moments, forces_serial.moments, atol=1e-5)
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+
+import pytest
+
+import lnas
+
+
+def _loaded_modules(code: str, modules: list[str]) -> list[str]:
+    code += f"\nimport sys\nprint(','.join(m for m in {modules!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+def test_lazy_import():
+    deferred = ["numpy", "ruamel.yaml", "asyncio", "lnas.fmt", "lnas.geometry"]
+    assert _loaded_modules("import lnas", [*deferred, "typing"]) == []
+    assert _loaded_modules("from lnas import LnasFormat", deferred) == [
+        "numpy",
+        "lnas.fmt",
+        "lnas.geometry",
+    ]
+
+    code = "import pathlib\nfrom lnas import LnasFormat\n"
+    code += "LnasFormat.from_file(pathlib.Path('fixture/cube.lnas'))"
+    assert "ruamel.yaml" in _loaded_modules(code, deferred)
+
+
+def test_lazy_features(tmp_path):
+    features = ["lnas.clip", "lnas.forces", "lnas.loading", "lnas.ordering", "lnas.partition"]
+    features += ["lnas.scratch", "lnas.section", "lnas.stl", "lnas.terrain", "lnas.weld"]
+    # Loading and saving LNAS files doesn't import the modules of other features
+    code = "import pathlib\nfrom lnas import LnasFormat\n"
+    code += "lnas = LnasFormat.from_file(pathlib.Path('fixture/cube.lnas'))\n"
+    code += f"lnas.to_file(pathlib.Path({str(tmp_path / 'cube.lnas')!r}))"
+    assert _loaded_modules(code, features) == []
+
+    code = "import pathlib\nfrom lnas import LnasFormat\n"
+    code += "LnasFormat.from_stl(pathlib.Path('fixture/cube.stl'))"
+    assert _loaded_modules(code, features) == ["lnas.stl", "lnas.weld"]
+
+
+def test_lazy_attributes():
+    for name in lnas.__all__:
+        assert getattr(lnas, name).__name__ == name
+    assert set(lnas.__all__) <= set(dir(lnas))
+    assert {"fmt", "geometry", "stl", "utils"} <= set(dir(lnas))
+    # Only exports and submodules are public
+    assert not {"importlib", "TYPE_CHECKING"} & set(dir(lnas))
+    with pytest.raises(AttributeError):
+        _ = lnas.LagrangianReader
+
+
+def test_lazy_submodules():
+    code = "import lnas\nlnas.fmt.LnasFormat, lnas.geometry, lnas.utils.read_yaml, lnas.stl"
+    assert _loaded_modules(code, ["lnas.fmt", "lnas.stl"]) == ["lnas.fmt", "lnas.stl"]
+    with pytest.raises(subprocess.CalledProcessError):
+        _loaded_modules("import lnas\nlnas.unknown", [])
@@ -5,6 +5,7 @@ import numpy as np
 import pytest
 
 from lnas import LnasFormat, LnasGeometry, TransformationsMatrix
+from lnas.stl import read_stl, stl_binary
 
 
 @pytest.fixture()
@@ -67,6 +68,54 @@ def test_filter_surface_from_list(mesh):
     assert triangle_idx == np.array([0])
 
 
+def test_filter_surfaces_from_list_multiple(mesh):
+    mesh.surfaces["all"] = np.array([1, 0])
+    geometry, triangle_idx = mesh.geometry_from_list_surfaces(["sfc2", "all"])
+
+    np.testing.assert_equal(triangle_idx, [0, 1])
+    np.testing.assert_equal(geometry.triangle_vertices, mesh.geometry.triangle_vertices)
+
+
+def test_triangles_surfaces(mesh):
+    mesh.surfaces["all"] = np.array([0, 1])
+    mesh.geometry.triangles = np.concatenate([mesh.geometry.triangles, [[0, 3, 1]]])
+
+    indptr, labels = mesh.triangles_surfaces
+    np.testing.assert_equal(indptr, [0, 2, 4, 4])
+    np.testing.assert_equal(labels, [0, 2, 1, 2])
+    np.testing.assert_equal(mesh.triangles_labels, [0, 1, -1])
+    assert mesh.surfaces_of_triangle(1) == ["sfc2", "all"]
+    assert mesh.surfaces_of_triangle(2) == []
+
+    # Index is updated when surfaces change
+    mesh.surfaces["sfc1"] = np.array([2])
+    np.testing.assert_equal(mesh.triangles_labels, [2, 1, 0])
+
+    del mesh.surfaces["all"]
+    np.testing.assert_equal(mesh.triangles_labels, [-1, 1, 0])
+    mesh.surfaces = {"all": np.array([0, 1, 2])}
+    np.testing.assert_equal(mesh.triangles_labels, [0, 0, 0])
+
+    # Arrays changed in place need an explicit invalidation
+    mesh.surfaces["all"][:] = [1, 2, 2]
+    mesh.invalidate_surfaces_index()
+    np.testing.assert_equal(mesh.triangles_labels, [-1, 0, 0])
+
+
+def test_surfaces_set_operations(mesh):
+    mesh.surfaces["all"] = np.array([1, 0])
+
+    np.testing.assert_equal(mesh.surfaces_union(["sfc1", "sfc2"]), [0, 1])
+    np.testing.assert_equal(mesh.surfaces_union([]), [])
+    np.testing.assert_equal(mesh.surfaces_intersection(["all", "sfc2"]), [1])
+    np.testing.assert_equal(mesh.surfaces_intersection(["sfc1", "sfc2"]), [])
+    np.testing.assert_equal(mesh.surfaces_difference("all", ["sfc1"]), [1])
+    assert mesh.surfaces_union(["all"]).dtype == np.uint32
+
+    with pytest.raises(KeyError):
+        mesh.surfaces_union(["sfc3"])
+
+
 def test_join_lnas(mesh, other_mesh):
     combined_lnas = mesh.copy()
     combined_lnas.join([other_mesh], ["_sfc2"])
@@ -79,6 +128,31 @@ def test_join_lnas(mesh, other_mesh):
     assert list(combined_lnas.surfaces.keys()) == expected_sfcs
 
 
+def test_join_lnas_weld(mesh):
+    combined_lnas = mesh.copy()
+    other_meshes = []
+    for i in range(1, 4):
+        other_mesh = mesh.copy()
+        other_mesh.geometry.vertices[:, 0] += 10 * i
+        other_meshes.append(other_mesh)
+
+    combined_lnas.join(other_meshes, ["_1", "_2", "_3"], weld_tolerance=1e-3)
+
+    assert len(combined_lnas.geometry.vertices) == 10
+    assert len(combined_lnas.geometry.triangles) == 8
+    np.testing.assert_equal(combined_lnas.surfaces["sfc2_3"], [7])
+    np.testing.assert_equal(
+        combined_lnas.geometry.triangle_vertices[7], other_meshes[2].geometry.triangle_vertices[1]
+    )
+
+
+def test_join_lnas_repeated_surface(mesh, other_mesh):
+    combined_lnas = mesh.copy()
+    with pytest.raises(KeyError):
+        combined_lnas.join([other_mesh], None)
+    assert combined_lnas == mesh
+
+
 def test_cube_lnas_reading():
     filename = pathlib.Path("fixture/cube.lnas")
     cube = LnasFormat.from_file(filename)
@@ -105,6 +179,34 @@ def test_cube_lnas_from_surface():
         cube.geometry_from_surface("not_surface")
 
 
+def test_cube_surfaces_integrals():
+    cube = LnasFormat.from_file(pathlib.Path("fixture/cube.lnas"))
+    side = cube.geometry.vertices[:, 0].max()
+    normals = cube.geometry.normals
+    cube.surfaces["x_faces"] = np.flatnonzero(np.abs(normals[:, 0]) > 0.5).astype(np.uint32)
+    cube.surfaces["x_positive"] = np.flatnonzero(normals[:, 0] > 0.5).astype(np.uint32)
+
+    integrals = cube.surfaces_integrals(direction=(-1, 0, 0))
+    assert integrals.surfaces_names == ["cube", "x_faces", "x_positive"]
+
+    np.testing.assert_allclose(integrals.area, [6 * side**2, 2 * side**2, side**2])
+    np.testing.assert_allclose(integrals.centroid[0], [side / 2] * 3)
+    np.testing.assert_allclose(integrals.centroid[2], [side, side / 2, side / 2])
+    np.testing.assert_allclose(integrals.normal[0], [0, 0, 0], atol=1e-6)
+    np.testing.assert_allclose(integrals.normal[2], [side**2, 0, 0])
+    np.testing.assert_allclose(integrals.projected_area, [side**2, side**2, side**2])
+
+    # Second moment of faces normal to x: x^2 term is 2 faces at distance side / 2
+    expected_xx = 2 * side**2 * (side / 2) ** 2
+    expected_yy = 2 * side * side**3 / 12
+    np.testing.assert_allclose(
+        integrals.second_moment[1], np.diag([expected_xx, expected_yy, expected_yy]), atol=1e-6
+    )
+    np.testing.assert_allclose(
+        integrals.second_moment[0], np.eye(3) * (expected_xx + 2 * expected_yy), atol=1e-6
+    )
+
+
 def test_cube_lnas_transformation():
     filename = pathlib.Path("fixture/cube.lnas")
     cube = LnasFormat.from_file(filename)
@@ -177,8 +279,8 @@ def test_filter_triangles():
     lnas_fmt.surfaces["even"] = even_triangles
     lnas_fmt.surfaces["odd"] = odd_triangles
 
-    even_geometry = lnas_fmt.geometry_from_surface("even")
-    odd_geometry = lnas_fmt.geometry_from_surface("odd")
+    even_geometry = lnas_fmt.geometry_from_surface("even", compact=False)
+    odd_geometry = lnas_fmt.geometry_from_surface("odd", compact=False)
 
     # Filter divisible by 3
     filter_triangles = np.array(
@@ -191,8 +293,8 @@ def test_filter_triangles():
             assert v >= 0
             assert v < len(filtered_lnas.geometry.triangles)
 
-    new_even_geometry = filtered_lnas.geometry_from_surface("even")
-    new_odd_geometry = filtered_lnas.geometry_from_surface("odd")
+    new_even_geometry = filtered_lnas.geometry_from_surface("even", compact=False)
+    new_odd_geometry = filtered_lnas.geometry_from_surface("odd", compact=False)
 
     for idx, t in enumerate(lnas_fmt.geometry.triangles):
         arrays_in = []
@@ -220,6 +322,95 @@ def test_filter_triangles():
             assert tuple(t) not in [tuple(tt) for tt in arr]
 
 
+def test_filter_triangles_idxs():
+    lnas_fmt = LnasFormat.from_file(pathlib.Path("fixture/cylinder.lnas"))
+    n_triangles = len(lnas_fmt.geometry.triangles)
+    lnas_fmt.surfaces["even"] = np.arange(0, n_triangles, 2, dtype=np.uint32)
+    lnas_fmt.surfaces["odd"] = np.arange(1, n_triangles, 2, dtype=np.uint32)
+    normals = lnas_fmt.geometry.normals
+
+    triangles_use = np.arange(n_triangles) % 3 == 0
+    lnas_bool = lnas_fmt.filter_triangles(triangles_use)
+    lnas_idxs = lnas_fmt.filter_triangles(np.flatnonzero(triangles_use))
+
+    assert lnas_bool == lnas_idxs
+    for s, arr in lnas_bool.surfaces.items():
+        assert arr.dtype == np.uint32
+        np.testing.assert_equal(
+            lnas_bool.geometry.triangles[arr],
+            lnas_fmt.geometry.triangles[
+                np.extract(triangles_use[lnas_fmt.surfaces[s]], lnas_fmt.surfaces[s])
+            ],
+        )
+    # Derived values are carried over from original geometry
+    np.testing.assert_equal(lnas_bool.geometry._normals, normals[triangles_use])
+
+    with pytest.raises(ValueError):
+        lnas_fmt.filter_triangles(np.array([0, 0]))
+    with pytest.raises(ValueError):
+        lnas_fmt.filter_triangles(np.array([n_triangles]))
+
+
+def test_geometry_from_surface_compact():
+    lnas_fmt = LnasFormat.from_file(pathlib.Path("fixture/cylinder.lnas"))
+    n_triangles = len(lnas_fmt.geometry.triangles)
+    lnas_fmt.surfaces["half"] = np.arange(n_triangles // 2, dtype=np.uint32)
+
+    geometry = lnas_fmt.geometry_from_surface("half")
+    geometry_full = lnas_fmt.geometry_from_surface("half", compact=False)
+
+    assert len(geometry.vertices) == len(np.unique(geometry_full.triangles))
+    assert len(geometry.vertices) < len(lnas_fmt.geometry.vertices)
+    np.testing.assert_equal(geometry.triangle_vertices, geometry_full.triangle_vertices)
+    np.testing.assert_almost_equal(geometry.normals, geometry_full.normals)
+
+
+def test_compact_vertices(mesh):
+    lnas_filtered = mesh.filter_triangles(np.array([False, True]))
+    lnas_compact, vertices_idxs = lnas_filtered.compact_vertices()
+
+    np.testing.assert_equal(vertices_idxs, [1, 2, 3])
+    np.testing.assert_equal(lnas_compact.geometry.triangles, [[0, 2, 1]])
+    np.testing.assert_equal(lnas_compact.geometry.vertices, mesh.geometry.vertices[vertices_idxs])
+    np.testing.assert_equal(
+        lnas_compact.geometry.vertices_normals,
+        lnas_filtered.geometry.vertices_normals[vertices_idxs],
+    )
+    assert lnas_compact.surfaces.keys() == lnas_filtered.surfaces.keys()
+
+
+@pytest.mark.parametrize("curve", ["morton", "hilbert"])
+def test_reorder(curve):
+    lnas_fmt = LnasFormat.from_file(pathlib.Path("fixture/cylinder.lnas"))
+    n_triangles = len(lnas_fmt.geometry.triangles)
+    lnas_fmt.surfaces["even"] = np.arange(0, n_triangles, 2, dtype=np.uint32)
+    lnas_orig = lnas_fmt.copy()
+    normals = lnas_fmt.geometry.normals.copy()
+
+    vertices_perm, triangles_perm = lnas_fmt.reorder(curve)
+    geometry = lnas_fmt.geometry
+
+    np.testing.assert_equal(geometry.vertices, lnas_orig.geometry.vertices[vertices_perm])
+    np.testing.assert_equal(
+        geometry.triangle_vertices, lnas_orig.geometry.triangle_vertices[triangles_perm]
+    )
+    np.testing.assert_equal(geometry.normals, normals[triangles_perm])
+    for s, arr in lnas_fmt.surfaces.items():
+        assert (np.diff(arr) > 0).all()
+        np.testing.assert_equal(np.sort(triangles_perm[arr]), lnas_orig.surfaces[s])
+
+    # Triangles neighbours in memory are close in space
+    centroids = geometry.triangle_vertices.mean(axis=1)
+    centroids_orig = lnas_orig.geometry.triangle_vertices.mean(axis=1)
+    dist = np.linalg.norm(np.diff(centroids, axis=0), axis=1).mean()
+    dist_orig = np.linalg.norm(np.diff(centroids_orig, axis=0), axis=1).mean()
+    assert dist < dist_orig
+
+    filename = pathlib.Path("output/test_reorder.lnas")
+    lnas_fmt.to_file(filename)
+    assert LnasFormat.from_file(filename) == lnas_fmt
+
+
 def test_cylinder_save():
     check_save("fixture/cylinder.lnas")
 
@@ -295,3 +486,112 @@ def test_from_stl_ordering_partial_inverted():
     # After correction every triangle must have the same normal as the original.
     np.testing.assert_almost_equal(lnas_corrected.geometry.normals, geom.normals, decimal=4)
     np.testing.assert_almost_equal(lnas_corrected.geometry.areas, geom.areas, decimal=4)
+
+
+def test_clip_surfaces():
+    cylinder = LnasFormat.from_file(pathlib.Path("fixture/cylinder.lnas"))
+    n_triangles = len(cylinder.geometry.triangles)
+    cylinder.surfaces["even"] = np.arange(0, n_triangles, 2, dtype=np.uint32)
+    cylinder.surfaces["odd"] = np.arange(1, n_triangles, 2, dtype=np.uint32)
+    vertices = cylinder.geometry.vertices
+    start, end = vertices.min(axis=0), vertices.max(axis=0)
+    end_clip = (start + end) / 2
+
+    clipped = cylinder.clip(start=start, end=end_clip)
+    geometry = clipped.geometry
+    assert (geometry.vertices <= end_clip + 1e-5).all()
+    np.testing.assert_equal(
+        np.sort(np.concatenate((clipped.surfaces["even"], clipped.surfaces["odd"]))),
+        np.arange(len(geometry.triangles)),
+    )
+    for s in ("even", "odd"):
+        original_area = cylinder.geometry.areas[cylinder.surfaces[s]].sum()
+        assert 0 < geometry.areas[clipped.surfaces[s]].sum() < original_area
+        # Clipped surface is the same as clipping the surface geometry
+        surface_geometry, _ = cylinder.geometry_from_surface(s).clip(start=start, end=end_clip)
+        np.testing.assert_allclose(
+            geometry.areas[clipped.surfaces[s]].sum(), surface_geometry.areas.sum(), rtol=1e-5
+        )
+
+
+def test_from_stl_ascii_solids(tmp_path):
+    cube_stl = pathlib.Path("fixture/cube.stl")
+    with open(cube_stl, "rb") as f:
+        triangles, normals = read_stl(f)
+
+    def facets(idxs):
+        return "".join(
+            "facet normal {} {} {}\nouter loop\n".format(*normals[i])
+            + "".join("vertex {:.9g} {:.9g} {:.9g}\n".format(*v) for v in triangles[i])
+            + "endloop\nendfacet\n"
+            for i in idxs
+        )
+
+    ascii_stl = tmp_path / "cube.stl"
+    ascii_stl.write_text(
+        f"solid front\n{facets(range(6))}endsolid front\n"
+        f"solid\n{facets(range(6, 10))}endsolid\n"
+        f"solid front\n{facets(range(10, 12))}endsolid front\n"
+    )
+
+    lnas = LnasFormat.from_stl(ascii_stl)
+    binary = LnasFormat.from_stl(cube_stl)
+    np.testing.assert_equal(lnas.geometry.vertices, binary.geometry.vertices)
+    np.testing.assert_equal(lnas.geometry.triangles, binary.geometry.triangles)
+    assert list(lnas.surfaces.keys()) == ["front", "cube"]
+    np.testing.assert_equal(lnas.surfaces["front"], [0, 1, 2, 3, 4, 5, 10, 11])
+    np.testing.assert_equal(lnas.surfaces["cube"], [6, 7, 8, 9])
+
+    # Thin triangle collapsed by welding, surfaces after it are shifted
+    thin = "facet normal 0 0 1\nouter loop\n" + "".join(
+        f"vertex {x} {y} 100\n" for x, y in ((100, 100), (110, 100), (100, 100.01))
+    )
+    ascii_stl.write_text(
+        f"solid front\n{facets(range(6))}endsolid front\n"
+        f"solid thin\n{thin}endloop\nendfacet\nendsolid thin\n"
+        f"solid back\n{facets(range(6, 12))}endsolid back\n"
+    )
+    lnas = LnasFormat.from_stl(ascii_stl, weld_tolerance=0.1)
+    np.testing.assert_equal(lnas.geometry.triangles, binary.geometry.triangles)
+    np.testing.assert_equal(lnas.surfaces["front"], np.arange(6))
+    np.testing.assert_equal(lnas.surfaces["thin"], [])
+    np.testing.assert_equal(lnas.surfaces["back"], np.arange(6, 12))
+
+
+def test_from_stl_files(tmp_path):
+    cylinder_stl = pathlib.Path("fixture/cylinder.stl")
+    (tmp_path / "cube.stl").write_bytes(pathlib.Path("fixture/cube.stl").read_bytes())
+    (tmp_path / "other.txt").write_text("not a STL")
+
+    lnas = LnasFormat.from_stl_files([cylinder_stl, tmp_path], n_workers=2)
+    assert list(lnas.surfaces.keys()) == ["cube", "cylinder"]
+    np.testing.assert_equal(lnas.surfaces["cube"], np.arange(12))
+    n_triangles = len(lnas.geometry.triangles)
+    np.testing.assert_equal(lnas.surfaces["cylinder"], np.arange(12, n_triangles))
+
+    # Same as joining each STL and welding vertices
+    cube, cylinder = LnasFormat.from_stl(tmp_path / "cube.stl"), LnasFormat.from_stl(cylinder_stl)
+    cube.join([cylinder])
+    cube.weld_vertices(1e-6)
+    np.testing.assert_equal(lnas.geometry.vertices, cube.geometry.vertices)
+    np.testing.assert_equal(lnas.geometry.triangles, cube.geometry.triangles)
+
+    single = LnasFormat.from_stl_files({"cylinder": cylinder_stl})
+    np.testing.assert_equal(single.geometry.vertices, cylinder.geometry.vertices)
+    np.testing.assert_equal(single.geometry.triangles, cylinder.geometry.triangles)
+
+    with pytest.raises(ValueError):
+        LnasFormat.from_stl_files([tmp_path / "cube.stl", tmp_path])
+
+
+def test_from_stl_files_weld_collapses_triangles(tmp_path):
+    # Thin triangle, far from the cube, collapsed by welding
+    thin = np.array([[[0, 0, 0], [10, 0, 0], [0, 0.01, 0]]], dtype=np.float32) + 100
+    (tmp_path / "thin.stl").write_bytes(stl_binary(thin, np.array([[0, 0, 1]], np.float32)))
+    files = {"a_thin": tmp_path / "thin.stl", "cube": pathlib.Path("fixture/cube.stl")}
+
+    lnas = LnasFormat.from_stl_files(files, weld_tolerance=0.1)
+    cube = LnasFormat.from_stl(files["cube"])
+    assert len(lnas.geometry.triangles) == len(cube.geometry.triangles)
+    np.testing.assert_equal(lnas.surfaces["a_thin"], [])
+    np.testing.assert_equal(lnas.surfaces["cube"], np.arange(len(cube.geometry.triangles)))
@@ -22,6 +22,34 @@ def test_join_geometries():
     assert len(geometry.vertices) == 8
 
 
+def test_join_geometries_weld():
+    vertices = np.array([[0, 0, 0], [0, 10, 0], [10, 0, 0], [10, 10, 0]], dtype=np.float32)
+    triangles = np.array([[0, 2, 1], [1, 2, 3]], dtype=np.uint32)
+    geometry = LnasGeometry(vertices=vertices, triangles=triangles)
+    other_geometry = geometry.copy()
+    other_geometry.vertices[:, 0] += 10 + 1e-6
+
+    geometry.join([other_geometry, other_geometry.copy()], weld_tolerance=1e-4)
+
+    assert len(geometry.vertices) == 6
+    assert len(geometry.triangles) == 6
+    np.testing.assert_equal(geometry.triangles[2:4], [[2, 4, 3], [3, 4, 5]])
+    np.testing.assert_equal(geometry.triangles[4:], geometry.triangles[2:4])
+    np.testing.assert_almost_equal(geometry.areas, [50] * 6)
+
+
+def test_weld_vertices_collapsed_triangles():
+    vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 1e-6, 0]], dtype=np.float32)
+    triangles = np.array([[0, 1, 2], [0, 1, 3]], dtype=np.uint32)
+    geometry = LnasGeometry(vertices=vertices, triangles=triangles)
+
+    triangles_idxs = geometry.weld_vertices(1e-4)
+
+    np.testing.assert_equal(triangles_idxs, [0])
+    np.testing.assert_equal(geometry.triangles, [[0, 1, 2]])
+    assert len(geometry.vertices) == 3
+
+
 def test_geometry_normal_and_area():
     verts_pos = vp = np.array([(0, 0, 0), (1, 0, 0), (0, 1, 0)], dtype=np.float32)
     # Normal positive and normal negative
@@ -86,3 +114,85 @@ def test_geometry_filter_triangles_cylinder():
                 break
         if not is_in:
             assert not triangles_filtered[t_idx]
+
+
+def test_geometry_vertices_areas():
+    vertices = np.array([(0, 0, 0), (1, 0, 0), (0, 1, 0), (3, 0, 0)], dtype=np.float32)
+    # Right triangle and obtuse triangle (obtuse at vertex 1)
+    triangles = np.array([(0, 1, 2), (1, 3, 2)], dtype=np.uint32)
+    geometry = LnasGeometry(vertices=vertices, triangles=triangles)
+
+    np.testing.assert_almost_equal(geometry.areas, [0.5, 1])
+    np.testing.assert_almost_equal(geometry.vertices_areas, [0.5 / 3, 1.5 / 3, 1.5 / 3, 1 / 3])
+    np.testing.assert_almost_equal(
+        geometry.get_vertices_areas("voronoi"), [0.25, 0.125 + 0.5, 0.125 + 0.25, 0.25]
+    )
+
+    # Vertices areas are invalidated with other derived values
+    geometry.vertices = geometry.vertices * 2
+    geometry._full_update()
+    np.testing.assert_almost_equal(geometry.vertices_areas.sum(), 6, decimal=5)
+
+
+def test_cylinder_vertices_areas_and_normals():
+    cylinder = LnasFormat.from_file(pathlib.Path("fixture/cylinder.lnas"))
+    geometry = cylinder.geometry
+
+    for scheme in ("barycentric", "voronoi"):
+        np.testing.assert_allclose(
+            geometry.get_vertices_areas(scheme).sum(), geometry.areas.sum(), rtol=1e-5
+        )
+
+    expected_normals = np.zeros((len(geometry.vertices), 3), dtype=np.float64)
+    for normal, triangle, area in zip(geometry.normals, geometry.triangles, geometry.areas):
+        expected_normals[triangle] += normal * area
+    expected_normals /= np.linalg.norm(expected_normals, axis=1)[:, np.newaxis]
+    np.testing.assert_allclose(geometry.vertices_normals, expected_normals, atol=1e-5)
+
+    filename = pathlib.Path("output/cylinder_markers.bin")
+    geometry.export_markers(filename, scheme="voronoi")
+    markers = np.fromfile(filename, dtype="<f4").reshape((-1, 7))
+    np.testing.assert_equal(markers, geometry.markers_array("voronoi"))
+    np.testing.assert_equal(markers[:, 6], geometry.get_vertices_areas("voronoi"))
+
+
+def test_geometry_clip_box():
+    cube = LnasFormat.from_file(pathlib.Path("fixture/cube.lnas"))
+    geometry = cube.geometry
+
+    clipped, parents = geometry.clip(start=(-1, -1, -1), end=(5, 11, 11))
+    assert (clipped.vertices[:, 0] <= 5).all()
+    np.testing.assert_almost_equal(clipped.areas.sum(), 300, decimal=4)
+    np.testing.assert_allclose(clipped.normals, geometry.normals[parents], atol=1e-6)
+    assert (np.diff(parents) >= 0).all()
+    # Split vertices are shared, 8 edges cross the cut (4 sides and 4 faces diagonals)
+    assert len(clipped.vertices) == 4 + 8
+    assert len(np.unique(clipped.triangles)) == len(clipped.vertices)
+
+    # Box containing everything keeps geometry
+    clipped, parents = geometry.clip(start=(0, 0, 0), end=(10, 10, 10))
+    assert clipped == geometry
+    np.testing.assert_equal(parents, np.arange(len(geometry.triangles)))
+
+    clipped, parents = geometry.clip(start=(11, 0, 0))
+    assert len(clipped.triangles) == 0
+
+
+def test_geometry_clip_planes_cylinder():
+    cylinder = LnasFormat.from_file(pathlib.Path("fixture/cylinder.lnas"))
+    geometry = cylinder.geometry
+    vertices = geometry.vertices
+    middle = (vertices.min(axis=0) + vertices.max(axis=0)) / 2
+    normal = np.array([1, 2, 0.5])
+
+    lower, lower_parents = geometry.clip(planes=[(middle, normal)])
+    upper, upper_parents = geometry.clip(planes=[(middle, -normal)])
+    assert ((lower.vertices - middle) @ normal >= -1e-4).all()
+    np.testing.assert_allclose(
+        lower.areas.sum() + upper.areas.sum(), geometry.areas.sum(), rtol=1e-5
+    )
+    # Each triangle is kept whole in one side, or split between both
+    np.testing.assert_equal(
+        np.union1d(lower_parents, upper_parents), np.arange(len(geometry.triangles))
+    )
+    np.testing.assert_allclose(lower.normals, geometry.normals[lower_parents], atol=1e-4)
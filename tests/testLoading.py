@@ -0,0 +1,65 @@
+import asyncio
+import pathlib
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from lnas import LnasFormat
+from lnas.loading import load_many
+
+FILENAMES = [
+    pathlib.Path("fixture/cube.lnas"),
+    pathlib.Path("fixture/cylinder.lnas"),
+    pathlib.Path("fixture/missing.lnas"),
+    pathlib.Path("fixture/cube.stl"),
+]
+
+
+def check_results(results):
+    by_filename = {r.filename: r for r in results}
+    assert set(by_filename.keys()) == set(FILENAMES)
+    assert not by_filename[pathlib.Path("fixture/missing.lnas")].ok
+    assert isinstance(by_filename[pathlib.Path("fixture/missing.lnas")].error, ValueError)
+    for filename in FILENAMES[:2]:
+        assert by_filename[filename].value == LnasFormat.from_file(filename)
+    assert by_filename[pathlib.Path("fixture/cube.stl")].ok
+
+
+def test_load_many():
+    results = list(LnasFormat.load_many(FILENAMES * 4, max_concurrency=3))
+    assert len(results) == 16
+    check_results(results)
+    check_results(LnasFormat.load_many(map(str, FILENAMES)))
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        check_results(LnasFormat.load_many(FILENAMES, executor=executor))
+
+    with pytest.raises(ValueError):
+        list(LnasFormat.load_many(FILENAMES, max_concurrency=0))
+
+
+def test_load_many_async():
+    async def load():
+        return [r async for r in LnasFormat.load_many_async(FILENAMES, max_concurrency=2)]
+
+    check_results(asyncio.run(load()))
+
+
+def test_load_many_concurrency():
+    lock = threading.Lock()
+    loading = [0, 0]
+
+    def load(filename):
+        with lock:
+            loading[0] += 1
+            loading[1] = max(loading)
+        time.sleep(0.01)
+        with lock:
+            loading[0] -= 1
+        return filename.name
+
+    results = list(load_many(load, [f"file_{i}" for i in range(20)], max_concurrency=3))
+    assert sorted(r.value for r in results) == sorted(f"file_{i}" for i in range(20))
+    assert loading[1] == 3
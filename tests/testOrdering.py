@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from lnas.ordering import hilbert_keys, morton_keys, space_filling_keys
+
+
+@pytest.fixture()
+def grid():
+    n = 8
+    yield np.array([(i, j, k) for i in range(n) for j in range(n) for k in range(n)])
+
+
+def test_morton_keys(grid):
+    keys = morton_keys(grid)
+    np.testing.assert_equal(np.sort(keys), np.arange(len(grid)))
+    assert morton_keys(np.array([[1, 0, 0]]))[0] == 4
+    assert morton_keys(np.array([[0, 0, 1]]))[0] == 1
+
+
+def test_hilbert_keys_adjacent(grid):
+    keys = hilbert_keys(grid, bits=3)
+    np.testing.assert_equal(np.sort(keys), np.arange(len(grid)))
+
+    # Consecutive cells in Hilbert curve are always neighbours
+    ordered = grid[np.argsort(keys)]
+    np.testing.assert_equal(np.abs(np.diff(ordered, axis=0)).sum(axis=1), 1)
+
+
+def test_space_filling_keys_points():
+    rng = np.random.default_rng(0)
+    points = rng.random((1000, 3)) * [10, 1, 1]
+    for curve in ("morton", "hilbert"):
+        keys = space_filling_keys(points, curve=curve)
+        assert keys.dtype == np.uint64
+        assert len(np.unique(keys)) == len(points)
+
+    with pytest.raises(ValueError):
+        space_filling_keys(points, curve="peano")
+    with pytest.raises(ValueError):
+        space_filling_keys(points, bits=22)
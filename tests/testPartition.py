@@ -0,0 +1,77 @@
+import pathlib
+
+import numpy as np
+import pytest
+
+from lnas import LnasFormat
+from lnas.partition import save_partitions
+
+
+@pytest.fixture()
+def cylinder():
+    cylinder = LnasFormat.from_file(pathlib.Path("fixture/cylinder.lnas"))
+    n_triangles = len(cylinder.geometry.triangles)
+    cylinder.surfaces["even"] = np.arange(0, n_triangles, 2, dtype=np.uint32)
+    yield cylinder
+
+
+@pytest.mark.parametrize("method", ["slab", "bisection"])
+def test_partition_owned(cylinder, method):
+    n_triangles = len(cylinder.geometry.triangles)
+    partitions = cylinder.partition(n_parts=5, method=method)
+
+    assert len(partitions) == 5
+    owners = np.zeros((n_triangles,), dtype=int)
+    for p in partitions:
+        np.add.at(owners, p.triangles_idxs[p.owned], 1)
+        # Balanced partitions
+        assert abs(np.count_nonzero(p.owned) - n_triangles / 5) < n_triangles / 10
+    np.testing.assert_equal(owners, 1)
+
+
+def test_partition_maps(cylinder):
+    partitions = cylinder.partition(n_parts=3, halo=0.5)
+    geometry = cylinder.geometry
+
+    for p in partitions:
+        part_geometry = p.lnas.geometry
+        assert len(part_geometry.vertices) == len(np.unique(part_geometry.triangles))
+        np.testing.assert_equal(part_geometry.vertices, geometry.vertices[p.vertices_idxs])
+        np.testing.assert_equal(
+            part_geometry.triangle_vertices, geometry.triangle_vertices[p.triangles_idxs]
+        )
+        np.testing.assert_equal(
+            p.triangles_idxs[p.lnas.surfaces["even"]],
+            np.intersect1d(p.triangles_idxs, cylinder.surfaces["even"]),
+        )
+        np.testing.assert_equal(
+            p.triangles_global_to_local(p.triangles_idxs), np.arange(len(p.triangles_idxs))
+        )
+        local = p.vertices_global_to_local(np.arange(len(geometry.vertices)))
+        assert np.count_nonzero(local >= 0) == len(p.vertices_idxs)
+        # Halo triangles are the ones not owned
+        assert np.count_nonzero(~p.owned) > 0
+
+
+def test_partition_boxes_and_save(cylinder, tmp_path):
+    vertices = cylinder.geometry.vertices
+    start, end = vertices.min(axis=0), vertices.max(axis=0)
+    middle = (start + end) / 2
+    boxes = [(start, np.array([middle[0], end[1], end[2]])), (start, end)]
+
+    partitions = cylinder.partition(boxes=boxes)
+    # Second box has all triangles, owning the ones with centroid outside the first box
+    centroids = cylinder.geometry.triangle_vertices.mean(axis=1)
+    in_first = (centroids >= boxes[0][0]).all(axis=1) & (centroids <= boxes[0][1]).all(axis=1)
+    np.testing.assert_equal(partitions[1].triangles_idxs, np.arange(len(centroids)))
+    np.testing.assert_equal(partitions[1].owned, ~in_first)
+    np.testing.assert_equal(partitions[0].owned, in_first[partitions[0].triangles_idxs])
+
+    filenames = save_partitions(partitions, tmp_path, n_workers=2)
+    for p, f in zip(partitions, filenames):
+        assert LnasFormat.from_file(f) == p.lnas
+        maps = np.load(f.with_name(f.name + ".maps.npz"))
+        np.testing.assert_equal(maps["triangles_idxs"], p.triangles_idxs)
+
+    with pytest.raises(ValueError):
+        cylinder.partition()
@@ -0,0 +1,74 @@
+import pathlib
+import pickle
+
+import numpy as np
+import pytest
+
+from lnas import LnasFormat
+
+
+@pytest.fixture()
+def lnas():
+    lnas = LnasFormat.from_file(pathlib.Path("fixture/cylinder.lnas"))
+    # Derived values, not pickled by default
+    _ = lnas.geometry.vertices_normals, lnas.geometry.vertices_areas
+    yield lnas
+
+
+@pytest.mark.parametrize("protocol", [4, 5])
+def test_pickle_lnas(lnas, protocol):
+    loaded = pickle.loads(pickle.dumps(lnas, protocol=protocol))
+
+    assert loaded == lnas
+    for s, arr in lnas.surfaces.items():
+        assert loaded.surfaces[s].dtype == arr.dtype
+    assert not hasattr(loaded.geometry, "_normals")
+    np.testing.assert_equal(loaded.geometry.normals, lnas.geometry.normals)
+
+
+def test_pickle_out_of_band(lnas):
+    buffers = []
+    data = pickle.dumps(lnas, protocol=5, buffer_callback=buffers.append)
+    # Only primary arrays (vertices, triangles and surfaces) are sent as buffers
+    assert len(buffers) == 2 + len(lnas.surfaces)
+    assert len(data) < 1000
+    nbytes = sum(b.raw().nbytes for b in buffers)
+    assert nbytes == lnas.geometry.vertices.nbytes + lnas.geometry.triangles.nbytes + sum(
+        arr.nbytes for arr in lnas.surfaces.values()
+    )
+
+    loaded = pickle.loads(data, buffers=buffers)
+    assert loaded == lnas
+
+
+@pytest.mark.parametrize("protocol", [4, 5])
+def test_pickle_writable(lnas, protocol):
+    loaded_list = [pickle.loads(pickle.dumps(lnas, protocol=protocol))]
+    if protocol >= 5:
+        buffers = []
+        data = pickle.dumps(lnas, protocol=protocol, buffer_callback=buffers.append)
+        loaded_list.append(pickle.loads(data, buffers=[bytearray(b.raw()) for b in buffers]))
+
+    for loaded in loaded_list:
+        geometry = loaded.geometry
+        assert geometry.vertices.flags.writeable and geometry.triangles.flags.writeable
+        # Inverted triangles are corrected in place
+        normals = geometry.normals.copy()
+        geometry.triangles[::2] = geometry.triangles[::2, ::-1]
+        geometry.correct_inverted_normals(normals)
+        np.testing.assert_allclose(geometry.normals, lnas.geometry.normals, atol=1e-6)
+        assert all(arr.flags.writeable for arr in loaded.surfaces.values())
+
+
+def test_pickle_derived(lnas):
+    size = len(pickle.dumps(lnas, protocol=5))
+    lnas.geometry.pickle_derived = True
+    data = pickle.dumps(lnas, protocol=5)
+    assert len(data) > 3 * size
+
+    loaded = pickle.loads(data)
+    geometry = loaded.geometry
+    assert geometry.pickle_derived
+    np.testing.assert_equal(geometry._normals, lnas.geometry.normals)
+    np.testing.assert_equal(geometry._vertices_normals, lnas.geometry.vertices_normals)
+    np.testing.assert_equal(geometry._vertices_areas["barycentric"], lnas.geometry.vertices_areas)
@@ -0,0 +1,72 @@
+import logging
+import pathlib
+
+import numpy as np
+import pytest
+
+from lnas import LnasFormat
+from lnas.profiling import LoggingSink, add_sink, is_enabled, profile, remove_sink, span
+
+
+def test_profiling_disabled():
+    records = []
+    assert not is_enabled()
+    with span("op") as s:
+        s.add_bytes(10)
+
+    add_sink(records.append)
+    remove_sink(records.append)
+    LnasFormat.from_file(pathlib.Path("fixture/cube.lnas"))
+    assert records == []
+
+
+def test_profile_from_file():
+    filename = pathlib.Path("fixture/cylinder.lnas")
+    with profile() as report:
+        lnas = LnasFormat.from_file(filename)
+        _ = lnas.geometry.vertices_normals
+
+    names = [r.name for r in report.records]
+    assert names[-1] == "geometry.vertices_normals"
+    assert {"yaml.load", "base64.decode", "lnas.from_file", "geometry.normals"} <= set(names)
+
+    records = {r.name: r for r in report.records}
+    assert records["yaml.load"].parent == "lnas.from_file"
+    assert records["yaml.load"].depth == 1
+    assert records["yaml.load"].n_bytes == filename.stat().st_size
+    assert records["lnas.from_file"].parent is None
+    assert records["lnas.from_file"].duration >= records["yaml.load"].duration
+    assert records["lnas.from_file"].peak_memory is None
+
+    summary = report.summary()
+    assert summary["base64.decode"]["count"] == 3
+    assert "yaml.load" in report.format()
+
+
+def test_profile_memory():
+    lnas = LnasFormat.from_file(pathlib.Path("fixture/cylinder.lnas"))
+    with profile(trace_memory=True) as report, span("outer"):
+        with span("inner"):
+            arr = np.ones((1 << 18,), dtype=np.float64)
+        del arr
+        lnas.filter_triangles(lnas.geometry.areas > 0)
+
+    records = {r.name: r for r in report.records}
+    assert records["inner"].peak_memory >= 1 << 21
+    assert records["outer"].peak_memory >= records["inner"].peak_memory
+    assert records["lnas.filter_triangles"].parent == "outer"
+
+
+def test_profile_sinks(caplog):
+    calls = []
+    with (
+        profile(calls.append),
+        profile(LoggingSink(level=logging.WARNING)),
+        pytest.raises(ValueError),
+        span("failing", n_bytes=5) as s,
+    ):
+        s.add_bytes(3)
+        raise ValueError()
+
+    assert [(r.name, r.n_bytes) for r in calls] == [("failing", 8)]
+    assert "failing" in caplog.text
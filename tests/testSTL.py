@@ -3,7 +3,7 @@ import io
 import numpy as np
 import pytest
 
-from lnas.stl import read_stl, stl_binary
+from lnas.stl import is_ascii_stl, read_stl, read_stl_ascii, stl_binary
 
 
 @pytest.fixture()
@@ -25,3 +25,49 @@ def test_stl_pipeline(triangles, normals):
 
     np.testing.assert_equal(ret_triangles, triangles)
     np.testing.assert_equal(ret_normals, normals)
+
+
+def test_read_stl_truncated(triangles, normals):
+    buff = stl_binary(triangles, normals)
+
+    with pytest.raises(ValueError):
+        read_stl(io.BytesIO(buff[:-10]))
+
+
+def test_read_stl_ascii(triangles, normals):
+    content = (
+        b"solid first part\n"
+        b"  facet normal 0 0 1\n    outer loop\n"
+        b"      vertex 0 0 0\n      vertex 1 0 0\n      vertex 0 1 0\n"
+        b"    endloop\n  endfacet\n"
+        b"endsolid first part\n"
+        b"SOLID\n"
+        b"  FACET NORMAL 0 0 1e0\n    OUTER LOOP\n"
+        b"      VERTEX 1.0 1.0 0.0\n      VERTEX 1 0 0\n      VERTEX 0 1 -0\n"
+        b"    ENDLOOP\n  ENDFACET\n"
+        b"ENDSOLID\n"
+    )
+    assert is_ascii_stl(content)
+
+    solids = read_stl_ascii(content)
+    assert [name for name, _, _ in solids] == ["first part", ""]
+    np.testing.assert_equal(solids[0][1], triangles[:1])
+    np.testing.assert_equal(solids[1][2], normals[1:])
+
+    ret_triangles, ret_normals = read_stl(io.BytesIO(content))
+    np.testing.assert_equal(ret_triangles, triangles)
+    np.testing.assert_equal(ret_normals, normals)
+
+    with pytest.raises(ValueError):
+        read_stl_ascii(content.replace(b"endloop", b"loop"))
+    with pytest.raises(ValueError):
+        read_stl_ascii(content[: content.index(b"endsolid first")])
+
+
+def test_binary_stl_header_solid(triangles, normals):
+    buff = bytes(stl_binary(triangles, normals))
+    buff = b"solid binary".ljust(80, b"\0") + buff[80:]
+    assert not is_ascii_stl(buff)
+
+    ret_triangles, _ = read_stl(io.BytesIO(buff))
+    np.testing.assert_equal(ret_triangles, triangles)
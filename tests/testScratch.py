@@ -0,0 +1,59 @@
+import pathlib
+
+import numpy as np
+import pytest
+
+from lnas import LnasFormat, LnasGeometry
+from lnas.scratch import ScratchSpace
+
+
+@pytest.fixture()
+def geometry():
+    yield LnasFormat.from_file(pathlib.Path("fixture/cylinder.lnas")).geometry
+
+
+def test_scratch_space(tmp_path):
+    scratch = ScratchSpace(tmp_path / "scratch", chunk_size=3)
+    arr = scratch.map_chunks(lambda start, end: np.arange(start, end) * 2, 10)
+    assert isinstance(arr, np.memmap)
+    assert arr.filename is not None and pathlib.Path(arr.filename).parent == scratch.directory
+    np.testing.assert_equal(arr, np.arange(10) * 2)
+
+    np.testing.assert_equal(scratch.filter_rows(arr, arr % 3 == 0), [0, 6, 12, 18])
+
+    idxs = np.array([[0, 1], [1, 2], [2, 0], [4, 4]])
+    sums = scratch.scatter_add(idxs, 6, lambda start, end: np.ones((end - start, 2)))
+    np.testing.assert_equal(sums, [2, 2, 2, 0, 2, 0])
+
+    scratch.cleanup()
+    assert not scratch.directory.exists()
+
+
+def test_geometry_scratch(geometry, tmp_path):
+    geometry.to_npy(tmp_path / "npy")
+    geometry_ooc = LnasGeometry.from_npy(tmp_path / "npy")
+    assert isinstance(geometry_ooc.vertices, np.memmap)
+    geometry_ooc.use_scratch(tmp_path / "scratch", chunk_size=7)
+
+    np.testing.assert_equal(geometry_ooc.normals, geometry.normals)
+    np.testing.assert_equal(geometry_ooc.areas, geometry.areas)
+    assert isinstance(geometry_ooc.normals, np.memmap)
+    assert not hasattr(geometry_ooc, "_triangles_vertices")
+
+    np.testing.assert_allclose(geometry_ooc.vertices_normals, geometry.vertices_normals, atol=1e-6)
+    for scheme in ("barycentric", "voronoi"):
+        np.testing.assert_allclose(
+            geometry_ooc.get_vertices_areas(scheme), geometry.get_vertices_areas(scheme), rtol=1e-6
+        )
+    np.testing.assert_equal(geometry_ooc.triangle_vertices, geometry.triangle_vertices)
+    assert isinstance(geometry_ooc.triangle_vertices, np.memmap)
+
+
+def test_geometry_scratch_invalid_normals(tmp_path):
+    vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [2, 0, 0]], dtype=np.float32)
+    triangles = np.array([[0, 1, 2], [0, 1, 3], [1, 3, 2]], dtype=np.uint32)
+    geometry = LnasGeometry(vertices=vertices, triangles=triangles)
+    geometry.use_scratch(tmp_path, chunk_size=2)
+
+    np.testing.assert_equal(geometry.normals, [[0, 0, 1], [0, 0, 1]])
+    np.testing.assert_equal(geometry.triangles, [[0, 1, 2], [1, 3, 2]])
@@ -0,0 +1,64 @@
+import pathlib
+
+import numpy as np
+
+from lnas import LnasFormat, LnasGeometry
+
+
+def test_cube_cross_sections():
+    cube = LnasFormat.from_file(pathlib.Path("fixture/cube.lnas"))
+    offsets = [5, 11, 10]
+    sections = cube.cross_sections(normal=(0, 0, 2), offsets=offsets)
+
+    assert [s.offset for s in sections] == offsets
+    section = sections[0]
+    assert len(section.polylines_indptr) == 2
+    assert section.closed.all()
+    (polyline,) = section.polylines
+    np.testing.assert_equal(polyline[0], polyline[-1])
+    np.testing.assert_almost_equal(polyline[:, 2], 5)
+    # Perimeter and clockwise loop (negative signed area) around plane normal
+    lengths = np.linalg.norm(section.segments[:, 1] - section.segments[:, 0], axis=1)
+    np.testing.assert_almost_equal(lengths.sum(), 40)
+    x, y = polyline[:, 0], polyline[:, 1]
+    np.testing.assert_almost_equal((x[:-1] * y[1:] - x[1:] * y[:-1]).sum() / 2, -100)
+    # Segments are in their triangles
+    for segment, t in zip(section.segments, section.triangles_idxs):
+        triangle = cube.geometry.triangle_vertices[t]
+        assert (segment.min(axis=0) >= triangle.min(axis=0) - 1e-5).all()
+        assert (segment.max(axis=0) <= triangle.max(axis=0) + 1e-5).all()
+    assert section.surfaces_names == ["cube"]
+    np.testing.assert_equal(section.surfaces_labels, 0)
+
+    assert len(sections[1].segments) == 0
+    # Face lying on the plane is given once, by its neighbour triangles
+    assert sections[2].closed.all() and len(sections[2].polylines_indptr) == 2
+
+
+def test_cylinder_cross_sections():
+    cylinder = LnasFormat.from_file(pathlib.Path("fixture/cylinder.lnas"))
+    offsets = np.linspace(0.5, 11.5, 23)
+    sections = cylinder.geometry.cross_sections(normal=(1, 0, 0), offsets=offsets)
+
+    for section in sections:
+        assert section.closed.all()
+        for polyline in section.polylines:
+            np.testing.assert_allclose(polyline[:, 0], section.offset, atol=1e-5)
+        # Segments are chained
+        start, end = section.polylines_indptr[:2]
+        np.testing.assert_equal(
+            section.segments[start + 1 : end, 0], section.segments[start : end - 1, 1]
+        )
+
+
+def test_disjoint_cross_sections():
+    vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 1], [5, 0, 0], [6, 0, 0], [5, 1, 1]])
+    triangles = np.array([[0, 1, 2], [3, 4, 5]])
+    geometry = LnasGeometry(vertices=vertices, triangles=triangles)
+
+    (section,) = geometry.cross_sections(normal=(0, 0, 1), offsets=0.5)
+    assert len(section.polylines) == 2
+    assert not section.closed.any()
+    np.testing.assert_equal(np.sort(section.triangles_idxs), [0, 1])
+
+    assert geometry.cross_sections(normal=(0, 0, 1), offsets=[]) == []
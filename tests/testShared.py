@@ -0,0 +1,66 @@
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pytest
+
+from lnas import LnasFormat
+from lnas.shared import SharedLnas, SharedLnasHandle
+
+
+@pytest.fixture()
+def lnas():
+    yield LnasFormat.from_file(pathlib.Path("fixture/cylinder.lnas"))
+
+
+def _surface_area(handle: SharedLnasHandle, surface_name: str) -> tuple[float, bool]:
+    with handle.attach() as shared:
+        lnas = shared.lnas
+        area = float(lnas.geometry.areas[lnas.surfaces[surface_name]].sum())
+        has_normals = hasattr(lnas.geometry, "_normals")
+        del lnas
+    return area, has_normals
+
+
+def test_shared_lnas(lnas):
+    _ = lnas.geometry.normals, lnas.geometry.vertices_areas
+    with SharedLnas.publish(lnas) as shared:
+        assert shared.lnas == lnas
+        np.testing.assert_equal(shared.lnas.geometry.normals, lnas.geometry.normals)
+        np.testing.assert_equal(shared.lnas.geometry.vertices_areas, lnas.geometry.vertices_areas)
+
+        attached = shared.handle.attach()
+        assert attached.lnas == lnas
+        vertices = attached.lnas.geometry.vertices
+        assert not vertices.flags.writeable
+        with pytest.raises(ValueError):
+            vertices[0] = 0
+        # Mapping is kept while arrays are used
+        with pytest.raises(BufferError):
+            attached.close()
+        np.testing.assert_equal(vertices, lnas.geometry.vertices)
+        del vertices
+        attached.close()
+
+        surfaces = list(lnas.surfaces.keys())
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(_surface_area, repeat(shared.handle), surfaces))
+        for surface, (area, has_normals) in zip(surfaces, results):
+            assert area == pytest.approx(lnas.geometry.areas[lnas.surfaces[surface]].sum())
+            assert has_normals
+
+        # Workers exiting don't remove the blocks
+        with shared.handle.attach() as attached:
+            assert attached.lnas == lnas
+
+    with pytest.raises(FileNotFoundError):
+        shared.handle.attach()
+
+
+def test_shared_lnas_without_derived(lnas):
+    _ = lnas.geometry.normals
+    with SharedLnas.publish(lnas, include_derived=False) as shared:
+        assert set(shared.handle.arrays.keys()) == {"vertices", "triangles", "surfaces"}
+        assert not hasattr(shared.lnas.geometry, "_normals")
+        np.testing.assert_allclose(shared.lnas.geometry.areas, lnas.geometry.areas)
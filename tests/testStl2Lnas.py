@@ -96,3 +96,30 @@ def test_from_stl_matches_stl2lnas(stl_name: str):
             f"Surface '{name}' triangle count differs: "
             f"py={len(py_lnas.surfaces[name])}, rust={len(rust_lnas.surfaces[name])}"
         )
+
+
+def test_from_stl_files_matches_stl2lnas():
+    """Python from_stl_files and Rust stl2lnas with multiple files must match."""
+    stl_paths = [_FIXTURE_DIR / name for name in ("cube.stl", "cylinder.stl")]
+
+    with tempfile.NamedTemporaryFile(suffix=".lnas", delete=False) as f:
+        rust_lnas_path = pathlib.Path(f.name)
+
+    result = subprocess.run(
+        ["stl2lnas", "-f", *map(str, stl_paths), "-o", str(rust_lnas_path), "--overwrite"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, f"stl2lnas failed: {result.stderr}"
+
+    py_lnas = LnasFormat.from_stl_files(stl_paths, n_workers=2)
+    rust_lnas = LnasFormat.from_file(rust_lnas_path)
+
+    assert len(py_lnas.geometry.vertices) == len(rust_lnas.geometry.vertices)
+    np.testing.assert_allclose(
+        _canonical_triangles(py_lnas), _canonical_triangles(rust_lnas), atol=1e-4
+    )
+    assert set(py_lnas.surfaces.keys()) == set(rust_lnas.surfaces.keys())
+    for name in py_lnas.surfaces:
+        np.testing.assert_equal(py_lnas.surfaces[name], rust_lnas.surfaces[name])
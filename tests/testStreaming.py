@@ -0,0 +1,40 @@
+import pathlib
+
+import numpy as np
+import pytest
+
+from lnas import LnasFormat
+from lnas.streaming import stl_to_lnas
+
+
+@pytest.mark.parametrize("stl_name", ["cube.stl", "cube_no_norm.stl", "cylinder.stl"])
+def test_stl_to_lnas_matches_from_stl(stl_name, tmp_path):
+    stl_filename = pathlib.Path("fixture") / stl_name
+    lnas_filename = tmp_path / "streamed.lnas"
+
+    # Small budget, so there are many batches and partitions
+    n_vertices, n_triangles = stl_to_lnas(
+        stl_filename, lnas_filename, memory_budget=20_000, scratch_dir=tmp_path
+    )
+    streamed = LnasFormat.from_file(lnas_filename)
+    lnas = LnasFormat.from_stl(stl_filename)
+
+    assert streamed == lnas
+    np.testing.assert_equal(streamed.geometry.vertices, lnas.geometry.vertices)
+    assert (n_vertices, n_triangles) == (len(lnas.geometry.vertices), len(lnas.geometry.triangles))
+    # Scratch files are removed
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["streamed.lnas"]
+
+
+def test_stl_to_lnas_surface_name(tmp_path):
+    stl_filename = tmp_path / 'cube: "v2".stl'
+    stl_filename.write_bytes(pathlib.Path("fixture/cube.stl").read_bytes())
+    stl_to_lnas(stl_filename, tmp_path / "cube.lnas")
+
+    lnas = LnasFormat.from_file(tmp_path / "cube.lnas")
+    np.testing.assert_equal(lnas.surfaces['cube: "v2"'], np.arange(12))
+
+    truncated = tmp_path / "truncated.stl"
+    truncated.write_bytes(stl_filename.read_bytes()[:-20])
+    with pytest.raises(ValueError):
+        stl_to_lnas(truncated, tmp_path / "truncated.lnas")
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from lnas import LnasFormat
+
+
+def edges_counts(triangles: np.ndarray) -> np.ndarray:
+    edges = np.concatenate((triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]))
+    _, counts = np.unique(np.sort(edges, axis=1), axis=0, return_counts=True)
+    return counts
+
+
+def test_heightfield():
+    heights = np.arange(12, dtype=np.float32).reshape((3, 4))
+    lnas = LnasFormat.from_heightfield(heights, spacing=(1, 2), origin=(10, 20, 5))
+    geometry = lnas.geometry
+
+    assert len(geometry.vertices) == 12
+    assert len(geometry.triangles) == 2 * 2 * 3
+    np.testing.assert_equal(geometry.vertices[5], [11, 22, 10])
+    assert (geometry.normals[:, 2] > 0).all()
+    np.testing.assert_equal(lnas.surfaces["terrain"], np.arange(12))
+    # Shared vertices: inner edges in 2 triangles and border edges in 1
+    assert np.count_nonzero(edges_counts(geometry.triangles) == 1) == 2 * (2 + 3)
+
+
+def test_heightfield_flat_and_tiles(tmp_path):
+    rng = np.random.default_rng(0)
+    heights = rng.random((17, 25))
+    heights[:9] = 0.5
+    heights[:9, 16:] += rng.random((9, 9)) * 1e-4
+    filename = tmp_path / "dem.npy"
+    np.save(filename, heights)
+
+    full = LnasFormat.from_heightfield(filename, spacing=2)
+    lnas = LnasFormat.from_heightfield(
+        filename, spacing=2, tile_size=(8, 16), flat_tolerance=1e-3, flat_block=8
+    )
+    geometry = lnas.geometry
+
+    # Three flat blocks with a fan of 32 triangles instead of 128
+    assert len(geometry.triangles) == len(full.geometry.triangles) - 3 * (128 - 32)
+    assert len(geometry.vertices) == len(np.unique(geometry.triangles))
+    assert np.count_nonzero(edges_counts(geometry.triangles) == 1) == 2 * (16 + 24)
+    np.testing.assert_allclose(geometry.areas.sum(), full.geometry.areas.sum(), rtol=1e-5)
+    assert (geometry.normals[:, 2] > 0).all()
+
+    assert list(lnas.surfaces.keys()) == [f"terrain_{i}_{j}" for i in range(2) for j in range(2)]
+    np.testing.assert_equal(
+        np.sort(np.concatenate(list(lnas.surfaces.values()))), np.arange(len(geometry.triangles))
+    )
+    tile_geometry = lnas.geometry_from_surface("terrain_1_0")
+    assert (tile_geometry.vertices[:, 0] >= 16).all()
+    assert (tile_geometry.vertices[:, 1] <= 32).all()
+
+    with pytest.raises(ValueError):
+        LnasFormat.from_heightfield(heights, spacing=1, tile_size=4, flat_tolerance=1e-3)
+    with pytest.raises(ValueError):
+        LnasFormat.from_heightfield(heights[:1], spacing=1)
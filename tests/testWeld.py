@@ -0,0 +1,100 @@
+import pathlib
+
+import numpy as np
+
+from lnas import LnasFormat
+from lnas.stl import read_stl
+from lnas.weld import VertexWelder, collapsed_triangles, weld_vertices
+
+
+def _weld_unique(vertices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Previous from_stl deduplication, with np.unique over rounded vertices"""
+    rounded = np.ascontiguousarray(np.round(vertices, 5))
+    void_view = rounded.view(np.dtype((np.void, rounded.dtype.itemsize * 3))).ravel()
+    _, unique_idx, inverse_idx = np.unique(void_view, return_index=True, return_inverse=True)
+    return unique_idx, inverse_idx.ravel()
+
+
+def test_weld_decimals_matches_unique():
+    rng = np.random.default_rng(0)
+    base = (rng.random((1000, 3)) * 10).astype(np.float32)
+    vertices = base[rng.integers(0, len(base), 5000)]
+
+    vertices_idxs, vertices_remap = weld_vertices(vertices, chunk_size=512)
+    unique_idxs, unique_inverse = _weld_unique(vertices)
+
+    assert len(vertices_idxs) == len(unique_idxs)
+    assert (np.diff(vertices_idxs) > 0).all()
+    np.testing.assert_equal(
+        vertices[vertices_idxs][vertices_remap], vertices[unique_idxs][unique_inverse]
+    )
+
+
+def test_weld_tolerance_across_cells():
+    # Vertices straddle a rounding/grid boundary
+    vertices = np.array(
+        [[0.99999999, 0, 0], [1.00000001, 0, 0], [1, 1, 1], [1, 1, 1 + 2e-6]], dtype=np.float64
+    )
+    vertices_idxs, vertices_remap = weld_vertices(vertices, tolerance=1e-6)
+    np.testing.assert_equal(vertices_idxs, [0, 2, 3])
+    np.testing.assert_equal(vertices_remap, [0, 0, 1, 2])
+
+    vertices_idxs, vertices_remap = weld_vertices(vertices, tolerance=1e-5, relative=True)
+    np.testing.assert_equal(vertices_idxs, [0, 2])
+    np.testing.assert_equal(vertices_remap, [0, 0, 1, 1])
+
+
+def test_welder_incremental():
+    rng = np.random.default_rng(1)
+    base = rng.random((2000, 3))
+    vertices = base[rng.integers(0, len(base), 10000)]
+
+    welder = VertexWelder(tolerance=1e-9, chunk_size=1000, capacity=4)
+    groups_ids = np.concatenate([welder.add(v) for v in np.array_split(vertices, 7)])
+    vertices_idxs, groups_remap = welder.finalize()
+
+    vertices_idxs_all, vertices_remap_all = weld_vertices(vertices, tolerance=1e-9)
+    np.testing.assert_equal(vertices_idxs, vertices_idxs_all)
+    np.testing.assert_equal(groups_remap[groups_ids], vertices_remap_all)
+    np.testing.assert_equal(welder.welded_positions(), vertices[vertices_idxs])
+
+
+def test_from_stl_weld_modes():
+    filename = pathlib.Path("fixture/cylinder.stl")
+    with open(filename, "rb") as f:
+        triangles, _ = read_stl(f)
+
+    lnas_decimals = LnasFormat.from_stl(filename)
+    lnas_tolerance = LnasFormat.from_stl(filename, weld_tolerance=1e-6, relative_tolerance=True)
+
+    flat_vertices = triangles.reshape((-1, 3))
+    assert len(lnas_decimals.geometry.vertices) == len(_weld_unique(flat_vertices)[0])
+    assert len(lnas_tolerance.geometry.vertices) <= len(lnas_decimals.geometry.vertices)
+    np.testing.assert_allclose(
+        lnas_tolerance.geometry.areas.sum(), lnas_decimals.geometry.areas.sum(), rtol=1e-4
+    )
+
+
+def test_from_stl_weld_collapses_triangles():
+    filename = pathlib.Path("fixture/cylinder.stl")
+    with open(filename, "rb") as f:
+        triangles, _ = read_stl(f)
+
+    lnas_fmt = LnasFormat.from_stl(filename, weld_tolerance=1.0)
+
+    n_triangles = len(lnas_fmt.geometry.triangles)
+    assert 0 < n_triangles < len(triangles)
+    assert not collapsed_triangles(lnas_fmt.geometry.triangles).any()
+    np.testing.assert_equal(lnas_fmt.surfaces["cylinder"], np.arange(n_triangles))
+
+
+def test_weld_tolerance_order_independent():
+    # Chain of vertices, one per grid cell, each close to the next one only
+    vertices = np.zeros((6, 3))
+    vertices[:, 0] = 0.1 + 0.99 * np.arange(6)
+    rng = np.random.default_rng(2)
+    for _ in range(10):
+        perm = rng.permutation(len(vertices))
+        vertices_idxs, vertices_remap = weld_vertices(vertices[perm], tolerance=1.0, chunk_size=1)
+        np.testing.assert_equal(vertices_idxs, [0])
+        np.testing.assert_equal(vertices_remap, np.zeros(len(vertices)))